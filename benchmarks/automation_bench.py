@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Automation benchmark: onboard N services end to end against local mocks
+
+Starts a mock Coolify and a mock Cloudflare, then onboards N services -
+DNS record, environment patch and deploy - with up to --concurrency in
+flight at once. Nothing touches production DNS.
+
+Paths:
+- mcp:     automate_service_deployment through server_stdio.py
+- example: examples/standalone_automation.py (DNS record + tunnel route)
+
+Reports services/s, per-service p50/p90/p99, the median duration of each
+automation step, the requests each mock received, and whether the mocks
+ended up in the expected state (one DNS record, and for the example path
+one tunnel route, per service).
+
+Results are written to benchmarks/results/ as JSON.
+
+Usage:
+    python benchmarks/automation_bench.py --services 50 --concurrency 8
+    python benchmarks/automation_bench.py --path example --services 20 --cf-latency-ms 80
+    python benchmarks/automation_bench.py --env COOLIFY_WRITE_RATE=10 --env COOLIFY_WRITE_BURST=10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastmcp import Client
+from fastmcp.client.transports import StdioTransport
+
+import mock_cloudflare
+import mock_coolify
+from load_bench import latency_summary
+from startup_bench import free_port, git_revision, server_env
+
+
+def automation_env(coolify_url: str, cloudflare_url: str, inventory_db: str) -> Dict[str, str]:
+    return server_env(
+        coolify_url, inventory_db,
+        CLOUDFLARE_API_BASE_URL=cloudflare_url,
+        CLOUDFLARE_API_TOKEN="mock-token",
+        CLOUDFLARE_ZONE_ID=mock_cloudflare.ZONE_ID,
+        CLOUDFLARE_ACCOUNT_ID=mock_cloudflare.ACCOUNT_ID,
+        CLOUDFLARE_TUNNEL_ID=mock_cloudflare.TUNNEL_ID,
+    )
+
+
+def service_names(count: int) -> List[str]:
+    return [f"bench-svc-{i:04d}" for i in range(count)]
+
+
+async def onboard_mcp(env: Dict[str, str], services: List[str], concurrency: int) -> Dict[str, Any]:
+    """automate_service_deployment for each service over one stdio session"""
+    transport = StdioTransport(
+        sys.executable, [os.path.join(ROOT, "server_stdio.py")], env=env, cwd=ROOT,
+        log_file=Path(os.devnull),
+    )
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    steps: Dict[str, List[float]] = {}
+    failures: List[str] = []
+
+    async with Client(transport) as client:
+        async def onboard(index: int, name: str) -> None:
+            async with gate:
+                started = time.perf_counter()
+                result = await client.call_tool("automate_service_deployment", {
+                    "service_name": name, "subdomain": name, "app_uuid": f"app-{index:04d}",
+                }, raise_on_error=False)
+                latencies.append((time.perf_counter() - started) * 1000)
+            data = result.structured_content or {}
+            if result.is_error or not data.get("success"):
+                failures.append(f"{name}: {data.get('errors') or result.content}")
+            for step, timing in data.get("timings", {}).get("steps", {}).items():
+                steps.setdefault(step, []).append(timing["duration_ms"])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(onboard(i, name) for i, name in enumerate(services)))
+        elapsed = time.perf_counter() - started
+
+    return {"elapsed_s": elapsed, "latencies": latencies, "steps": steps, "failures": failures}
+
+
+def onboard_example(env: Dict[str, str], services: List[str], concurrency: int) -> Dict[str, Any]:
+    """CoolifyCloudflareAutomation.automate_full_deployment for each service, in threads"""
+    os.environ.update(env)
+    sys.path.insert(0, os.path.join(ROOT, "examples"))
+    from standalone_automation import CoolifyCloudflareAutomation
+
+    automation = CoolifyCloudflareAutomation()
+    latencies: List[float] = []
+    failures: List[str] = []
+
+    def onboard(name: str) -> None:
+        started = time.perf_counter()
+        result = automation.automate_full_deployment(name, name, service_port=3000)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if not result["success"]:
+            failures.append(f"{name}: {result['errors']}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(onboard, services))
+    elapsed = time.perf_counter() - started
+    return {"elapsed_s": elapsed, "latencies": latencies, "steps": {}, "failures": failures}
+
+
+def verify(cloudflare: mock_cloudflare.MockCloudflare, services: List[str], domain: str,
+           check_tunnel: bool) -> Dict[str, Any]:
+    """Compare the mock's final state with what N onboardings should have produced"""
+    expected = {f"{name}.{domain}" for name in services}
+    records = {r["name"] for r in cloudflare.records[mock_cloudflare.ZONE_ID].values()}
+    state = {"dns_records_missing": len(expected - records)}
+    if check_tunnel:
+        ingress = cloudflare.tunnels[mock_cloudflare.TUNNEL_ID]["ingress"]
+        routes = {rule.get("hostname") for rule in ingress}
+        # A missing route means overlapping read-modify-writes of the tunnel config overwrote it
+        state["tunnel_routes_missing"] = len(expected - routes)
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end service onboarding against mocks")
+    parser.add_argument("--path", choices=["mcp", "example"], default="mcp")
+    parser.add_argument("--services", type=int, default=25, help="services to onboard")
+    parser.add_argument("--concurrency", type=int, default=5, help="onboardings in flight at once")
+    parser.add_argument("--coolify-latency-ms", type=float, default=20.0)
+    parser.add_argument("--cf-latency-ms", type=float, default=60.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="extra random delay on both mocks")
+    parser.add_argument("--domain", default="therink.io")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="extra server environment, e.g. COOLIFY_WRITE_RATE=10")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/automation-<timestamp>.json)")
+    args = parser.parse_args()
+
+    services = service_names(args.services)
+    coolify = mock_coolify.start_mock(free_port(), apps=max(args.services, 1), deploy_seconds=1.0,
+                                      latency_ms=args.coolify_latency_ms, jitter_ms=args.jitter_ms)
+    cloudflare = mock_cloudflare.start_mock(free_port(), domain=args.domain,
+                                            latency_ms=args.cf_latency_ms, jitter_ms=args.jitter_ms)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = automation_env(coolify.url, cloudflare.url, os.path.join(tmp, "inventory.sqlite3"))
+            env["BASE_DOMAIN"] = args.domain
+            env.update(item.split("=", 1) for item in args.env)
+            if args.path == "mcp":
+                run = asyncio.run(onboard_mcp(env, services, args.concurrency))
+            else:
+                run = onboard_example(env, services, args.concurrency)
+        state = verify(cloudflare.mock, services, args.domain, check_tunnel=args.path == "example")
+    finally:
+        coolify.stop()
+        cloudflare.stop()
+
+    report = {
+        "benchmark": "automation",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "path": args.path,
+            "services": args.services,
+            "concurrency": args.concurrency,
+            "coolify_latency_ms": args.coolify_latency_ms,
+            "cf_latency_ms": args.cf_latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "env": dict(item.split("=", 1) for item in args.env),
+        },
+        "elapsed_s": round(run["elapsed_s"], 3),
+        "services_per_s": round(args.services / run["elapsed_s"], 2) if run["elapsed_s"] else None,
+        "latency": latency_summary(run["latencies"]),
+        "steps_median_ms": {step: round(statistics.median(v), 1) for step, v in sorted(run["steps"].items())},
+        "failures": run["failures"],
+        "state": state,
+        "upstream_requests": {
+            "coolify": dict(coolify.mock.requests),
+            "cloudflare": dict(cloudflare.mock.requests),
+        },
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"automation-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    latency = report["latency"]
+    print(f"\nAutomation benchmark ({args.path}: {args.services} services, concurrency {args.concurrency}, "
+          f"git {report['git_revision']})")
+    print(f"  {report['services_per_s']} services/s over {report['elapsed_s']} s")
+    print(f"  per service: p50 {latency['p50_ms']:.1f} ms  p90 {latency['p90_ms']:.1f} ms  p99 {latency['p99_ms']:.1f} ms")
+    for step, median in report["steps_median_ms"].items():
+        print(f"    {step:<12} median {median:>8.1f} ms")
+    print(f"  failures: {len(run['failures'])}  state: {state}")
+    for service, requests in report["upstream_requests"].items():
+        print(f"  {service} requests: {sum(requests.values())} ({', '.join(f'{k} {v}' for k, v in requests.items())})")
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+JSON codec micro-benchmark
+
+Times the two JSON hot spots on realistic payloads (mock Coolify
+/applications listings of several fleet sizes):
+
+    decode  an upstream response body: the old path (response.text then
+            response.json(), i.e. decode to str and parse again) against
+            json_codec.loads(bytes) for every installed backend
+    encode  a tool result: FastMCP's own conversion of a returned dict
+            against a result pre-encoded by json_codec.json_result
+
+Results are written to benchmarks/results/ as JSON.
+
+Usage:
+    python benchmarks/json_bench.py
+    python benchmarks/json_bench.py --apps 50,500,2000 --min-time 1.0
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastmcp.tools import Tool, ToolResult
+from mcp.types import TextContent
+
+from json_codec import available_backends, select_codec
+from mock_coolify import MockCoolify
+from startup_bench import git_revision
+
+
+def per_call_us(fn: Callable[[], Any], min_time: float) -> float:
+    """Mean microseconds per call, repeating until min_time has passed"""
+    fn()
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return elapsed / calls * 1e6
+
+
+def bench_payload(apps: int, min_time: float) -> Dict[str, Any]:
+    fleet = list(MockCoolify(apps=apps).applications.values())
+    body = json.dumps(fleet).encode()
+    result = {"applications": fleet, "count": len(fleet)}
+
+    # A fresh Response per call in every variant - .text is cached on the object
+    def response() -> httpx.Response:
+        return httpx.Response(200, content=body, headers={"content-type": "application/json"})
+
+    def old_decode() -> Any:
+        # What _decode_coolify_response did: .text (bytes -> str) then .json() (parse)
+        r = response()
+        return r.json() if r.text else {}
+
+    decode = {"httpx text+json": per_call_us(old_decode, min_time)}
+    for name in available_backends():
+        codec = select_codec(name)
+        decode[f"{name} loads(bytes)"] = per_call_us(lambda: codec.loads(response().content), min_time)
+
+    async def tool_fn() -> Dict:
+        return {}
+
+    tool = Tool.from_function(tool_fn)
+    encode = {"fastmcp default": per_call_us(lambda: tool.convert_result(result), min_time)}
+    for name in available_backends():
+        codec = select_codec(name)
+        encode[f"{name} pre-encoded"] = per_call_us(lambda: tool.convert_result(ToolResult(
+            content=[TextContent(type="text", text=codec.dumps(result).decode())],
+            structured_content=result,
+        )), min_time)
+
+    return {
+        "apps": apps,
+        "body_kb": round(len(body) / 1024, 1),
+        "decode_us": {k: round(v, 1) for k, v in decode.items()},
+        "encode_us": {k: round(v, 1) for k, v in encode.items()},
+    }
+
+
+def print_table(title: str, timings: Dict[str, float], body_kb: float) -> None:
+    baseline = next(iter(timings.values()))
+    print(f"    {title}")
+    for name, us in timings.items():
+        mb_per_s = body_kb / 1024 / (us / 1e6) if us else 0.0
+        print(f"      {name:<24} {us:>10.1f} us  {mb_per_s:>7.1f} MB/s  x{baseline / us:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON decode/encode backends")
+    parser.add_argument("--apps", default="20,200,1000", help="comma-separated fleet sizes")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per measurement")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/json-<timestamp>.json)")
+    args = parser.parse_args()
+
+    payloads = [bench_payload(int(n), args.min_time) for n in args.apps.split(",") if n.strip()]
+    report = {
+        "benchmark": "json",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backends": available_backends(),
+        "payloads": payloads,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"json-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nJSON benchmark (backends: {', '.join(report['backends'])}, git {report['git_revision']})")
+    for payload in payloads:
+        print(f"\n  /applications with {payload['apps']} apps ({payload['body_kb']} KB)")
+        print_table("decode upstream body", payload["decode_us"], payload["body_kb"])
+        print_table("encode tool result", payload["encode_us"], payload["body_kb"])
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Load test for the MCP server over stdio, SSE and streamable HTTP
+
+Runs the server against a local mock Coolify (configurable fleet size and
+latency) and drives it with closed-loop workers: each worker calls a tool
+drawn from a weighted mix, waits for the result and immediately calls the
+next one. Calls finishing inside the measurement window are reported as
+throughput plus p50/p90/p99 latency, overall and per tool, along with the
+number of requests that reached the mock Coolify.
+
+Sessions:
+- stdio: each session is its own server_stdio.py process
+- sse/http: one run_server.py, with every session connected to it
+
+Results are written to benchmarks/results/ as JSON. Pass --baseline to
+compare against an earlier run.
+
+Usage:
+    python benchmarks/load_bench.py --transports stdio,sse --concurrency 16 --duration 20
+    python benchmarks/load_bench.py --apps 500 --latency-ms 80 --jitter-ms 40 --sessions 4
+    python benchmarks/load_bench.py --mix list_applications=1,get_application_logs=1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastmcp import Client
+from fastmcp.client.transports import SSETransport, StdioTransport, StreamableHttpTransport
+
+from mock_coolify import start_mock
+from startup_bench import free_port, git_revision, server_env
+
+# Read-heavy, like an agent exploring a fleet
+DEFAULT_MIX = ("list_applications=4,get_application_details=3,get_application_logs=2,"
+               "list_servers=1,get_server_resources=1")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name:
+            mix[name] = float(weight or 1)
+    return mix
+
+
+def tool_arguments(tool: str, apps: int, servers: int, rng: random.Random) -> Dict[str, Any]:
+    """Arguments for a tool call against the mock fleet (uuids as mock_coolify generates them)"""
+    app_uuid = f"app-{rng.randrange(apps):04d}"
+    server_uuid = f"srv-{rng.randrange(servers):03d}"
+    return {
+        "list_applications": {"limit": 20},
+        "get_application_details": {"app_uuid": app_uuid},
+        "get_application_environment": {"app_uuid": app_uuid},
+        "get_application_logs": {"app_uuid": app_uuid, "lines": 50},
+        "get_server_details": {"server_uuid": server_uuid},
+        "get_server_resources": {"server_uuid": server_uuid},
+        "restart_application": {"app_uuid": app_uuid},
+    }.get(tool, {})
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(values) + 0.5)))
+    return values[min(rank, len(values)) - 1]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 50), 2),
+        "p90_ms": round(percentile(ordered, 90), 2),
+        "p99_ms": round(percentile(ordered, 99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+def stdio_transport(env: Dict[str, str]) -> StdioTransport:
+    return StdioTransport(
+        sys.executable, [os.path.join(ROOT, "server_stdio.py")], env=env, cwd=ROOT,
+        log_file=Path(os.devnull),
+    )
+
+
+@asynccontextmanager
+async def remote_server(env: Dict[str, str], transport: str,
+                        timeout: float = 60.0) -> AsyncIterator[Callable[[], Any]]:
+    """Start run_server.py and yield a factory for client transports once /health answers"""
+    port = free_port()
+    env = dict(env, MCP_HOST="127.0.0.1", MCP_PORT=str(port), MCP_TRANSPORT=transport)
+    base = f"http://127.0.0.1:{port}"
+    headers = {"Authorization": f"Bearer {env['MCP_AUTH_TOKEN']}"}
+    # New session so run_server.py and any worker processes are stopped together
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "run_server.py")],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient() as probe:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"run_server.py exited with code {process.returncode}")
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{transport} server did not come up")
+                try:
+                    if (await probe.get(f"{base}/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.05)
+        if transport == "sse":
+            yield lambda: SSETransport(f"{base}/sse", headers=headers)
+        else:
+            yield lambda: StreamableHttpTransport(f"{base}/mcp", headers=headers)
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+
+
+async def drive(make_transport: Callable[[], Any], args: argparse.Namespace,
+                mix: Dict[str, float]) -> Dict[str, Any]:
+    """Run the closed-loop workers and collect per-call latencies inside the window"""
+    tools, weights = list(mix), list(mix.values())
+    calls: List[Tuple[str, float, bool]] = []
+    clients = [Client(make_transport(), timeout=args.call_timeout) for _ in range(args.sessions)]
+    # Sessions are opened up front so startup never counts against the window
+    await asyncio.gather(*(client.__aenter__() for client in clients))
+    try:
+        window_start = time.perf_counter() + args.warmup
+        window_end = window_start + args.duration
+
+        async def worker(index: int) -> None:
+            client = clients[index % len(clients)]
+            rng = random.Random(args.seed + index)
+            while time.perf_counter() < window_end:
+                tool = rng.choices(tools, weights)[0]
+                started = time.perf_counter()
+                try:
+                    result = await client.call_tool(
+                        tool, tool_arguments(tool, args.apps, args.servers, rng), raise_on_error=False
+                    )
+                    data = result.structured_content
+                    failed = result.is_error or (isinstance(data, dict) and "error" in data)
+                except Exception:
+                    failed = True
+                finished = time.perf_counter()
+                if window_start <= started and finished <= window_end:
+                    calls.append((tool, (finished - started) * 1000, not failed))
+
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    finally:
+        for client in clients:
+            await client.__aexit__(None, None, None)
+
+    by_tool: Dict[str, List[float]] = {}
+    for tool, latency_ms, _ok in calls:
+        by_tool.setdefault(tool, []).append(latency_ms)
+    errors = sum(1 for _tool, _latency, ok in calls if not ok)
+    return {
+        "calls": len(calls),
+        "errors": errors,
+        "throughput_per_s": round(len(calls) / args.duration, 1),
+        "latency": latency_summary([latency for _tool, latency, _ok in calls]),
+        "tools": {tool: latency_summary(samples) for tool, samples in sorted(by_tool.items())},
+    }
+
+
+async def run_transport(transport: str, env: Dict[str, str], args: argparse.Namespace,
+                        mix: Dict[str, float]) -> Dict[str, Any]:
+    if transport == "stdio":
+        return await drive(lambda: stdio_transport(env), args, mix)
+    async with remote_server(env, transport) as make_transport:
+        return await drive(make_transport, args, mix)
+
+
+def print_report(report: Dict, baseline: Optional[Dict]) -> None:
+    print(f"\nLoad benchmark ({report['config']['concurrency']} workers, {report['config']['sessions']} sessions, "
+          f"{report['config']['duration_s']}s, git {report['git_revision']})")
+    for transport, result in report["transports"].items():
+        latency = result["latency"]
+        line = (f"\n  {transport:<6} {result['throughput_per_s']:>8.1f} calls/s  "
+                f"p50 {latency['p50_ms']:.1f} ms  p99 {latency['p99_ms']:.1f} ms  "
+                f"errors {result['errors']}/{result['calls']}")
+        before = (baseline or {}).get("transports", {}).get(transport)
+        if before and before.get("throughput_per_s"):
+            change = result["throughput_per_s"] / before["throughput_per_s"] - 1
+            line += f"  ({change:+.0%} throughput, p99 {latency['p99_ms'] - before['latency']['p99_ms']:+.1f} ms vs baseline)"
+        print(line)
+        for tool, summary in result["tools"].items():
+            print(f"    {tool:<28} n={summary['count']:<6} p50 {summary['p50_ms']:>7.1f} ms  p99 {summary['p99_ms']:>7.1f} ms")
+        upstream = result.get("upstream_requests", {})
+        if upstream:
+            print(f"    upstream requests: {sum(upstream.values())} "
+                  f"({', '.join(f'{k} {v}' for k, v in sorted(upstream.items(), key=lambda i: -i[1])[:5])})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the MCP server against a mock Coolify")
+    parser.add_argument("--transports", default="stdio,sse", help="comma-separated: stdio,sse,http")
+    parser.add_argument("--concurrency", type=int, default=8, help="closed-loop workers")
+    parser.add_argument("--sessions", type=int, default=1, help="MCP sessions the workers are spread across")
+    parser.add_argument("--duration", type=float, default=15.0, help="measurement window in seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of load before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="tool=weight,... (read-only tools by default)")
+    parser.add_argument("--apps", type=int, default=200, help="applications in the mock fleet")
+    parser.add_argument("--servers", type=int, default=3, help="servers in the mock fleet")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mock Coolify response delay")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="extra random mock delay, 0..N ms")
+    parser.add_argument("--call-timeout", type=float, default=60.0, help="seconds before a call counts as failed")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="extra server environment, e.g. COOLIFY_CACHE_ENABLED=false")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/load-<timestamp>.json)")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    transports = [t.strip() for t in args.transports.split(",") if t.strip()]
+    extra_env = dict(item.split("=", 1) for item in args.env)
+
+    mock = start_mock(free_port(), apps=args.apps, servers=args.servers,
+                      latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for transport in transports:
+                env = server_env(mock.url, os.path.join(tmp, f"inventory-{transport}.sqlite3"), **extra_env)
+                before = dict(mock.mock.requests)
+                result = asyncio.run(run_transport(transport, env, args, mix))
+                result["upstream_requests"] = {
+                    key: count - before.get(key, 0)
+                    for key, count in mock.mock.requests.items() if count - before.get(key, 0)
+                }
+                results[transport] = result
+                print(f"{transport}: {result['throughput_per_s']} calls/s, "
+                      f"p99 {result['latency']['p99_ms']} ms", file=sys.stderr)
+    finally:
+        mock.stop()
+
+    report = {
+        "benchmark": "load",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "concurrency": args.concurrency,
+            "sessions": args.sessions,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "mix": mix,
+            "env": extra_env,
+        },
+        "mock": {"apps": args.apps, "servers": args.servers,
+                 "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms},
+        "transports": results,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report, baseline)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Mock Cloudflare API for benchmarks and local testing
+
+Serves the subset of /client/v4 that server.py, utilities/ and examples/
+use - zones, DNS records, accounts and tunnel configurations - with
+Cloudflare's response envelope and error codes. State lives in memory, so
+every run starts from an empty zone. Responses can be delayed to simulate
+the real API.
+
+Usage:
+    python benchmarks/mock_cloudflare.py --port 18998 --latency-ms 60
+
+Then point the MCP server (or a utility script) at it:
+    CLOUDFLARE_API_BASE_URL=http://127.0.0.1:18998/client/v4 \\
+    CLOUDFLARE_API_TOKEN=mock CLOUDFLARE_ZONE_ID=zone-mock CLOUDFLARE_TUNNEL_ID=tunnel-mock \\
+    python server_stdio.py
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from mock_coolify import RunningMock
+
+ZONE_ID = "zone-mock"
+ACCOUNT_ID = "account-mock"
+TUNNEL_ID = "tunnel-mock"
+
+# Cloudflare error codes for the failures the automation runs into
+ERROR_AUTH = 10000
+ERROR_NOT_FOUND = 81044
+ERROR_RECORD_EXISTS = 81053
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime())
+
+
+class MockCloudflare:
+    """One account, one zone and one tunnel, plus per-endpoint request counters"""
+
+    def __init__(self, domain: str = "therink.io", latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 zone_id: str = ZONE_ID, account_id: str = ACCOUNT_ID, tunnel_id: str = TUNNEL_ID):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.requests: Counter = Counter()
+        self.account = {"id": account_id, "name": "Mock Account"}
+        self.zones: Dict[str, Dict] = {
+            zone_id: {
+                "id": zone_id,
+                "name": domain,
+                "status": "active",
+                "paused": False,
+                "type": "full",
+                "account": self.account,
+                "name_servers": ["ada.ns.cloudflare.com", "bob.ns.cloudflare.com"],
+                "created_on": _now(),
+                "modified_on": _now(),
+            }
+        }
+        self.records: Dict[str, Dict[str, Dict]] = {zone_id: {}}
+        self.tunnels: Dict[str, Dict] = {
+            tunnel_id: {"ingress": [{"service": "http_status:404"}], "warp-routing": {"enabled": False}}
+        }
+        self.tunnel_versions: Dict[str, int] = {tunnel_id: 1}
+        self._ids = itertools.count(1)
+
+    async def _respond(self, request: Request, result: Any, status_code: int = 200,
+                       errors: Optional[List[Dict]] = None, result_info: Optional[Dict] = None) -> JSONResponse:
+        self.requests[f"{request.method} {request.scope['route'].path}"] += 1
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        body = {"success": not errors, "errors": errors or [], "messages": [], "result": result}
+        if result_info is not None:
+            body["result_info"] = result_info
+        return JSONResponse(body, status_code=status_code)
+
+    async def _error(self, request: Request, status_code: int, code: int, message: str) -> JSONResponse:
+        return await self._respond(request, None, status_code, [{"code": code, "message": message}])
+
+    def _authorized(self, request: Request) -> bool:
+        return request.headers.get("authorization", "").startswith("Bearer ")
+
+    async def _page(self, request: Request, items: List[Dict]) -> JSONResponse:
+        page = max(1, int(request.query_params.get("page", "1")))
+        per_page = max(1, min(5000, int(request.query_params.get("per_page", "100"))))
+        chunk = items[(page - 1) * per_page: page * per_page]
+        return await self._respond(request, chunk, result_info={
+            "page": page, "per_page": per_page, "count": len(chunk), "total_count": len(items),
+            "total_pages": max(1, -(-len(items) // per_page)),
+        })
+
+    # ---- accounts and zones ----
+
+    async def list_accounts(self, request: Request):
+        if not self._authorized(request):
+            return await self._error(request, 403, ERROR_AUTH, "Authentication error")
+        return await self._page(request, [self.account])
+
+    async def list_zones(self, request: Request):
+        if not self._authorized(request):
+            return await self._error(request, 403, ERROR_AUTH, "Authentication error")
+        zones = list(self.zones.values())
+        if "name" in request.query_params:
+            zones = [z for z in zones if z["name"] == request.query_params["name"]]
+        return await self._page(request, zones)
+
+    async def zone(self, request: Request):
+        zone = self.zones.get(request.path_params["zone_id"])
+        if zone is None:
+            return await self._error(request, 404, 1001, "Invalid zone identifier")
+        return await self._respond(request, zone)
+
+    # ---- DNS records ----
+
+    async def dns_records(self, request: Request):
+        if not self._authorized(request):
+            return await self._error(request, 403, ERROR_AUTH, "Authentication error")
+        zone_id = request.path_params["zone_id"]
+        if zone_id not in self.zones:
+            return await self._error(request, 404, 1001, "Invalid zone identifier")
+        records = self.records[zone_id]
+        if request.method == "GET":
+            items = list(records.values())
+            for key in ("name", "type", "content"):
+                if key in request.query_params:
+                    items = [r for r in items if r[key] == request.query_params[key]]
+            return await self._page(request, items)
+
+        body = await request.json()
+        name, record_type = body.get("name", ""), body.get("type", "")
+        if not name or not record_type or "content" not in body:
+            return await self._error(request, 400, 9005, "name, type and content are required")
+        if record_type in ("A", "AAAA", "CNAME") and any(
+            r["name"] == name and r["type"] in ("A", "AAAA", "CNAME") for r in records.values()
+        ):
+            return await self._error(request, 400, ERROR_RECORD_EXISTS,
+                                     "An A, AAAA, or CNAME record with that host already exists.")
+        record_id = f"rec{next(self._ids):029d}"
+        records[record_id] = {
+            "id": record_id,
+            "zone_id": zone_id,
+            "zone_name": self.zones[zone_id]["name"],
+            "name": name,
+            "type": record_type,
+            "content": body["content"],
+            "proxiable": True,
+            "proxied": bool(body.get("proxied", False)),
+            "ttl": body.get("ttl", 1),
+            "comment": body.get("comment"),
+            "tags": body.get("tags", []),
+            "settings": {},
+            "meta": {},
+            "created_on": _now(),
+            "modified_on": _now(),
+        }
+        return await self._respond(request, records[record_id])
+
+    async def dns_record(self, request: Request):
+        if not self._authorized(request):
+            return await self._error(request, 403, ERROR_AUTH, "Authentication error")
+        records = self.records.get(request.path_params["zone_id"], {})
+        record = records.get(request.path_params["record_id"])
+        if record is None:
+            return await self._error(request, 404, ERROR_NOT_FOUND, "Record does not exist.")
+        if request.method == "DELETE":
+            del records[record["id"]]
+            return await self._respond(request, {"id": record["id"]})
+        if request.method in ("PUT", "PATCH"):
+            record.update({k: v for k, v in (await request.json()).items() if k != "id"})
+            record["modified_on"] = _now()
+        return await self._respond(request, record)
+
+    # ---- tunnel configurations ----
+
+    async def tunnel_configuration(self, request: Request):
+        if not self._authorized(request):
+            return await self._error(request, 403, ERROR_AUTH, "Authentication error")
+        tunnel_id = request.path_params["tunnel_id"]
+        if request.path_params["account_id"] != self.account["id"] or tunnel_id not in self.tunnels:
+            return await self._error(request, 404, 1003, "Tunnel not found")
+        if request.method == "PUT":
+            config = (await request.json()).get("config")
+            ingress = (config or {}).get("ingress") or []
+            # cloudflared requires a final catch-all rule without a hostname
+            if not ingress or "hostname" in ingress[-1]:
+                return await self._error(request, 400, 1055, "The last ingress rule must match all URLs")
+            self.tunnels[tunnel_id] = config
+            self.tunnel_versions[tunnel_id] += 1
+        return await self._respond(request, {
+            "tunnel_id": tunnel_id,
+            "account_id": self.account["id"],
+            "version": self.tunnel_versions[tunnel_id],
+            "config": self.tunnels[tunnel_id],
+            "source": "cloudflare",
+            "created_at": _now(),
+        })
+
+    def asgi_app(self) -> Starlette:
+        return Starlette(routes=[
+            Route("/client/v4/accounts", self.list_accounts),
+            Route("/client/v4/zones", self.list_zones),
+            Route("/client/v4/zones/{zone_id}", self.zone),
+            Route("/client/v4/zones/{zone_id}/dns_records", self.dns_records, methods=["GET", "POST"]),
+            Route("/client/v4/zones/{zone_id}/dns_records/{record_id}", self.dns_record,
+                  methods=["GET", "PUT", "PATCH", "DELETE"]),
+            Route("/client/v4/accounts/{account_id}/cfd_tunnel/{tunnel_id}/configurations",
+                  self.tunnel_configuration, methods=["GET", "PUT"]),
+        ])
+
+
+def start_mock(port: int = 18998, host: str = "127.0.0.1", **options) -> RunningMock:
+    """Start a mock Cloudflare in the background and wait until it accepts requests"""
+    running = RunningMock(MockCloudflare(**options), host, port).start()
+    running.url = f"{running.url}/client/v4"
+    return running
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Cloudflare API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18998)
+    parser.add_argument("--domain", default="therink.io", help="name of the mock zone")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="extra random delay, 0..N ms")
+    args = parser.parse_args()
+
+    mock = MockCloudflare(args.domain, args.latency_ms, args.jitter_ms)
+    print(f"Mock Cloudflare: http://{args.host}:{args.port}/client/v4 "
+          f"(zone {ZONE_ID}, account {ACCOUNT_ID}, tunnel {TUNNEL_ID})")
+    uvicorn.run(mock.asgi_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
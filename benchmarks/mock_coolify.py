@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Mock Coolify API for benchmarks and local testing
+
+Serves the subset of /api/v1 that server.py uses, backed by a generated
+fleet of applications and servers. Every response can be delayed by a
+fixed latency plus uniform jitter to simulate a remote Coolify instance.
+
+Optionally every GET carries an ETag and honours If-None-Match with a 304
+(--etags), and responses are gzip-compressed (--gzip), like Coolify
+behind a compressing reverse proxy.
+
+Usage:
+    python benchmarks/mock_coolify.py --port 18999 --apps 200 --latency-ms 40 --jitter-ms 20
+    python benchmarks/mock_coolify.py --port 18999 --etags --gzip
+
+Then point the MCP server at it:
+    COOLIFY_BASE_URL=http://127.0.0.1:18999 COOLIFY_API_TOKEN=mock python server_stdio.py
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+class MockCoolify:
+    """In-memory fleet plus per-endpoint request counters"""
+
+    def __init__(self, apps: int = 50, servers: int = 3, latency_ms: float = 0.0,
+                 deploy_seconds: float = 2.0, jitter_ms: float = 0.0, etags: bool = False,
+                 gzip: bool = False):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.deploy_seconds = deploy_seconds
+        self.etags = etags
+        self.gzip = gzip
+        self.requests: Counter = Counter()
+        self.not_modified = 0
+        self.servers: List[Dict] = [
+            {
+                "uuid": f"srv-{i:03d}",
+                "name": "Main Computer" if i == 0 else f"server-{i:03d}",
+                "ip": f"10.0.0.{i + 10}",
+                "status": "reachable",
+                "resources": {"cpu_cores": 8, "memory_gb": 32},
+            }
+            for i in range(max(1, servers))
+        ]
+        self.applications: Dict[str, Dict] = {}
+        for i in range(apps):
+            server = self.servers[i % len(self.servers)]
+            uuid = f"app-{i:04d}"
+            self.applications[uuid] = {
+                "uuid": uuid,
+                "name": f"service-{i:04d}",
+                "status": "exited:unhealthy" if i % 7 == 0 else "running:healthy",
+                "fqdn": f"https://service-{i:04d}.example.com",
+                "git_repository": f"example/service-{i:04d}",
+                "build_pack": "nixpacks",
+                # Real application objects are large - keep the payload realistic
+                "docker_compose_raw": "services:\n  app:\n    image: example\n" * 20,
+                "destination": {"server": {"uuid": server["uuid"], "name": server["name"]}},
+                "environment": {"project": {"uuid": "proj-1", "name": "Production"}},
+            }
+        self.envs: Dict[str, Dict] = {
+            uuid: {"PORT": "3000", "DATABASE_URL": "http://localhost:5432"} for uuid in self.applications
+        }
+        self.logs: Dict[str, List[str]] = {}
+        self.deployments: Dict[str, float] = {}
+
+    async def _respond(self, request: Request, payload, status_code: int = 200) -> Response:
+        self.requests[f"{request.method} {request.scope['route'].path}"] += 1
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        response = JSONResponse(payload, status_code=status_code)
+        if self.etags and request.method == "GET" and status_code == 200:
+            etag = f'"{hashlib.sha1(response.body).hexdigest()[:20]}"'
+            if request.headers.get("if-none-match") == etag:
+                self.not_modified += 1
+                return Response(status_code=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+        return response
+
+    def _app_or_404(self, request: Request):
+        return self.applications.get(request.path_params["uuid"])
+
+    async def list_applications(self, request: Request):
+        return await self._respond(request, list(self.applications.values()))
+
+    async def application(self, request: Request):
+        app_info = self._app_or_404(request)
+        if app_info is None:
+            return await self._respond(request, {"message": "Not found"}, 404)
+        if request.method == "PUT":
+            app_info.update(await request.json())
+        return await self._respond(request, app_info)
+
+    async def application_envs(self, request: Request):
+        uuid = request.path_params["uuid"]
+        if uuid not in self.envs:
+            return await self._respond(request, {"message": "Not found"}, 404)
+        if request.method == "PATCH":
+            self.envs[uuid].update((await request.json()).get("data", {}))
+        return await self._respond(request, {"data": self.envs[uuid]})
+
+    async def application_logs(self, request: Request):
+        uuid = request.path_params["uuid"]
+        lines = self.logs.setdefault(uuid, [])
+        # A few new lines per read so log tailing has something to return
+        lines.extend(f"{time.time():.3f} {uuid} request {len(lines) + i}" for i in range(3))
+        del lines[:-1000]
+        wanted = int(request.query_params.get("lines", "100"))
+        return await self._respond(request, {"logs": "\n".join(lines[-wanted:])})
+
+    async def application_action(self, request: Request):
+        if self._app_or_404(request) is None:
+            return await self._respond(request, {"message": "Not found"}, 404)
+        return await self._respond(request, {"message": "ok"})
+
+    async def list_servers(self, request: Request):
+        return await self._respond(request, self.servers)
+
+    async def server(self, request: Request):
+        server = next((s for s in self.servers if s["uuid"] == request.path_params["uuid"]), None)
+        if server is None:
+            return await self._respond(request, {"message": "Not found"}, 404)
+        return await self._respond(request, server)
+
+    async def deploy(self, request: Request):
+        uuid = request.query_params.get("uuid", "")
+        if uuid not in self.applications:
+            return await self._respond(request, {"message": "Not found"}, 404)
+        deployment_uuid = f"dep-{uuid}-{len(self.deployments)}"
+        self.deployments[deployment_uuid] = time.monotonic()
+        return await self._respond(request, {
+            "deployments": [{"message": "Deployment queued", "resource_uuid": uuid,
+                             "deployment_uuid": deployment_uuid}]
+        })
+
+    async def deployment(self, request: Request):
+        started = self.deployments.get(request.path_params["uuid"])
+        if started is None:
+            return await self._respond(request, {"message": "Not found"}, 404)
+        done = time.monotonic() - started >= self.deploy_seconds
+        return await self._respond(request, {
+            "deployment_uuid": request.path_params["uuid"],
+            "status": "finished" if done else "in_progress",
+        })
+
+    def asgi_app(self) -> Starlette:
+        middleware = [Middleware(GZipMiddleware, minimum_size=500)] if self.gzip else []
+        return Starlette(middleware=middleware, routes=[
+            Route("/api/v1/applications", self.list_applications),
+            Route("/api/v1/applications/{uuid}", self.application, methods=["GET", "PUT"]),
+            Route("/api/v1/applications/{uuid}/envs", self.application_envs, methods=["GET", "PATCH"]),
+            Route("/api/v1/applications/{uuid}/logs", self.application_logs),
+            Route("/api/v1/applications/{uuid}/restart", self.application_action, methods=["GET", "POST"]),
+            Route("/api/v1/applications/{uuid}/stop", self.application_action, methods=["GET", "POST"]),
+            Route("/api/v1/servers", self.list_servers),
+            Route("/api/v1/servers/{uuid}", self.server),
+            Route("/api/v1/deploy", self.deploy, methods=["GET", "POST"]),
+            Route("/api/v1/deployments/{uuid}", self.deployment),
+        ])
+
+
+class RunningMock:
+    """A mock served by uvicorn on a background thread"""
+
+    def __init__(self, mock: MockCoolify, host: str, port: int):
+        self.mock = mock
+        self.url = f"http://{host}:{port}"
+        config = uvicorn.Config(mock.asgi_app(), host=host, port=port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def start(self, timeout: float = 10.0) -> "RunningMock":
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Mock Coolify failed to start on {self.url}")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def start_mock(port: int = 18999, host: str = "127.0.0.1", **options) -> RunningMock:
+    """Start a mock Coolify in the background and wait until it accepts requests"""
+    return RunningMock(MockCoolify(**options), host, port).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Coolify API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18999)
+    parser.add_argument("--apps", type=int, default=50, help="applications in the fleet")
+    parser.add_argument("--servers", type=int, default=3, help="servers in the fleet")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="extra random delay, 0..N ms")
+    parser.add_argument("--deploy-seconds", type=float, default=2.0, help="time until a deployment finishes")
+    parser.add_argument("--etags", action="store_true", help="send ETags and answer If-None-Match with 304")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress responses")
+    args = parser.parse_args()
+
+    mock = MockCoolify(args.apps, args.servers, args.latency_ms, args.deploy_seconds, args.jitter_ms,
+                       etags=args.etags, gzip=args.gzip)
+    print(f"Mock Coolify: http://{args.host}:{args.port}/api/v1 "
+          f"({args.apps} apps, {args.servers} servers, {args.latency_ms}+{args.jitter_ms} ms latency)")
+    uvicorn.run(mock.asgi_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the stdio, SSE and streamable HTTP entry points
+
+Launches server_stdio.py and run_server.py against a local mock Coolify
+and measures, from exec:
+- time to a completed MCP initialize
+- time to the first tools/list result
+- time to the first tool result (list_applications)
+plus the per-package import cost of server.py (python -X importtime).
+
+Results are written to benchmarks/results/ as JSON. Pass --baseline to
+compare against an earlier run.
+
+Usage:
+    python benchmarks/startup_bench.py --runs 5
+    python benchmarks/startup_bench.py --baseline benchmarks/results/startup-20260101-120000.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastmcp import Client
+from fastmcp.client.transports import SSETransport, StdioTransport, StreamableHttpTransport
+
+from mock_coolify import start_mock
+
+METRICS = ["initialize_ms", "tools_list_ms", "first_tool_result_ms"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_env(mock_url: str, inventory_db: str, **extra: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "COOLIFY_BASE_URL": mock_url,
+        "COOLIFY_API_TOKEN": "mock-token",
+        "MCP_AUTH_TOKEN": "bench-token",
+        "COOLIFY_INVENTORY_DB": inventory_db,
+    })
+    env.update(extra)
+    return env
+
+
+def elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def measure_session(client: Client, started: float, timings: Dict[str, float]) -> None:
+    """Run the post-initialize steps, recording each against the exec time"""
+    await client.list_tools()
+    timings["tools_list_ms"] = elapsed_ms(started)
+    await client.call_tool("list_applications", {"limit": 20})
+    timings["first_tool_result_ms"] = elapsed_ms(started)
+
+
+async def bench_stdio(env: Dict[str, str]) -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    transport = StdioTransport(
+        sys.executable, [os.path.join(ROOT, "server_stdio.py")], env=env, cwd=ROOT,
+        log_file=Path(os.devnull),
+    )
+    started = time.perf_counter()
+    async with Client(transport) as client:
+        timings["initialize_ms"] = elapsed_ms(started)
+        await measure_session(client, started, timings)
+    return timings
+
+
+async def bench_sse(env: Dict[str, str]) -> Dict[str, float]:
+    return await bench_remote(env, "sse")
+
+
+async def bench_http(env: Dict[str, str]) -> Dict[str, float]:
+    return await bench_remote(env, "http")
+
+
+async def bench_remote(env: Dict[str, str], transport: str, timeout: float = 60.0) -> Dict[str, float]:
+    port = free_port()
+    env = dict(env, MCP_HOST="127.0.0.1", MCP_PORT=str(port), MCP_TRANSPORT=transport)
+    headers = {"Authorization": f"Bearer {env['MCP_AUTH_TOKEN']}"}
+    if transport == "sse":
+        make_transport = lambda: SSETransport(f"http://127.0.0.1:{port}/sse", headers=headers)
+    else:
+        make_transport = lambda: StreamableHttpTransport(f"http://127.0.0.1:{port}/mcp", headers=headers)
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    # New session so run_server.py and any server process it spawns are stopped together
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "run_server.py")],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"run_server.py exited with code {process.returncode}")
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"{transport} server did not come up")
+            try:
+                async with Client(make_transport()) as client:
+                    timings["initialize_ms"] = elapsed_ms(started)
+                    await measure_session(client, started, timings)
+                    return timings
+            except (OSError, RuntimeError) as e:
+                if "initialize_ms" in timings:
+                    raise RuntimeError(f"{transport} session failed: {e}") from e
+                await asyncio.sleep(0.02)
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+
+
+def import_costs(env: Dict[str, str], runs: int = 3) -> Dict[str, object]:
+    """Median per-package self import time for `import server` (ms)"""
+    per_run: List[Dict[str, float]] = []
+    totals: List[float] = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import server"],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+        packages: Dict[str, float] = defaultdict(float)
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            name = name.strip()
+            packages[name.split(".")[0]] += int(self_us) / 1000
+            if name == "server":
+                totals.append(int(cumulative_us) / 1000)
+        per_run.append(packages)
+    names = set().union(*per_run)
+    medians = {name: round(statistics.median(run.get(name, 0.0) for run in per_run), 1) for name in names}
+    top = dict(sorted(medians.items(), key=lambda item: item[1], reverse=True)[:25])
+    return {"server_total_ms": round(statistics.median(totals), 1) if totals else None, "packages_ms": top}
+
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    for metric in METRICS:
+        values = [sample[metric] for sample in samples if metric in sample]
+        if values:
+            summary[metric] = {
+                "median": round(statistics.median(values), 1),
+                "min": min(values),
+                "max": max(values),
+            }
+    return summary
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: Dict, baseline: Optional[Dict]) -> None:
+    print(f"\nStartup benchmark ({report['runs']} runs, git {report['git_revision']})")
+    for transport, summary in report["transports"].items():
+        print(f"\n  {transport}")
+        for metric, values in summary.items():
+            line = f"    {metric:<22} median {values['median']:>8.1f} ms  (min {values['min']:.1f}, max {values['max']:.1f})"
+            before = (baseline or {}).get("transports", {}).get(transport, {}).get(metric)
+            if before:
+                change = values["median"] - before["median"]
+                line += f"  {change:+.1f} ms vs baseline"
+            print(line)
+    imports = report["imports"]
+    print(f"\n  import server: {imports['server_total_ms']} ms")
+    for name, cost in list(imports["packages_ms"].items())[:10]:
+        print(f"    {name:<24} {cost:>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP server startup")
+    parser.add_argument("--runs", type=int, default=5, help="launches per transport")
+    parser.add_argument("--transports", default="stdio,sse", help="comma-separated: stdio,sse,http")
+    parser.add_argument("--apps", type=int, default=200, help="applications in the mock fleet")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mock Coolify response delay")
+    parser.add_argument("--warm-inventory", action="store_true",
+                        help="keep the on-disk inventory cache between launches")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/startup-<timestamp>.json)")
+    args = parser.parse_args()
+
+    mock_port = free_port()
+    mock = start_mock(mock_port, apps=args.apps, latency_ms=args.latency_ms)
+    transports = [t.strip() for t in args.transports.split(",") if t.strip()]
+    runners = {"stdio": bench_stdio, "sse": bench_sse, "http": bench_http}
+
+    samples: Dict[str, List[Dict[str, float]]] = {t: [] for t in transports}
+    with tempfile.TemporaryDirectory() as tmp:
+        inventory_db = os.path.join(tmp, "inventory.sqlite3")
+        env = server_env(mock.url, inventory_db)
+        for transport in transports:
+            for run in range(args.runs):
+                if not args.warm_inventory and os.path.exists(inventory_db):
+                    os.remove(inventory_db)
+                sample = asyncio.run(runners[transport](env))
+                samples[transport].append(sample)
+                print(f"{transport} run {run + 1}: {sample}", file=sys.stderr)
+        imports = import_costs(env)
+    mock.stop()
+
+    report = {
+        "benchmark": "startup",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "mock": {"apps": args.apps, "latency_ms": args.latency_ms, "warm_inventory": args.warm_inventory},
+        "transports": {t: summarize(s) for t, s in samples.items()},
+        "samples": samples,
+        "imports": imports,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report, baseline)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Tool-call throughput benchmark for the stdio (IDE) path
+
+Keeps one server_stdio.py session open and issues thousands of
+tools/call requests (list_applications, get_application_details,
+get_application_logs in turn) against a local mock Coolify. The same
+calls are repeated through two in-process layers, so the per-call cost
+can be split by subtraction:
+
+    direct     the decorated tool functions awaited in-process (our code,
+               including any upstream round trip or cache lookup)
+    in_memory  FastMCP Client(server.app): + argument validation, result
+               serialization and the MCP session, without a pipe
+    stdio      server_stdio.py over pipes: + JSON-RPC framing and the
+               process boundary
+
+The stdio server's RSS is sampled as calls go on, to catch memory that
+grows with the number of calls rather than levelling off (Linux only).
+
+Upstream admission is unlimited by default (COOLIFY_READ_RATE=0) so the
+numbers show CPU cost rather than the rate limiter; --env overrides it.
+The fleet is small so the warmup fills the response cache equally for
+every layer.
+
+Results are written to benchmarks/results/ as JSON.
+
+Usage:
+    python benchmarks/stdio_throughput_bench.py --calls 3000
+    python benchmarks/stdio_throughput_bench.py --calls 10000 --layers stdio --latency-ms 5
+    python benchmarks/stdio_throughput_bench.py --env COOLIFY_CACHE_ENABLED=false
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastmcp import Client
+from fastmcp.client.transports import StdioTransport
+
+from load_bench import latency_summary, tool_arguments
+from mock_coolify import start_mock
+from startup_bench import free_port, git_revision, server_env
+
+TOOLS = ["list_applications", "get_application_details", "get_application_logs"]
+LAYERS = ["direct", "in_memory", "stdio"]
+BENCH_ENV = {"COOLIFY_READ_RATE": "0"}
+
+Call = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+def rss_kb(pid: int) -> Optional[int]:
+    """Resident set size of a process from /proc (None where unavailable)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def find_child(marker: str) -> Optional[int]:
+    """PID of this process's child whose command line contains marker"""
+    me = str(os.getpid())
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = f.read().rsplit(")", 1)[1].split()[1]
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read().decode(errors="replace")
+        except (OSError, IndexError):
+            continue
+        if ppid == me and marker in cmdline:
+            return int(entry)
+    return None
+
+
+async def run_calls(call: Call, args: argparse.Namespace, memory_pid: Optional[int] = None) -> Dict[str, Any]:
+    """Warm up, then issue args.calls calls with args.concurrency in flight"""
+    rng = random.Random(args.seed)
+    plan = [(TOOLS[i % len(TOOLS)], tool_arguments(TOOLS[i % len(TOOLS)], args.apps, 3, rng))
+            for i in range(args.warmup + args.calls)]
+    for tool, arguments in plan[:args.warmup]:
+        await call(tool, arguments)
+
+    latencies: Dict[str, List[float]] = {tool: [] for tool in TOOLS}
+    memory: List[Dict[str, float]] = []
+    sample_every = max(1, args.calls // 20)
+    pending = iter(enumerate(plan[args.warmup:]))
+    errors = 0
+
+    def sample_memory(done: int) -> None:
+        if memory_pid is not None:
+            rss = rss_kb(memory_pid)
+            if rss is not None:
+                memory.append({"calls": done, "rss_kb": rss})
+
+    async def worker() -> None:
+        nonlocal errors
+        for index, (tool, arguments) in pending:
+            started = time.perf_counter()
+            try:
+                result = await call(tool, arguments)
+                if isinstance(result, dict) and "error" in result:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies[tool].append((time.perf_counter() - started) * 1e6)
+            if (index + 1) % sample_every == 0:
+                sample_memory(index + 1)
+
+    sample_memory(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    everything = [value for values in latencies.values() for value in values]
+    result = {
+        "calls": len(everything),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_s": round(len(everything) / elapsed, 1),
+        "mean_us": round(statistics.fmean(everything), 1),
+        # latency_summary labels are ms; these values are microseconds
+        "latency_us": {k.replace("_ms", "_us"): v for k, v in latency_summary(everything).items()},
+        "tools_mean_us": {tool: round(statistics.fmean(v), 1) for tool, v in latencies.items() if v},
+    }
+    if len(memory) >= 2:
+        # Growth over the second half only - caches and pools fill up early on
+        half = memory[len(memory) // 2]
+        last = memory[-1]
+        result["memory"] = {
+            "rss_start_kb": memory[0]["rss_kb"],
+            "rss_end_kb": last["rss_kb"],
+            "growth_kb_per_1k_calls_late": round(
+                (last["rss_kb"] - half["rss_kb"]) / max(1, last["calls"] - half["calls"]) * 1000, 1
+            ),
+            "samples": memory,
+        }
+    return result
+
+
+async def bench_in_process(args: argparse.Namespace, layers: List[str]) -> Dict[str, Dict[str, Any]]:
+    """direct and in_memory share one event loop - server.py's clients are bound to it"""
+    import server
+
+    async def direct(tool: str, arguments: Dict[str, Any]) -> Any:
+        result = await getattr(server, tool)(**arguments)
+        # Tools hand FastMCP a pre-encoded ToolResult (json_codec.json_result)
+        return getattr(result, "structured_content", result)
+
+    results = {}
+    async with Client(server.app) as client:
+        async def in_memory(tool: str, arguments: Dict[str, Any]) -> Any:
+            return (await client.call_tool(tool, arguments, raise_on_error=False)).structured_content
+
+        for layer in layers:
+            results[layer] = await run_calls(direct if layer == "direct" else in_memory, args)
+            print(f"{layer}: {results[layer]['calls_per_s']} calls/s", file=sys.stderr)
+    return results
+
+
+async def bench_stdio(args: argparse.Namespace, env: Dict[str, str]) -> Dict[str, Any]:
+    transport = StdioTransport(
+        sys.executable, [os.path.join(ROOT, "server_stdio.py")], env=env, cwd=ROOT,
+        log_file=Path(os.devnull),
+    )
+    async with Client(transport) as client:
+        async def call(tool: str, arguments: Dict[str, Any]) -> Any:
+            return (await client.call_tool(tool, arguments, raise_on_error=False)).structured_content
+
+        return await run_calls(call, args, memory_pid=find_child("server_stdio.py"))
+
+
+def attribute(results: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+    """Split the mean stdio call into our code, FastMCP and the stdio transport"""
+    if not all(layer in results for layer in LAYERS):
+        return {}
+    direct, in_memory, stdio = (results[layer]["mean_us"] for layer in LAYERS)
+    return {
+        "our_code_us": direct,
+        "fastmcp_us": round(in_memory - direct, 1),
+        "stdio_transport_us": round(stdio - in_memory, 1),
+        "our_code_share": round(direct / stdio, 3) if stdio else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tools/call throughput over stdio")
+    parser.add_argument("--calls", type=int, default=3000, help="measured calls per layer")
+    parser.add_argument("--warmup", type=int, default=150, help="unmeasured calls first")
+    parser.add_argument("--concurrency", type=int, default=1, help="calls in flight at once")
+    parser.add_argument("--layers", default=",".join(LAYERS), help="comma-separated: direct,in_memory,stdio")
+    parser.add_argument("--apps", type=int, default=20, help="applications in the mock fleet")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mock Coolify response delay")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="extra server environment, e.g. COOLIFY_CACHE_ENABLED=false")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/stdio-throughput-<timestamp>.json)")
+    args = parser.parse_args()
+
+    layers = [layer.strip() for layer in args.layers.split(",") if layer.strip()]
+    mock = start_mock(free_port(), apps=args.apps, latency_ms=args.latency_ms)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            extra_env = dict(BENCH_ENV, **dict(item.split("=", 1) for item in args.env))
+            env = server_env(mock.url, os.path.join(tmp, "inventory.sqlite3"), **extra_env)
+            # The in-process layers import server.py, which reads its settings at import time
+            os.environ.update(env)
+            in_process = [layer for layer in layers if layer != "stdio"]
+            if in_process:
+                results.update(asyncio.run(bench_in_process(args, in_process)))
+            if "stdio" in layers:
+                results["stdio"] = asyncio.run(bench_stdio(args, env))
+                print(f"stdio: {results['stdio']['calls_per_s']} calls/s", file=sys.stderr)
+    finally:
+        mock.stop()
+
+    report = {
+        "benchmark": "stdio_throughput",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"calls": args.calls, "warmup": args.warmup, "concurrency": args.concurrency,
+                   "apps": args.apps, "latency_ms": args.latency_ms, "tools": TOOLS,
+                   "env": extra_env},
+        "layers": results,
+        "attribution": attribute(results),
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"stdio-throughput-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nstdio throughput ({args.calls} calls per layer, concurrency {args.concurrency}, "
+          f"git {report['git_revision']})")
+    for layer, result in results.items():
+        latency = result["latency_us"]
+        print(f"  {layer:<10} {result['calls_per_s']:>9.1f} calls/s  mean {result['mean_us']:>8.1f} us  "
+              f"p50 {latency['p50_us']:>8.1f} us  p99 {latency['p99_us']:>8.1f} us  errors {result['errors']}")
+        for tool, mean in result["tools_mean_us"].items():
+            print(f"    {tool:<26} mean {mean:>8.1f} us")
+        if "memory" in result:
+            memory = result["memory"]
+            print(f"    server RSS {memory['rss_start_kb'] / 1024:.1f} -> {memory['rss_end_kb'] / 1024:.1f} MB "
+                  f"({memory['growth_kb_per_1k_calls_late']:+.1f} KB per 1k calls over the second half)")
+    split = report["attribution"]
+    if split:
+        print(f"\n  per stdio call: our code {split['our_code_us']:.1f} us ({split['our_code_share']:.0%}), "
+              f"FastMCP {split['fastmcp_us']:.1f} us, stdio transport {split['stdio_transport_us']:.1f} us")
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
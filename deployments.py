@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Deployment orchestration helpers
+
+DeployScheduler runs a batch of deploy jobs while capping how many are in
+flight overall and per server, and spacing out how quickly new deploys
+are started so a bulk redeploy does not stampede Coolify's build queue.
+A batch can be given a deadline: jobs still queued when it passes are
+reported as not started instead of being run.
+
+DeploymentTracker follows deployments until they finish. Each deployment
+UUID gets exactly one poller no matter how many callers are waiting on
+it, and the poll interval backs off while the status is unchanged.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+DeployJob = Callable[[], Awaitable[Dict[str, Any]]]
+StatusFetcher = Callable[[str], Awaitable[Dict[str, Any]]]
+
+# Coolify deployment states that mean the deployment is still running
+DEPLOYMENT_ACTIVE_STATES = {"queued", "in_progress"}
+
+
+class DeployScheduler:
+    """Concurrency- and rate-limited runner for deploy jobs
+
+    One scheduler is meant to be shared by the whole process so the caps
+    hold across concurrent bulk deploys, not just within one batch.
+    """
+
+    def __init__(self, max_in_flight: int = 4, max_per_server: int = 2, min_interval: float = 0.0):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_per_server = max(1, max_per_server)
+        self.min_interval = max(0.0, min_interval)
+        self._global = asyncio.Semaphore(self.max_in_flight)
+        self._per_server: Dict[str, asyncio.Semaphore] = {}
+        self._pace_lock = asyncio.Lock()
+        self._next_start = 0.0
+        self.in_flight = 0
+
+    def _server_slot(self, server_key: str) -> asyncio.Semaphore:
+        slot = self._per_server.get(server_key)
+        if slot is None:
+            slot = self._per_server[server_key] = asyncio.Semaphore(self.max_per_server)
+        return slot
+
+    async def _pace(self) -> None:
+        """Wait until at least min_interval has passed since the last start"""
+        if not self.min_interval:
+            return
+        async with self._pace_lock:
+            delay = self._next_start - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = time.monotonic() + self.min_interval
+
+    @staticmethod
+    async def _acquire(slot: asyncio.Semaphore, deadline: Optional[float]) -> bool:
+        """Take slot, giving up (False) once the monotonic deadline has passed"""
+        if deadline is None:
+            await slot.acquire()
+            return True
+        try:
+            await asyncio.wait_for(slot.acquire(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def submit(self, server_key: str, job: DeployJob,
+                     deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Run one job once a server slot, a global slot and the pacer allow it
+
+        With a deadline (time.monotonic() based), a job that could not start
+        before it passes is skipped and reported as "not_started".
+        """
+        queued = time.perf_counter()
+        server_slot = self._server_slot(server_key)
+        # Take the per-server slot first so a busy server never holds a global slot
+        if not await self._acquire(server_slot, deadline):
+            return self._not_started(queued)
+        try:
+            if not await self._acquire(self._global, deadline):
+                return self._not_started(queued)
+            try:
+                await self._pace()
+                if deadline is not None and time.monotonic() >= deadline:
+                    return self._not_started(queued)
+                started = time.perf_counter()
+                self.in_flight += 1
+                try:
+                    outcome = await job()
+                except Exception as e:
+                    outcome = {"status": "error", "error": str(e)}
+                finally:
+                    self.in_flight -= 1
+            finally:
+                self._global.release()
+        finally:
+            server_slot.release()
+        outcome["queued_ms"] = round((started - queued) * 1000, 1)
+        outcome["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return outcome
+
+    @staticmethod
+    def _not_started(queued: float) -> Dict[str, Any]:
+        return {"status": "not_started", "queued_ms": round((time.perf_counter() - queued) * 1000, 1)}
+
+    async def run(self, jobs: Iterable[Tuple[str, DeployJob]],
+                  deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Run (server_key, job) pairs and return their outcomes in input order"""
+        return await asyncio.gather(*(self.submit(server_key, job, deadline) for server_key, job in jobs))
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limits and load for diagnostics"""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_per_server": self.max_per_server,
+            "min_interval": self.min_interval,
+        }
+
+
+class _Watch:
+    __slots__ = ("deployment_uuid", "status", "details", "polls", "errors",
+                 "started", "checked", "finished", "first_poll", "done", "task")
+
+    def __init__(self, deployment_uuid: str):
+        self.deployment_uuid = deployment_uuid
+        self.status = "unknown"
+        self.details: Dict[str, Any] = {}
+        self.polls = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self.checked: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.first_poll = asyncio.Event()
+        self.done = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "deployment_uuid": self.deployment_uuid,
+            "status": self.status,
+            "done": self.done.is_set(),
+            "polls": self.polls,
+            "elapsed_s": round((self.finished or now) - self.started, 1),
+            "checked_s_ago": round(now - self.checked, 1) if self.checked is not None else None,
+            "details": self.details,
+        }
+
+
+class DeploymentTracker:
+    """Shared, adaptive-backoff poller for Coolify deployment status"""
+
+    def __init__(self, fetch_status: StatusFetcher, initial_interval: float = 2.0,
+                 max_interval: float = 30.0, backoff: float = 1.5, timeout: float = 1800.0,
+                 max_errors: int = 5, retention: float = 600.0):
+        self.fetch_status = fetch_status
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_errors = max_errors
+        self.retention = retention
+        self._watches: Dict[str, _Watch] = {}
+
+    def track(self, deployment_uuid: str) -> _Watch:
+        """Start following a deployment - a no-op if it is already tracked"""
+        self._evict_finished()
+        watch = self._watches.get(deployment_uuid)
+        if watch is None:
+            watch = self._watches[deployment_uuid] = _Watch(deployment_uuid)
+            watch.task = asyncio.create_task(self._poll(watch))
+        return watch
+
+    async def status(self, deployment_uuid: str) -> Dict[str, Any]:
+        """Latest known status - only touches Coolify the first time a UUID is seen"""
+        watch = self.track(deployment_uuid)
+        await watch.first_poll.wait()
+        return watch.snapshot()
+
+    async def wait(self, deployment_uuid: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Wait until the deployment leaves the queued/in_progress states"""
+        watch = self.track(deployment_uuid)
+        try:
+            await asyncio.wait_for(asyncio.shield(watch.done.wait()), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return watch.snapshot()
+
+    async def _poll(self, watch: _Watch) -> None:
+        interval = self.initial_interval
+        try:
+            while True:
+                result = await self._fetch(watch.deployment_uuid)
+                watch.polls += 1
+                watch.checked = time.monotonic()
+                if "error" in result:
+                    watch.errors += 1
+                    if watch.errors >= self.max_errors:
+                        watch.status = "error"
+                        watch.details = {"error": result["error"]}
+                        break
+                else:
+                    watch.errors = 0
+                    status = result.get("status") or "unknown"
+                    # Any progress resets the backoff; a quiet deployment is polled less often
+                    interval = self.initial_interval if status != watch.status else min(interval * self.backoff, self.max_interval)
+                    watch.status = status
+                    watch.details = result
+                    if status not in DEPLOYMENT_ACTIVE_STATES:
+                        break
+                watch.first_poll.set()
+                if time.monotonic() - watch.started >= self.timeout:
+                    watch.status = "timeout"
+                    break
+                await asyncio.sleep(interval)
+        except Exception as e:
+            watch.status = "error"
+            watch.details = {"error": str(e) or type(e).__name__}
+        finally:
+            # Waiters must never hang, whatever ended the poller (including cancellation)
+            watch.finished = time.monotonic()
+            watch.first_poll.set()
+            watch.done.set()
+
+    async def _fetch(self, deployment_uuid: str) -> Dict[str, Any]:
+        """One status read - a raised exception or a non-dict payload counts as a failed poll"""
+        try:
+            result = await self.fetch_status(deployment_uuid)
+        except Exception as e:
+            return {"error": str(e) or type(e).__name__}
+        if not isinstance(result, dict):
+            return {"error": f"Unexpected deployment status payload: {type(result).__name__}"}
+        return result
+
+    def _evict_finished(self) -> None:
+        now = time.monotonic()
+        expired = [uuid for uuid, watch in self._watches.items()
+                   if watch.finished is not None and now - watch.finished > self.retention]
+        for uuid in expired:
+            del self._watches[uuid]
+
+    async def close(self) -> None:
+        """Stop every poller (called on shutdown)"""
+        tasks = [watch.task for watch in self._watches.values() if watch.task and not watch.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._watches.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of deployments being polled and retained"""
+        active = sum(1 for watch in self._watches.values() if not watch.done.is_set())
+        return {"polling": active, "tracked": len(self._watches)}
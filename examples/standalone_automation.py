@@ -5,6 +5,7 @@ Handles DNS records AND tunnel public hostname routes
 """
 
 import os
+import threading
 import httpx
 import cloudflare
 from dotenv import load_dotenv
@@ -13,17 +14,24 @@ from typing import Dict, Optional
 load_dotenv()
 
 class CoolifyCloudflareAutomation:
+    # Shared by every instance - concurrent read-merge-writes of the tunnel
+    # configuration would drop each other's routes
+    _tunnel_config_lock = threading.Lock()
+    TUNNEL_ROUTE_ATTEMPTS = 3
+    
     def __init__(self):
         self.cf_api_token = os.getenv("CLOUDFLARE_API_TOKEN")
         self.cf_zone_id = os.getenv("CLOUDFLARE_ZONE_ID")
         self.cf_tunnel_id = os.getenv("CLOUDFLARE_TUNNEL_ID")
         self.base_domain = os.getenv("BASE_DOMAIN", "therink.io")
         self.tunnel_domain = os.getenv("COOLIFY_TUNNEL_URL", "https://cloud.therink.io")
+        # Override to run against a stand-in such as benchmarks/mock_cloudflare.py
+        self.cf_api_base_url = os.getenv("CLOUDFLARE_API_BASE_URL", "https://api.cloudflare.com/client/v4").rstrip("/")
         
         if not all([self.cf_api_token, self.cf_zone_id, self.cf_tunnel_id]):
             raise ValueError("Missing required Cloudflare credentials")
             
-        self.cf = cloudflare.Cloudflare(api_token=self.cf_api_token)
+        self.cf = cloudflare.Cloudflare(api_token=self.cf_api_token, base_url=self.cf_api_base_url)
     
     def create_dns_record(self, subdomain: str, target: str = None) -> Dict:
         """Create DNS record pointing to tunnel"""
@@ -60,29 +68,45 @@ class CoolifyCloudflareAutomation:
                 "Authorization": f"Bearer {self.cf_api_token}",
                 "Content-Type": "application/json"
             }
+            url = f"{self.cf_api_base_url}/accounts/{self._get_account_id()}/cfd_tunnel/{self.cf_tunnel_id}/configurations"
             
-            payload = {
-                "hostname": full_domain,
-                "service": service_url
-            }
-            
-            response = httpx.post(
-                f"https://api.cloudflare.com/client/v4/accounts/{self._get_account_id()}/cfd_tunnel/{self.cf_tunnel_id}/configurations",
-                headers=headers,
-                json={"config": {"ingress": [{"hostname": full_domain, "service": service_url}]}}
-            )
+            # The configuration is replaced as a whole, so merge into the current ingress.
+            # Runs in this process take turns; a writer elsewhere can still replace the
+            # config between our read and write, so read it back and merge again if so.
+            with self._tunnel_config_lock:
+                written = False
+                for attempt in range(self.TUNNEL_ROUTE_ATTEMPTS + 1):
+                    current = httpx.get(url, headers=headers).json()
+                    if not current.get("success"):
+                        return {"success": False, "error": f"Could not read tunnel config: {current.get('errors')}"}
+                    config = (current.get("result") or {}).get("config") or {}
+                    ingress = config.get("ingress") or [{"service": "http_status:404"}]
+                    if any(rule.get("hostname") == full_domain for rule in ingress):
+                        return {
+                            "success": True,
+                            "message": (f"Created tunnel route: {full_domain} -> {service_url}" if written
+                                        else f"Tunnel route already exists: {full_domain}"),
+                            "full_domain": full_domain
+                        }
+                    if attempt == self.TUNNEL_ROUTE_ATTEMPTS:
+                        break
+                    # New routes go before the catch-all rule
+                    ingress.insert(len(ingress) - 1, {"hostname": full_domain, "service": service_url})
+                    config["ingress"] = ingress
+                    
+                    response = httpx.put(url, headers=headers, json={"config": config})
+                    if response.status_code not in [200, 201]:
+                        return {
+                            "success": False,
+                            "error": f"Tunnel route creation failed: {response.text}"
+                        }
+                    written = True
             
-            if response.status_code in [200, 201]:
-                return {
-                    "success": True,
-                    "message": f"Created tunnel route: {full_domain} -> {service_url}",
-                    "full_domain": full_domain
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Tunnel route creation failed: {response.text}"
-                }
+            return {
+                "success": False,
+                "error": f"Tunnel route {full_domain} was overwritten by concurrent config updates "
+                         f"{self.TUNNEL_ROUTE_ATTEMPTS} times"
+            }
                 
         except Exception as e:
             return {"success": False, "error": f"Tunnel route failed: {str(e)}"}
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Inventory helpers for Coolify applications and servers
+
+Coolify application objects are large (build settings, compose files,
+health checks...). These helpers trim them down to the fields a client
+asked for before anything is serialized into the model context, and
+filter and page through the (cached) inventory so clients never have to
+pull the whole fleet to find a handful of apps. InventoryStore keeps a
+copy of the inventory on disk for fast cold starts.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import json_codec
+
+# Default view for application listings
+COMPACT_APPLICATION_FIELDS = ["uuid", "name", "status", "fqdn", "server"]
+
+# Passing one of these as the only field returns whole objects
+ALL_FIELDS = {"*", "all"}
+
+# Page sizes for application listings
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+_MISSING = object()
+
+
+def application_server(app_info: Dict) -> Dict:
+    """Best-effort server (name/uuid) an application is deployed to"""
+    destination = app_info.get("destination") or {}
+    server = destination.get("server") or {}
+    return {
+        "uuid": server.get("uuid") or app_info.get("server_uuid"),
+        "name": server.get("name") or app_info.get("server_name"),
+    }
+
+
+def application_project(app_info: Dict) -> Dict:
+    """Best-effort project (name/uuid) an application belongs to"""
+    project = app_info.get("project")
+    if not isinstance(project, dict):
+        environment = app_info.get("environment") or {}
+        project = environment.get("project") if isinstance(environment, dict) else None
+    project = project if isinstance(project, dict) else {}
+    return {
+        "uuid": project.get("uuid") or app_info.get("project_uuid"),
+        "name": project.get("name") or app_info.get("project_name"),
+    }
+
+
+def _matches(value: str, identity: Dict) -> bool:
+    """Case-insensitive match of value against a {uuid, name} pair"""
+    wanted = value.lower()
+    return any(v and v.lower() == wanted for v in identity.values())
+
+
+def filter_applications(apps: Iterable[Dict], name_contains: Optional[str] = None,
+                        status: Optional[str] = None, server: Optional[str] = None,
+                        project: Optional[str] = None) -> List[Dict]:
+    """Applications matching every given filter
+
+    name_contains and status are substring matches (status 'exited' matches
+    'exited:unhealthy'); server and project match a name or UUID exactly.
+    """
+    selected = []
+    for app_info in apps:
+        if name_contains and name_contains.lower() not in (app_info.get("name") or "").lower():
+            continue
+        if status and status.lower() not in (app_info.get("status") or "").lower():
+            continue
+        if server and not _matches(server, application_server(app_info)):
+            continue
+        if project and not _matches(project, application_project(app_info)):
+            continue
+        selected.append(app_info)
+    return selected
+
+
+def _sort_key(app_info: Dict) -> Tuple[str, str]:
+    return ((app_info.get("name") or "").lower(), app_info.get("uuid") or "")
+
+
+def _encode_cursor(key: Tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        name, uuid = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(name), str(uuid)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+
+
+def paginate_applications(apps: Iterable[Dict], limit: Optional[int] = None,
+                          cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """One page of applications ordered by name, plus the cursor for the next page
+
+    Cursors are keyset-based (last name/uuid seen), so apps added or removed
+    between calls do not shift the remaining pages.
+    """
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    ordered = sorted(apps, key=_sort_key)
+    if cursor:
+        after = _decode_cursor(cursor)
+        ordered = [a for a in ordered if _sort_key(a) > after]
+    page = ordered[:limit]
+    next_cursor = _encode_cursor(_sort_key(page[-1])) if len(ordered) > limit else None
+    return page, next_cursor
+
+
+def _lookup(item: Any, path: str) -> Any:
+    """Resolve a dotted path like 'destination.server.name'"""
+    for part in path.split("."):
+        if not isinstance(item, dict) or part not in item:
+            return _MISSING
+        item = item[part]
+    return item
+
+
+def resolve_fields(fields: Optional[Iterable[str]], default: Optional[List[str]]) -> Optional[List[str]]:
+    """Turn a fields argument into a projection list (None means whole objects)"""
+    if fields is None:
+        return default
+    fields = [f.strip() for f in fields if f and f.strip()]
+    if not fields or ALL_FIELDS.intersection(fields):
+        return None
+    return fields
+
+
+def project_application(app_info: Dict, fields: Optional[List[str]]) -> Dict:
+    """Keep only the requested fields; 'server' is the derived server name"""
+    if fields is None:
+        return app_info
+    projected = {}
+    for field in fields:
+        if field == "server" and "server" not in app_info:
+            server = application_server(app_info)
+            projected["server"] = server["name"] or server["uuid"]
+            continue
+        value = _lookup(app_info, field)
+        if value is not _MISSING:
+            projected[field] = value
+    return projected
+
+
+def project_applications(apps: Iterable[Dict], fields: Optional[List[str]]) -> List[Dict]:
+    if fields is None:
+        return list(apps)
+    return [project_application(app_info, fields) for app_info in apps]
+
+
+def inventory_namespace(api_url: str, api_token: Optional[str]) -> str:
+    """Store namespace for one Coolify instance as seen through one API token
+
+    Tokens can be scoped to different teams, so two tokens on the same
+    instance must never share cached listings. Only a short hash of the
+    token is kept, never the token itself.
+    """
+    digest = hashlib.sha256((api_token or "").encode()).hexdigest()[:16]
+    return f"{api_url}#{digest}"
+
+
+class InventoryStore:
+    """SQLite-backed copy of inventory responses that survives restarts
+
+    IDE clients spawn a fresh stdio server for every session. With this
+    store a new process can answer list calls straight from disk while the
+    in-memory cache revalidates against Coolify in the background. Entries
+    carry the wall-clock time they were fetched so their age is known.
+    """
+
+    def __init__(self, path: str, namespace: str, max_age: float = 86400.0):
+        self.path = os.path.expanduser(path)
+        self.namespace = namespace
+        self.max_age = max_age
+        self.errors = 0
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            # Several IDE-spawned servers may share the file
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS inventory ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, body TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+            # Application objects can carry webhook secrets - keep the file private
+            os.chmod(self.path, 0o600)
+            self._initialized = True
+        return conn
+
+    def load_sync(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(value, fetched_at) for key, or None when missing or older than max_age"""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT body, fetched_at FROM inventory WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+            return None
+        if row is None or time.time() - row[1] > self.max_age:
+            return None
+        try:
+            return json_codec.loads(row[0]), row[1]
+        except ValueError:
+            self.errors += 1
+            return None
+
+    def save_sync(self, key: str, value: Any) -> None:
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO inventory (namespace, key, body, fetched_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, json_codec.dumps_str(value), time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+
+    async def load(self, key: str) -> Optional[Tuple[Any, float]]:
+        return await asyncio.to_thread(self.load_sync, key)
+
+    async def save(self, key: str, value: Any) -> None:
+        await asyncio.to_thread(self.save_sync, key, value)
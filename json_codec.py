@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Pluggable JSON codec for upstream responses and tool results
+
+Picks the fastest installed backend - orjson, then msgspec, then the
+standard library - or the one named by MCP_JSON_CODEC (auto, orjson,
+msgspec, json). Both optional packages decode straight from bytes, so an
+upstream body is parsed once without first being turned into a str.
+
+    loads(bytes | str) -> Any       raises ValueError on invalid JSON
+    dumps(obj) -> bytes             compact, UTF-8, unknown types via str()
+    dumps_str(obj) -> str
+
+json_result() wraps a tool so its dict result goes to FastMCP already
+encoded, instead of FastMCP serializing it twice through pydantic.
+"""
+
+import functools
+import json
+import os
+from typing import Any, Callable, List
+
+AUTO_ORDER = ["orjson", "msgspec", "json"]
+
+
+class Codec:
+    def __init__(self, name: str, loads: Callable[[Any], Any], dumps: Callable[[Any], bytes]):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+def _stdlib() -> Codec:
+    return Codec("json", json.loads, _stdlib_dumps)
+
+
+def _orjson() -> Codec:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers beyond 64 bits
+            return _stdlib_dumps(obj)
+
+    return Codec("orjson", orjson.loads, dumps)
+
+
+def _msgspec() -> Codec:
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=str)
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: Any) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return encoder.encode(obj)
+        except (TypeError, OverflowError):
+            return _stdlib_dumps(obj)
+
+    return Codec("msgspec", loads, dumps)
+
+
+_BACKENDS = {"orjson": _orjson, "msgspec": _msgspec, "json": _stdlib}
+
+
+def available_backends() -> List[str]:
+    """Backends that can be loaded in this environment"""
+    names = []
+    for name in AUTO_ORDER:
+        try:
+            _BACKENDS[name]()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def select_codec(preference: str = "auto") -> Codec:
+    """The preferred backend if installed, otherwise the best available one"""
+    order = AUTO_ORDER if preference not in _BACKENDS else [preference] + AUTO_ORDER
+    for name in order:
+        try:
+            return _BACKENDS[name]()
+        except ImportError:
+            continue
+    return _stdlib()
+
+
+CODEC = select_codec(os.getenv("MCP_JSON_CODEC", "auto").strip().lower())
+BACKEND = CODEC.name
+
+
+def loads(data: Any) -> Any:
+    return CODEC.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    return CODEC.dumps(obj)
+
+
+def dumps_str(obj: Any) -> str:
+    return CODEC.dumps(obj).decode()
+
+
+def json_result(fn: Callable) -> Callable:
+    """Hand a tool's dict result to FastMCP pre-encoded with the fast codec
+
+    FastMCP would otherwise render the text content from the dict twice
+    and walk it twice more for structured content. Non-dict results are
+    passed through untouched.
+    """
+    from fastmcp.tools import ToolResult
+    from mcp.types import TextContent
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        result = await fn(*args, **kwargs)
+        if not isinstance(result, dict):
+            return result
+        return ToolResult(content=[TextContent(type="text", text=dumps_str(result))],
+                          structured_content=result)
+
+    return wrapper
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Incremental log tailing on top of Coolify's "last N lines" logs endpoint
+
+Coolify can only return the last N lines of an application's logs, so
+following a build means re-downloading the same text again and again.
+LogTail remembers where each reader stopped and returns only the lines
+that are new since then.
+
+A cursor is "<position>:<window>:<fingerprint>". Position counts the lines
+handed out so far, and fingerprint hashes the last <window> of them. The
+new lines are whatever follows that window in a fresh fetch.
+The cursor is self-contained, so a client can pass it back explicitly
+and any process can continue the tail. The per-session memory is only a
+convenience for clients that do not; it lives in this process unless a
+SqliteCursorStore is given, which lets several workers share it.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Lines hashed into a cursor fingerprint - enough to make accidental matches unlikely
+FINGERPRINT_LINES = 3
+
+
+def _fingerprint(lines: List[str]) -> str:
+    return hashlib.sha1("\n".join(lines).encode("utf-8", "replace")).hexdigest()[:16]
+
+
+def make_cursor(position: int, lines: List[str]) -> str:
+    """Cursor pointing just past the end of lines"""
+    window = lines[-FINGERPRINT_LINES:]
+    return f"{position}:{len(window)}:{_fingerprint(window)}"
+
+
+def parse_cursor(cursor: str) -> Optional[Tuple[int, int, str]]:
+    parts = (cursor or "").split(":")
+    if len(parts) != 3 or not parts[0].isdigit() or not parts[1].isdigit() or not parts[2]:
+        return None
+    return int(parts[0]), int(parts[1]), parts[2]
+
+
+def split_log_lines(logs: Any) -> List[str]:
+    """Normalise a Coolify logs payload (string or list) into lines"""
+    if isinstance(logs, list):
+        return [str(line) for line in logs]
+    if not logs:
+        return []
+    return str(logs).splitlines()
+
+
+def new_lines_since(lines: List[str], cursor: Optional[str]) -> Tuple[List[str], str, bool]:
+    """Return (new_lines, next_cursor, gap) for a fresh fetch of the log tail
+
+    gap is True when the cursor's window is no longer in the fetched lines -
+    more lines were written than were fetched, so some may have been missed.
+    """
+    parsed = parse_cursor(cursor) if cursor else None
+    if parsed is None:
+        return lines, make_cursor(len(lines), lines), False
+
+    position, window, fingerprint = parsed
+    if window == 0:
+        # Nothing was seen yet, so everything is new
+        return lines, make_cursor(position + len(lines), lines), False
+    # Search from the end so a quiet log returns nothing rather than a repeat
+    for end in range(len(lines), window - 1, -1):
+        if _fingerprint(lines[end - window:end]) == fingerprint:
+            fresh = lines[end:]
+            return fresh, make_cursor(position + len(fresh), lines), False
+    return lines, make_cursor(position + len(lines), lines), True
+
+
+class SqliteCursorStore:
+    """Session log cursors in a SQLite file shared by every worker that opens it
+
+    Operations are single-row reads and writes on a WAL database, cheap
+    enough to run inline.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = os.path.expanduser(path)
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS log_cursors ("
+            "session_key TEXT NOT NULL, app_uuid TEXT NOT NULL, cursor TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (session_key, app_uuid))"
+        )
+        self._conn.commit()
+        self._writes = 0
+
+    def get(self, session_key: str, app_uuid: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT cursor FROM log_cursors WHERE session_key = ? AND app_uuid = ?",
+            (session_key, app_uuid),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, session_key: str, app_uuid: str, cursor: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO log_cursors (session_key, app_uuid, cursor, updated_at) VALUES (?, ?, ?, ?)",
+            (session_key, app_uuid, cursor, time.time()),
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            # Trim to the most recently used cursors now and then rather than on every write
+            self._conn.execute(
+                "DELETE FROM log_cursors WHERE rowid NOT IN "
+                "(SELECT rowid FROM log_cursors ORDER BY updated_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class LogTail:
+    """Per-(session, application) log cursors with a bounded memory footprint"""
+
+    def __init__(self, max_entries: int = 1000, store: Optional[SqliteCursorStore] = None):
+        self.max_entries = max_entries
+        self.store = store
+        self._cursors: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+    def get(self, session_key: str, app_uuid: str) -> Optional[str]:
+        if self.store is not None:
+            return self.store.get(session_key, app_uuid)
+        return self._cursors.get((session_key, app_uuid))
+
+    def set(self, session_key: str, app_uuid: str, cursor: str) -> None:
+        if self.store is not None:
+            self.store.set(session_key, app_uuid, cursor)
+            return
+        key = (session_key, app_uuid)
+        self._cursors[key] = cursor
+        self._cursors.move_to_end(key)
+        while len(self._cursors) > self.max_entries:
+            self._cursors.popitem(last=False)
+
+    def advance(self, session_key: Optional[str], app_uuid: str, logs: Any,
+                cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Return only the lines after cursor (or the session's last cursor)
+
+        Callers should fetch FINGERPRINT_LINES more lines than they want back
+        so the previous window is still present; limit trims the result.
+        Without a session_key nothing is remembered - only an explicit cursor
+        continues the tail.
+        """
+        lines = split_log_lines(logs)
+        if session_key is not None:
+            cursor = cursor or self.get(session_key, app_uuid)
+        fresh, next_cursor, gap = new_lines_since(lines, cursor)
+        if session_key is not None:
+            self.set(session_key, app_uuid, next_cursor)
+        if limit is not None:
+            fresh = fresh[-limit:] if limit > 0 else []
+        return {
+            "logs": "\n".join(fresh),
+            "new_lines": len(fresh),
+            "cursor": next_cursor,
+            "gap": gap,
+        }
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics for the MCP server (no client library needed)
+
+Counters, gauges and histograms are kept in memory and rendered in the
+Prometheus text exposition format by REGISTRY.render(), which server.py
+serves at /metrics. Values that already live elsewhere (cache counters,
+in-flight requests) are read at scrape time through collectors rather
+than being copied on every request.
+
+Each worker process keeps its own metrics - with MCP_WORKERS > 1 a scrape
+sees whichever worker answered it.
+"""
+
+import functools
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from tracing import TRACER
+
+# Seconds - from cached reads (~ms) to deploys and fleet scans (tens of seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Sample = (labels, value); a collector returns (name, type, help, samples) families
+Sample = Tuple[Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.label_names, key))
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            # [per-bucket counts (non-cumulative), sum, count]
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[0][i] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        out = []
+        for key, (counts, total, count) in self._values.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                out.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            out.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, count))
+            out.append((f"{self.name}_sum", labels, total))
+            out.append((f"{self.name}_count", labels, count))
+        return out
+
+
+class Registry:
+    """Named metrics plus scrape-time collectors, rendered as Prometheus text"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def _add(self, metric: _Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def add_collector(self, collect: Callable[[], Iterable[Family]]) -> None:
+        """collect() is called on every scrape and returns (name, type, help, samples)"""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for collect in self._collectors:
+            for name, metric_type, help_text, samples in collect():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_CALLS = REGISTRY.counter("mcp_tool_calls_total", "MCP tool invocations", ["tool"])
+TOOL_ERRORS = REGISTRY.counter(
+    "mcp_tool_errors_total", "MCP tool invocations that raised or returned an error", ["tool"]
+)
+TOOL_DURATION = REGISTRY.histogram("mcp_tool_duration_seconds", "MCP tool latency", ["tool"])
+TOOL_IN_FLIGHT = REGISTRY.gauge("mcp_tool_in_flight", "MCP tool invocations currently running", ["tool"])
+
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "upstream_requests_total", "Requests to upstream APIs by outcome",
+    ["service", "method", "endpoint", "status"],
+)
+UPSTREAM_DURATION = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "Upstream API latency per attempt",
+    ["service", "method", "endpoint"],
+)
+UPSTREAM_RESPONSE_BYTES = REGISTRY.counter(
+    "upstream_response_bytes_total", "Upstream response body bytes as received, before decompression",
+    ["service", "method", "endpoint"],
+)
+
+# Path segments kept as-is; anything else (UUIDs, names) becomes {id}
+_STATIC_SEGMENTS = {
+    "applications", "servers", "deploy", "deployments", "envs", "logs", "restart", "stop",
+    "start", "resources", "projects", "services", "databases", "version", "health",
+}
+_ID_SEGMENT = re.compile(r"^[A-Za-z0-9_\-.]+$")
+
+
+def endpoint_template(endpoint: str) -> str:
+    """'/applications/abc123/logs?lines=50' -> '/applications/{id}/logs' (bounded label values)"""
+    path = endpoint.split("?", 1)[0]
+    parts = []
+    for segment in path.split("/"):
+        if segment and segment not in _STATIC_SEGMENTS and _ID_SEGMENT.match(segment):
+            segment = "{id}"
+        parts.append(segment)
+    return "/".join(parts)
+
+
+def observe_upstream(service: str, method: str, endpoint: str, status: Any, seconds: float,
+                     response_bytes: int = 0) -> None:
+    template = endpoint_template(endpoint)
+    UPSTREAM_REQUESTS.inc(service=service, method=method, endpoint=template, status=str(status))
+    UPSTREAM_DURATION.observe(seconds, service=service, method=method, endpoint=template)
+    if response_bytes:
+        UPSTREAM_RESPONSE_BYTES.inc(response_bytes, service=service, method=method, endpoint=template)
+
+
+def instrument_tool(fn: Callable) -> Callable:
+    """Count, time and track in-flight calls of an async tool function
+
+    A tool that returns a dict with an "error" key counts as an error, the
+    same as one that raises. Each call also opens the root span of a trace
+    (see tracing.py) that upstream requests attach to.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        TOOL_CALLS.inc(tool=name)
+        TOOL_IN_FLIGHT.inc(tool=name)
+        started = time.perf_counter()
+        failed = True
+        try:
+            with TRACER.span(f"tool {name}", tool=name) as span:
+                result = await fn(*args, **kwargs)
+                failed = isinstance(result, dict) and "error" in result
+                if failed:
+                    span.set_error(str(result["error"]))
+            return result
+        finally:
+            TOOL_IN_FLIGHT.dec(tool=name)
+            TOOL_DURATION.observe(time.perf_counter() - started, tool=name)
+            if failed:
+                TOOL_ERRORS.inc(tool=name)
+
+    return wrapper
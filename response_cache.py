@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+In-process response cache for read-only Coolify API calls
+
+Entries are served straight from memory while fresh. Once the TTL has
+passed they are still served for a short stale window while a single
+background task refreshes them (stale-while-revalidate). Mutating tools
+invalidate the keys they affect so the next read goes upstream.
+
+An optional persistent store (see inventory.InventoryStore) seeds the
+cache for selected keys when a process starts cold, so the first read is
+answered from disk and refreshed in the background like any stale entry.
+
+SingleFlight deduplicates identical requests that are in flight at the
+same moment, so a burst of callers costs one upstream round trip.
+
+ValidatorStore keeps the ETag/Last-Modified of the last good response per
+endpoint, so a refresh can be a conditional GET: a 304 reply reuses the
+stored value and moves almost no bytes.
+
+Cached and coalesced values are shared between callers - treat them as
+read-only.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Mapping, Optional, Set
+
+
+def is_cacheable(value: Any) -> bool:
+    """Only successful payloads are cached - error dicts always go upstream again"""
+    return not (isinstance(value, dict) and "error" in value)
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until", "refreshing")
+
+    def __init__(self, value: Any, ttl: float, stale_ttl: float):
+        now = time.monotonic()
+        self.value = value
+        self.fresh_until = now + ttl
+        self.stale_until = now + ttl + stale_ttl
+        self.refreshing = False
+
+
+class ResponseCache:
+    """TTL cache with stale-while-revalidate refresh and hit/miss counters"""
+
+    def __init__(self, enabled: bool = True, store: Optional[Any] = None,
+                 persist_keys: Iterable[str] = ()):
+        self.enabled = enabled
+        # store needs async load(key) -> (value, fetched_at) | None and save(key, value)
+        self.store = store
+        self.persist_keys = set(persist_keys)
+        self._entries: Dict[str, _Entry] = {}
+        # Keys already seeded from the store - disk is only consulted once per process
+        self._seeded: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        # Bumped on every invalidation so in-flight fetches never write back stale data
+        self._epoch = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.refreshes = 0
+        self.invalidations = 0
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float = 0.0,
+    ) -> Any:
+        """Return the cached value for key, fetching it on a miss"""
+        if not self.enabled or ttl <= 0:
+            return await fetch()
+
+        entry = self._entries.get(key)
+        if entry is None and self._should_seed(key):
+            entry = await self._seed(key, ttl, stale_ttl)
+        now = time.monotonic()
+        if entry is not None:
+            if now < entry.fresh_until:
+                self.hits += 1
+                return entry.value
+            if now < entry.stale_until:
+                self.stale_hits += 1
+                if not entry.refreshing:
+                    entry.refreshing = True
+                    task = asyncio.create_task(self._refresh(key, fetch, ttl, stale_ttl, entry))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return entry.value
+
+        self.misses += 1
+        epoch = self._epoch
+        value = await fetch()
+        self._store(key, value, ttl, stale_ttl, epoch)
+        return value
+
+    def _should_seed(self, key: str) -> bool:
+        return self.store is not None and key in self.persist_keys and key not in self._seeded
+
+    async def _seed(self, key: str, ttl: float, stale_ttl: float) -> Optional[_Entry]:
+        """Load a persisted value (within the store's max age) into memory"""
+        self._seeded.add(key)
+        epoch = self._epoch
+        loaded = await self.store.load(key)
+        if key in self._entries or epoch != self._epoch:
+            return self._entries.get(key)
+        if loaded is None:
+            return None
+        value, _fetched_at = loaded
+        # Another process may have changed things since - always serve it as stale so it refreshes
+        entry = _Entry(value, 0.0, max(ttl, stale_ttl))
+        self._entries[key] = entry
+        self.disk_hits += 1
+        return entry
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Any]],
+                       ttl: float, stale_ttl: float, entry: _Entry) -> None:
+        epoch = self._epoch
+        try:
+            value = await fetch()
+        except Exception:
+            # Keep serving the stale value until it expires
+            entry.refreshing = False
+            return
+        self.refreshes += 1
+        if not self._store(key, value, ttl, stale_ttl, epoch):
+            entry.refreshing = False
+
+    def _store(self, key: str, value: Any, ttl: float, stale_ttl: float, epoch: int) -> bool:
+        if epoch != self._epoch or not is_cacheable(value):
+            return False
+        self._entries[key] = _Entry(value, ttl, stale_ttl)
+        if self.store is not None and key in self.persist_keys:
+            self._seeded.add(key)
+            task = asyncio.create_task(self.store.save(key, value))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return True
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop the given keys from the cache"""
+        self._epoch += 1
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        self._epoch += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    async def close(self, timeout: float = 2.0) -> None:
+        """Let pending refreshes and disk writes finish, cancelling any that overrun"""
+        if not self._tasks:
+            return
+        _done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for diagnostics"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "refreshes": self.refreshes,
+            "invalidations": self.invalidations,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one upstream round trip
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is in flight await the same task and share its result. The
+    task is shielded so a cancelled caller never cancels it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn once for every concurrent caller with the same key"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _task: self._calls.pop(key, None))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """In-flight and coalesced counters for diagnostics"""
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+
+class Validated:
+    """A stored response body and the validators it was served with"""
+
+    __slots__ = ("value", "etag", "last_modified")
+
+    def __init__(self, value: Any, etag: Optional[str], last_modified: Optional[str]):
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def request_headers(self) -> Dict[str, str]:
+        """Headers that turn a GET into a conditional GET"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ValidatorStore:
+    """Per-endpoint ETag/Last-Modified validators for conditional GETs
+
+    Only successful payloads served with a validator are kept, in a small
+    LRU. Callers must only store keys that their mutations invalidate - a
+    Last-Modified has one-second resolution and could hide a fresh change.
+    """
+
+    def __init__(self, enabled: bool = True, max_entries: int = 256):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Validated]" = OrderedDict()
+        self.stored = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def lookup(self, key: str) -> Optional[Validated]:
+        """The stored response for key, if any"""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: str, headers: Mapping[str, str], value: Any) -> None:
+        """Remember value under the validators in the response headers"""
+        if not self.enabled:
+            return
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if not (etag or last_modified) or not is_cacheable(value):
+            # Nothing to revalidate against - the old validators are stale now
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = Validated(value, etag, last_modified)
+        self._entries.move_to_end(key)
+        self.stored += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def revalidated(self, entry: Validated) -> Any:
+        """Count a 304 reply and hand back the stored value"""
+        self.not_modified += 1
+        return entry.value
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop the given keys so the next read is unconditional"""
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Stored and 304 counters for diagnostics"""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "stored": self.stored,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+        }
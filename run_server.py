@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 """
-Wrapper to run server.py with proper encoding on Windows
-This explicitly starts the FastMCP SSE server instead of relying on
-server.py's __main__ guard (which doesn't run when imported).
+Launcher for the remote (SSE or streamable HTTP) server
+
+Serves FastMCP's ASGI app in-process through uvicorn. With MCP_WORKERS > 1
+uvicorn runs that many worker processes on the same port, each building
+the app from server.create_http_app.
+
+Usage:
+    python run_server.py
+    MCP_TRANSPORT=http MCP_WORKERS=auto python run_server.py   # stateless HTTP, one worker per core
 """
 import sys
 import os
+from typing import Callable, Optional
+
 import uvicorn
+from dotenv import load_dotenv
 
 # Force UTF-8 encoding on Windows
 if sys.platform == "win32":
@@ -16,20 +25,72 @@ if sys.platform == "win32":
     # Set console to UTF-8
     os.system('chcp 65001 > nul')
 
-# Import server module and start the SSE transport directly
-import server
+# Workers import server.py by module name
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+load_dotenv()
+
+MCP_PORT = int(os.getenv("MCP_PORT", "8765"))
+MCP_HOST = os.getenv("MCP_HOST", "0.0.0.0")
+MCP_LOG_LEVEL = os.getenv("MCP_LOG_LEVEL", "info").lower()
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "sse").lower()
+MCP_STATELESS_HTTP = os.getenv("MCP_STATELESS_HTTP", "true").lower() == "true"
+
+
+def resolve_workers(value: Optional[str]) -> int:
+    """MCP_WORKERS as a process count ('auto' means one per CPU core)"""
+    if not value:
+        return 1
+    if value.strip().lower() == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+def main(app_factory: Optional[Callable] = None) -> None:
+    """Serve the remote transport; app_factory avoids re-importing server.py for one worker"""
+    workers = resolve_workers(os.getenv("MCP_WORKERS", "1"))
+    stateless = MCP_TRANSPORT != "sse" and MCP_STATELESS_HTTP
+    if workers > 1 and not stateless:
+        # Sessions live in the worker that created them, but the client's
+        # follow-up requests can land on any worker - they would fail with 404
+        print(f"MCP_WORKERS={workers} ignored: {MCP_TRANSPORT} sessions cannot be shared between workers "
+              "(use MCP_TRANSPORT=http with MCP_STATELESS_HTTP=true), using 1", file=sys.stderr)
+        workers = 1
 
-if __name__ == "__main__":
     print("=" * 60)
-    print("Coolify MCP Server - REMOTE MODE (run_server.py)")
+    if MCP_TRANSPORT == "sse":
+        print("Coolify MCP Server - REMOTE MODE (SSE)")
+    else:
+        print(f"Coolify MCP Server - REMOTE MODE (HTTP, {'stateless' if stateless else 'stateful'})")
     print("=" * 60)
-    print(f"Host: {server.MCP_HOST}")
-    print(f"Port: {server.MCP_PORT}")
-    print("Auth: Enabled")
-    print(f"Local: http://localhost:{server.MCP_PORT}")
+    print(f"Host: {MCP_HOST}")
+    print(f"Port: {MCP_PORT}")
+    print(f"Workers: {workers}")
+    print(f"Local: http://localhost:{MCP_PORT}")
+    if MCP_TRANSPORT == "sse":
+        print(f"SSE Endpoint: http://localhost:{MCP_PORT}/sse")
+    else:
+        print(f"MCP Endpoint: http://localhost:{MCP_PORT}/mcp")
+    print(f"Health: http://localhost:{MCP_PORT}/health")
     print("=" * 60)
 
-    # Start ASGI app - run the server.py main block to create http_app
-    import subprocess
-    import sys
-    subprocess.run([sys.executable, "server.py"], cwd=".")
+    if workers == 1:
+        if app_factory is None:
+            from server import create_http_app as app_factory
+        uvicorn.run(app_factory(), host=MCP_HOST, port=MCP_PORT, log_level=MCP_LOG_LEVEL)
+    else:
+        # Each worker takes its share of the upstream limits (see server.worker_share)
+        replicas = max(1, int(os.getenv("MCP_WORKER_COUNT", "1")))
+        os.environ["MCP_WORKER_COUNT"] = str(replicas * workers)
+        uvicorn.run(
+            "server:create_http_app",
+            factory=True,
+            workers=workers,
+            host=MCP_HOST,
+            port=MCP_PORT,
+            log_level=MCP_LOG_LEVEL,
+        )
+
+
+if __name__ == "__main__":
+    main()
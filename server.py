@@ -4,30 +4,67 @@ Coolify MCP Server - REMOTE VERSION
 Provides HTTP/WebSocket transport for remote access from mobile AI apps
 """
 
-from fastmcp import FastMCP
+from fastmcp import FastMCP, Context
 import httpx
 import json
 import os
-from typing import Dict, List, Optional, Any
+import sys
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-import cloudflare
-import secrets
-import hashlib
-from starlette.applications import Starlette
-from starlette.responses import PlainTextResponse, Response
-from starlette.middleware import Middleware
-from starlette.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.routing import Route, Mount
-import uvicorn
+from response_cache import ResponseCache, SingleFlight, ValidatorStore
+from json_codec import BACKEND as JSON_CODEC, json_result, loads as json_loads
+from metrics import REGISTRY, endpoint_template, instrument_tool, observe_upstream
+from tracing import TRACER
+from upstream import AdmissionClass, AdmissionController, CircuitBreaker, backoff_delay, parse_retry_after
+from step_graph import StepGraph
+from deployments import DeployScheduler, DeploymentTracker
+from log_tail import FINGERPRINT_LINES, LogTail, SqliteCursorStore
+from inventory import (
+    COMPACT_APPLICATION_FIELDS,
+    InventoryStore,
+    application_server,
+    filter_applications,
+    inventory_namespace,
+    paginate_applications,
+    project_application,
+    project_applications,
+    resolve_fields,
+)
+
+# Heavy optional dependencies (cloudflare, starlette) are imported where they are
+# used so stdio servers spawned by IDEs start without paying for them
+if TYPE_CHECKING:
+    import cloudflare
 
 # Load environment variables (dev convenience)
 load_dotenv()
 
+@asynccontextmanager
+async def app_lifespan(_server):
+    """Own the shared upstream clients for the lifetime of the app.
+
+    Some transports enter the lifespan once per session, so the clients are
+    only closed when the last active lifespan exits.
+    """
+    global _lifespan_users
+    _lifespan_users += 1
+    try:
+        yield {}
+    finally:
+        _lifespan_users -= 1
+        if _lifespan_users == 0:
+            await deployment_tracker.close()
+            await response_cache.close()
+            await close_coolify_client()
+            await close_cloudflare_client()
+            await TRACER.close()
+
 # Create the MCP app with HTTP transport capability
-app = FastMCP("Coolify Assistant Remote")
+app = FastMCP("Coolify Assistant Remote", lifespan=app_lifespan)
 
 # Configuration - using Doppler for secrets
 COOLIFY_BASE_URL = os.getenv("COOLIFY_BASE_URL", "http://localhost:8000")
@@ -37,6 +74,8 @@ API_TOKEN = os.getenv("COOLIFY_API_TOKEN")
 CF_API_TOKEN = os.getenv("CLOUDFLARE_API_TOKEN")
 CF_ZONE_ID = os.getenv("CLOUDFLARE_ZONE_ID")
 CF_TUNNEL_ID = os.getenv("CLOUDFLARE_TUNNEL_ID")
+# Point at a stand-in (e.g. benchmarks/mock_cloudflare.py) instead of the real API
+CF_API_BASE_URL = os.getenv("CLOUDFLARE_API_BASE_URL") or None
 BASE_DOMAIN = os.getenv("BASE_DOMAIN", "therink.io")
 
 # Remote access configuration
@@ -44,12 +83,20 @@ MCP_AUTH_TOKEN = os.getenv("MCP_AUTH_TOKEN")
 MCP_PORT = int(os.getenv("MCP_PORT", "8765"))
 MCP_HOST = os.getenv("MCP_HOST", "0.0.0.0")  # Listen on all interfaces
 ALLOWED_ORIGINS = [o.strip() for o in os.getenv("ALLOWED_ORIGINS", "*").split(",")]
+# Remote transport: "sse" (sticky sessions) or "http" (streamable HTTP)
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "sse").lower()
+# Stateless streamable HTTP - any replica/worker can answer any request
+MCP_STATELESS_HTTP = os.getenv("MCP_STATELESS_HTTP", "true").lower() == "true"
+# Optional SQLite file for session state (log cursors) shared between workers
+MCP_STATE_DB = os.getenv("MCP_STATE_DB", "")
 
 # Generate auth token if not set
 if not MCP_AUTH_TOKEN:
+    import secrets
     MCP_AUTH_TOKEN = secrets.token_urlsafe(32)
-    print(f"Generated MCP Auth Token: {MCP_AUTH_TOKEN}")
-    print("Save this token in Doppler: doppler secrets set MCP_AUTH_TOKEN=\"{MCP_AUTH_TOKEN}\"")
+    # stderr - stdout carries the protocol in stdio mode
+    print(f"Generated MCP Auth Token: {MCP_AUTH_TOKEN}", file=sys.stderr)
+    print("Save this token in Doppler: doppler secrets set MCP_AUTH_TOKEN=\"{MCP_AUTH_TOKEN}\"", file=sys.stderr)
 
 # Require Coolify API token to avoid unauthenticated calls failing later
 if not API_TOKEN:
@@ -59,68 +106,424 @@ if not API_TOKEN:
 if os.getenv("USE_TUNNEL", "false").lower() == "true":
     COOLIFY_BASE_URL = os.getenv("COOLIFY_TUNNEL_URL", "https://cloud.therink.io")
 
-async def make_coolify_request(method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
-    """Make authenticated request to Coolify API"""
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
+# Upstream connection pool - one long-lived client shared by every tool call
+COOLIFY_HTTP_TIMEOUT = float(os.getenv("COOLIFY_HTTP_TIMEOUT", "30"))
+# A dead host or tunnel should fail on connect, not after the full read timeout
+COOLIFY_HTTP_CONNECT_TIMEOUT = float(os.getenv("COOLIFY_HTTP_CONNECT_TIMEOUT", "5"))
+COOLIFY_HTTP_MAX_CONNECTIONS = int(os.getenv("COOLIFY_HTTP_MAX_CONNECTIONS", "20"))
+COOLIFY_HTTP_MAX_KEEPALIVE = int(os.getenv("COOLIFY_HTTP_MAX_KEEPALIVE", "10"))
+COOLIFY_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("COOLIFY_HTTP_KEEPALIVE_EXPIRY", "60"))
+# HTTP/2 needs the optional 'h2' package (httpx[http2]); fall back to HTTP/1.1 without it
+COOLIFY_HTTP2 = (
+    os.getenv("COOLIFY_HTTP2", "true").lower() == "true"
+    and importlib.util.find_spec("h2") is not None
+)
+# Compressed responses - httpx decodes brotli only when 'brotli' (or 'brotlicffi') is installed
+COOLIFY_HTTP_COMPRESSION = os.getenv("COOLIFY_HTTP_COMPRESSION", "true").lower() == "true"
+COOLIFY_ACCEPT_ENCODING = "identity"
+if COOLIFY_HTTP_COMPRESSION:
+    COOLIFY_ACCEPT_ENCODING = "gzip, deflate"
+    if any(importlib.util.find_spec(module) is not None for module in ("brotli", "brotlicffi")):
+        COOLIFY_ACCEPT_ENCODING += ", br"
+
+# Built once - the base URL and token never change for the process lifetime
+COOLIFY_API_URL = f"{COOLIFY_BASE_URL}/api/v1"
+COOLIFY_HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+    "Authorization": f"Bearer {API_TOKEN}",
+    "Accept-Encoding": COOLIFY_ACCEPT_ENCODING,
+}
+
+# Read-only response cache (seconds) - stale entries are served while a refresh runs
+COOLIFY_CACHE_ENABLED = os.getenv("COOLIFY_CACHE_ENABLED", "true").lower() == "true"
+COOLIFY_CACHE_TTL_APPLICATIONS = float(os.getenv("COOLIFY_CACHE_TTL_APPLICATIONS", "15"))
+COOLIFY_CACHE_TTL_APPLICATION = float(os.getenv("COOLIFY_CACHE_TTL_APPLICATION", "10"))
+COOLIFY_CACHE_TTL_SERVERS = float(os.getenv("COOLIFY_CACHE_TTL_SERVERS", "60"))
+COOLIFY_CACHE_STALE_TTL = float(os.getenv("COOLIFY_CACHE_STALE_TTL", "60"))
+# Conditional GETs - refreshes send If-None-Match and reuse the stored body on 304
+COOLIFY_CONDITIONAL_GET = os.getenv("COOLIFY_CONDITIONAL_GET", "true").lower() == "true"
+# Only listing and detail reads - the keys invalidate_application_cache drops. Logs and
+# deployment status change on every poll, so storing their bodies would only cost memory
+CONDITIONAL_GET_ENDPOINTS = {"/applications", "/applications/{id}", "/servers", "/servers/{id}"}
+
+# On-disk copy of the inventory so a freshly spawned (stdio) server answers from disk
+# immediately and revalidates in the background
+COOLIFY_INVENTORY_CACHE = os.getenv("COOLIFY_INVENTORY_CACHE", "true").lower() == "true"
+COOLIFY_INVENTORY_DB = os.getenv("COOLIFY_INVENTORY_DB", "~/.cache/coolify-mcp/inventory.sqlite3")
+COOLIFY_INVENTORY_MAX_AGE = float(os.getenv("COOLIFY_INVENTORY_MAX_AGE", "86400"))
+
+inventory_store = (
+    InventoryStore(COOLIFY_INVENTORY_DB, namespace=inventory_namespace(COOLIFY_API_URL, API_TOKEN),
+                   max_age=COOLIFY_INVENTORY_MAX_AGE)
+    if COOLIFY_INVENTORY_CACHE and COOLIFY_INVENTORY_DB
+    else None
+)
+response_cache = ResponseCache(
+    enabled=COOLIFY_CACHE_ENABLED,
+    store=inventory_store,
+    persist_keys=("/applications", "/servers"),
+)
+inflight_requests = SingleFlight()
+response_validators = ValidatorStore(enabled=COOLIFY_CONDITIONAL_GET)
+
+# Processes sharing the upstream limits below - run_server.py multiplies in its
+# uvicorn workers; set it to the replica count when running several replicas
+MCP_WORKER_COUNT = max(1, int(os.getenv("MCP_WORKER_COUNT", "1")))
+
+def worker_share(total: float) -> float:
+    """This process's share of a per-second limit that all workers split (<= 0 stays unlimited)"""
+    return total / MCP_WORKER_COUNT if total > 0 else total
+
+def worker_slots(total: int) -> int:
+    """This process's share of a concurrency limit - never below one slot"""
+    return max(1, total // MCP_WORKER_COUNT)
+
+# Upstream admission control - caps concurrency and request rate per class so
+# bursts from several agents never pile onto Coolify's PHP workers at once.
+# The configured values are totals across all workers.
+COOLIFY_READ_MAX_IN_FLIGHT = worker_slots(int(os.getenv("COOLIFY_READ_MAX_IN_FLIGHT", "8")))
+COOLIFY_READ_RATE = worker_share(float(os.getenv("COOLIFY_READ_RATE", "20")))
+COOLIFY_READ_BURST = max(1.0, worker_share(float(os.getenv("COOLIFY_READ_BURST", "40"))))
+COOLIFY_WRITE_MAX_IN_FLIGHT = worker_slots(int(os.getenv("COOLIFY_WRITE_MAX_IN_FLIGHT", "4")))
+COOLIFY_WRITE_RATE = worker_share(float(os.getenv("COOLIFY_WRITE_RATE", "2")))
+COOLIFY_WRITE_BURST = max(1.0, worker_share(float(os.getenv("COOLIFY_WRITE_BURST", "4"))))
+# 429 handling - requests wait out Retry-After (capped) and are re-sent
+COOLIFY_429_RETRIES = int(os.getenv("COOLIFY_429_RETRIES", "3"))
+COOLIFY_RETRY_AFTER_MAX = float(os.getenv("COOLIFY_RETRY_AFTER_MAX", "60"))
+# Transient failures (connection errors, timeouts, 502/503/504) - reads are retried
+# with jittered exponential backoff; repeated failures open the circuit breaker
+COOLIFY_READ_RETRIES = int(os.getenv("COOLIFY_READ_RETRIES", "2"))
+COOLIFY_RETRY_BACKOFF = float(os.getenv("COOLIFY_RETRY_BACKOFF", "0.2"))
+COOLIFY_RETRY_BACKOFF_MAX = float(os.getenv("COOLIFY_RETRY_BACKOFF_MAX", "2"))
+COOLIFY_BREAKER_THRESHOLD = int(os.getenv("COOLIFY_BREAKER_THRESHOLD", "5"))
+COOLIFY_BREAKER_RESET = float(os.getenv("COOLIFY_BREAKER_RESET", "30"))
+RETRYABLE_STATUS = {502, 503, 504}
+
+coolify_breaker = CircuitBreaker(COOLIFY_BREAKER_THRESHOLD, COOLIFY_BREAKER_RESET)
+
+# Cloudflare API client - async so DNS work never blocks the event loop
+CF_HTTP_TIMEOUT = float(os.getenv("CLOUDFLARE_HTTP_TIMEOUT", "30"))
+CF_MAX_RETRIES = int(os.getenv("CLOUDFLARE_MAX_RETRIES", "2"))
+
+# Fleet-wide diagnostics - applications scanned in parallel
+DIAGNOSE_MAX_CONCURRENCY = int(os.getenv("DIAGNOSE_MAX_CONCURRENCY", "8"))
+
+# Bulk deploys - caps on concurrent deployments and how fast new ones start
+# (totals across workers, like the admission limits)
+DEPLOY_MAX_IN_FLIGHT = worker_slots(int(os.getenv("DEPLOY_MAX_IN_FLIGHT", "4")))
+DEPLOY_MAX_PER_SERVER = worker_slots(int(os.getenv("DEPLOY_MAX_PER_SERVER", "2")))
+DEPLOY_MIN_INTERVAL = float(os.getenv("DEPLOY_MIN_INTERVAL", "0.5")) * MCP_WORKER_COUNT
+DEPLOY_TIMEOUT = float(os.getenv("DEPLOY_TIMEOUT", "1800"))
+# Overall limit on one deploy_many call - whatever has not started by then is skipped
+DEPLOY_BATCH_TIMEOUT = float(os.getenv("DEPLOY_BATCH_TIMEOUT", "600"))
+
+# Deployment tracking - one poller per deployment, backing off while nothing changes
+DEPLOY_POLL_INTERVAL = float(os.getenv("DEPLOY_POLL_INTERVAL", "2"))
+DEPLOY_POLL_MAX_INTERVAL = float(os.getenv("DEPLOY_POLL_MAX_INTERVAL", "30"))
+
+log_tail = LogTail(store=SqliteCursorStore(MCP_STATE_DB) if MCP_STATE_DB else None)
+
+deploy_scheduler = DeployScheduler(DEPLOY_MAX_IN_FLIGHT, DEPLOY_MAX_PER_SERVER, DEPLOY_MIN_INTERVAL)
+deployment_tracker = DeploymentTracker(
+    lambda deployment_uuid: make_coolify_request("GET", f"/deployments/{deployment_uuid}"),
+    initial_interval=DEPLOY_POLL_INTERVAL,
+    max_interval=DEPLOY_POLL_MAX_INTERVAL,
+    timeout=DEPLOY_TIMEOUT,
+)
+
+_coolify_client: Optional[httpx.AsyncClient] = None
+_cloudflare_client: Optional["cloudflare.AsyncCloudflare"] = None
+_lifespan_users = 0
+
+def get_coolify_client() -> httpx.AsyncClient:
+    """Return the shared Coolify client, creating it on first use"""
+    global _coolify_client
+    if _coolify_client is None or _coolify_client.is_closed:
+        _coolify_client = httpx.AsyncClient(
+            base_url=COOLIFY_API_URL,
+            headers=COOLIFY_HEADERS,
+            http2=COOLIFY_HTTP2,
+            timeout=httpx.Timeout(COOLIFY_HTTP_TIMEOUT, connect=COOLIFY_HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=COOLIFY_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=COOLIFY_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=COOLIFY_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _coolify_client
+
+async def close_coolify_client() -> None:
+    """Close the shared Coolify client and its pooled connections"""
+    global _coolify_client
+    if _coolify_client is not None:
+        client, _coolify_client = _coolify_client, None
+        await client.aclose()
+
+def is_read_request(method: str, endpoint: str) -> bool:
+    """True for idempotent reads - Coolify triggers deployments with GET /deploy"""
+    return method == "GET" and endpoint.split("?", 1)[0] != "/deploy"
+
+upstream_admission = AdmissionController(
+    {
+        "read": AdmissionClass("read", COOLIFY_READ_MAX_IN_FLIGHT, COOLIFY_READ_RATE, COOLIFY_READ_BURST),
+        "write": AdmissionClass("write", COOLIFY_WRITE_MAX_IN_FLIGHT, COOLIFY_WRITE_RATE, COOLIFY_WRITE_BURST),
+    },
+    lambda method, endpoint: "read" if is_read_request(method, endpoint) else "write",
+)
+
+def _decode_coolify_response(response: httpx.Response) -> Dict:
+    """Decoded body of a 2xx response, an error dict for anything else
+
+    Coolify's own error bodies ({"message": "Unauthenticated."}) have no
+    "error" key - passed through as-is they would be cached and persisted
+    like real data.
+    """
+    # Parse the raw bytes once - no intermediate str
+    body = response.content
+    if response.is_success:
+        if not body:
+            return {}
+        try:
+            return json_loads(body)
+        except ValueError:
+            return {"error": f"HTTP {response.status_code}: {response.text[:200]}"}
+    try:
+        payload = json_loads(body) if body else None
+    except ValueError:
+        payload = None
+    message = (payload.get("message") or payload.get("error")) if isinstance(payload, dict) else None
+    return {
+        "error": f"HTTP {response.status_code}: {message or response.text[:200] or response.reason_phrase}",
+        "status_code": response.status_code,
     }
-    
-    if API_TOKEN:
-        headers["Authorization"] = f"Bearer {API_TOKEN}"
-    
-    url = f"{COOLIFY_BASE_URL}/api/v1{endpoint}"
-    
-    async with httpx.AsyncClient() as client:
+
+async def _send_coolify_request(method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
+    if not coolify_breaker.allow():
+        return {"error": f"Coolify is unavailable - failing fast, next attempt in {coolify_breaker.retry_in():.0f}s"}
+    client = get_coolify_client()
+    admission = upstream_admission.for_request(method, endpoint)
+    # Only idempotent reads are retried on failure - a repeated deploy is not harmless
+    read = is_read_request(method, endpoint)
+    retries = COOLIFY_READ_RETRIES if read else 0
+    # A read we have validators for goes out as a conditional GET
+    conditional = read and endpoint_template(endpoint) in CONDITIONAL_GET_ENDPOINTS
+    validated = response_validators.lookup(endpoint) if conditional else None
+    headers = validated.request_headers() if validated is not None else None
+    failures = throttles = 0
+    while True:
         try:
-            response = await client.request(method, url, headers=headers, json=data, timeout=30)
-            return response.json() if response.text else {}
+            with TRACER.span(f"coolify {method} {endpoint_template(endpoint)}", service="coolify",
+                             method=method, endpoint=endpoint,
+                             attempt=failures + throttles + 1) as span:
+                queued = time.perf_counter()
+                async with admission.slot():
+                    started = time.perf_counter()
+                    span.set_attribute("admission_wait_ms", round((started - queued) * 1000, 3))
+                    try:
+                        response = await client.request(method, endpoint, json=data, headers=headers)
+                    except Exception:
+                        observe_upstream("coolify", method, endpoint, "error", time.perf_counter() - started)
+                        raise
+                    observe_upstream("coolify", method, endpoint, response.status_code,
+                                     time.perf_counter() - started, response.num_bytes_downloaded)
+                span.set_attribute("status_code", response.status_code)
+                span.set_attribute("response_bytes", response.num_bytes_downloaded)
+                if response.status_code >= 400:
+                    span.set_error(f"HTTP {response.status_code}")
         except Exception as e:
-            return {"error": str(e)}
+            coolify_breaker.record_failure()
+            transient = isinstance(e, httpx.TransportError)
+            if transient and failures < retries and coolify_breaker.state == "closed":
+                failures += 1
+                await asyncio.sleep(backoff_delay(failures, COOLIFY_RETRY_BACKOFF, COOLIFY_RETRY_BACKOFF_MAX))
+                continue
+            return {"error": str(e) or type(e).__name__}
+
+        if response.status_code in RETRYABLE_STATUS:
+            coolify_breaker.record_failure()
+            if failures < retries and coolify_breaker.state == "closed":
+                failures += 1
+                await asyncio.sleep(backoff_delay(failures, COOLIFY_RETRY_BACKOFF, COOLIFY_RETRY_BACKOFF_MAX))
+                continue
+            return _decode_coolify_response(response)
+
+        # Anything else - including 429 - means Coolify is up
+        coolify_breaker.record_success()
+        if response.status_code == 304 and validated is not None:
+            return response_validators.revalidated(validated)
+        if response.status_code != 429:
+            result = _decode_coolify_response(response)
+            if conditional and response.status_code == 200:
+                response_validators.store(endpoint, response.headers, result)
+            return result
+        # Rejected before any work was done, so re-sending is safe even for deploys
+        retry_after = parse_retry_after(response.headers.get("retry-after"), maximum=COOLIFY_RETRY_AFTER_MAX)
+        admission.pause(retry_after)
+        if throttles >= COOLIFY_429_RETRIES:
+            return {"error": "Coolify rate limit exceeded (HTTP 429)", "retry_after": retry_after}
+        throttles += 1
+
+async def make_coolify_request(method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
+    """Make authenticated request to Coolify API
+
+    Concurrent identical reads share one upstream round trip and one decode.
+    """
+    if is_read_request(method, endpoint):
+        return await inflight_requests.do(
+            (method, endpoint), lambda: _send_coolify_request(method, endpoint)
+        )
+    return await _send_coolify_request(method, endpoint, data)
+
+async def cached_coolify_get(endpoint: str, ttl: float) -> Any:
+    """GET an endpoint through the response cache"""
+    return await response_cache.get_or_fetch(
+        endpoint,
+        lambda: make_coolify_request("GET", endpoint),
+        ttl,
+        COOLIFY_CACHE_STALE_TTL,
+    )
+
+def invalidate_application_cache(app_uuid: str) -> None:
+    """Drop cached reads that a change to app_uuid makes stale"""
+    keys = ("/applications", f"/applications/{app_uuid}")
+    response_cache.invalidate(*keys)
+    response_validators.invalidate(*keys)
+
+def get_cloudflare_client() -> "cloudflare.AsyncCloudflare":
+    """Return the shared async Cloudflare client, creating it on first use"""
+    global _cloudflare_client
+    if _cloudflare_client is None:
+        import cloudflare
+        _cloudflare_client = cloudflare.AsyncCloudflare(
+            api_token=CF_API_TOKEN,
+            base_url=CF_API_BASE_URL,
+            timeout=CF_HTTP_TIMEOUT,
+            max_retries=CF_MAX_RETRIES,
+        )
+    return _cloudflare_client
+
+async def close_cloudflare_client() -> None:
+    """Close the shared Cloudflare client and its pooled connections"""
+    global _cloudflare_client
+    if _cloudflare_client is not None:
+        client, _cloudflare_client = _cloudflare_client, None
+        await client.close()
+
+def _session_key(ctx: Optional[Context]) -> Optional[str]:
+    """Stable per-client key for session-scoped state
+
+    HTTP transports carry a session id on every request (the mcp-session-id
+    header, or ?session_id= for SSE). A stdio process serves a single client.
+    Stateless HTTP requests have no session, so None - nothing is remembered
+    for them and clients pass state (e.g. log cursors) back explicitly.
+    """
+    try:
+        request = ctx.request_context.request if ctx else None
+    except Exception:
+        request = None
+    if request is not None:
+        session_id = request.headers.get("mcp-session-id") or request.query_params.get("session_id")
+        if session_id:
+            return session_id
+        return None
+    return "local"
 
 # ==================== INTERNAL HELPERS (do NOT decorate) ====================
 # These helpers contain the actual implementation logic. Tools should call
 # these helpers instead of calling other decorated tools to avoid
 # 'FunctionTool object is not callable' errors from FastMCP wrappers.
 
-async def _list_applications_impl() -> Dict:
-    result = await make_coolify_request("GET", "/applications")
+async def _list_applications_impl(fields: Optional[List[str]] = None) -> Dict:
+    result = await cached_coolify_get("/applications", COOLIFY_CACHE_TTL_APPLICATIONS)
     if isinstance(result, list):
-        return {"applications": result, "count": len(result)}
+        return {"applications": project_applications(result, fields), "count": len(result)}
     return result
 
-async def _get_application_details_impl(app_uuid: str) -> Dict:
-    return await make_coolify_request("GET", f"/applications/{app_uuid}")
+async def _search_applications_impl(fields: Optional[List[str]] = None, status: Optional[str] = None,
+                                    server: Optional[str] = None, name_contains: Optional[str] = None,
+                                    project: Optional[str] = None, limit: Optional[int] = None,
+                                    cursor: Optional[str] = None) -> Dict:
+    listing = await _list_applications_impl()
+    if "applications" not in listing:
+        return listing
+    matching = filter_applications(listing["applications"], name_contains, status, server, project)
+    if limit is None and not cursor:
+        # No paging asked for - every match, as list_applications has always returned
+        page, next_cursor = matching, None
+    else:
+        try:
+            page, next_cursor = paginate_applications(matching, limit, cursor)
+        except ValueError as e:
+            return {"error": str(e)}
+    return {
+        "applications": project_applications(page, fields),
+        "count": len(page),
+        "total": len(matching),
+        "next_cursor": next_cursor
+    }
+
+async def _get_application_details_impl(app_uuid: str, fields: Optional[List[str]] = None) -> Dict:
+    result = await cached_coolify_get(f"/applications/{app_uuid}", COOLIFY_CACHE_TTL_APPLICATION)
+    if fields is None or not isinstance(result, dict) or "error" in result:
+        return result
+    if isinstance(result.get("data"), dict):
+        return {**result, "data": project_application(result["data"], fields)}
+    return project_application(result, fields)
 
 async def _deploy_application_impl(app_uuid: str, force_rebuild: bool = False) -> Dict:
     endpoint = f"/deploy?uuid={app_uuid}"
     if force_rebuild:
         endpoint += "&force=true"
-    return await make_coolify_request("GET", endpoint)
+    result = await make_coolify_request("GET", endpoint)
+    invalidate_application_cache(app_uuid)
+    # Start following the deployment right away so watchers share one poller
+    deployment_uuid = _deployment_uuid(result)
+    if deployment_uuid:
+        deployment_tracker.track(deployment_uuid)
+    return result
 
 async def _get_application_environment_impl(app_uuid: str) -> Dict:
     return await make_coolify_request("GET", f"/applications/{app_uuid}/envs")
 
 async def _update_application_environment_impl(app_uuid: str, env_vars: Dict[str, str]) -> Dict:
-    return await make_coolify_request("PATCH", f"/applications/{app_uuid}/envs", {"data": env_vars})
+    result = await make_coolify_request("PATCH", f"/applications/{app_uuid}/envs", {"data": env_vars})
+    invalidate_application_cache(app_uuid)
+    return result
 
-async def _get_application_logs_impl(app_uuid: str, lines: int = 100) -> Dict:
-    return await make_coolify_request("GET", f"/applications/{app_uuid}/logs?lines={lines}")
+async def _get_application_logs_impl(app_uuid: str, lines: int = 100, follow: bool = False,
+                                     cursor: Optional[str] = None, session_key: Optional[str] = "local") -> Dict:
+    tailing = follow or bool(cursor)
+    # When tailing, over-fetch a little so the previous cursor window is still in range
+    fetch_lines = lines + FINGERPRINT_LINES if tailing else lines
+    result = await make_coolify_request("GET", f"/applications/{app_uuid}/logs?lines={fetch_lines}")
+    if not isinstance(result, dict) or "error" in result:
+        return result
+    if tailing:
+        tail = log_tail.advance(session_key, app_uuid, result.get("logs"), cursor, limit=lines)
+        return {"app_uuid": app_uuid, **tail}
+    # Full fetch - remember the position so a later follow call only returns new lines
+    tail = log_tail.advance(session_key, app_uuid, result.get("logs"))
+    return {**result, "cursor": tail["cursor"]}
 
 async def _restart_application_impl(app_uuid: str) -> Dict:
-    return await make_coolify_request("POST", f"/applications/{app_uuid}/restart")
+    result = await make_coolify_request("POST", f"/applications/{app_uuid}/restart")
+    invalidate_application_cache(app_uuid)
+    return result
 
 async def _stop_application_impl(app_uuid: str) -> Dict:
-    return await make_coolify_request("POST", f"/applications/{app_uuid}/stop")
+    result = await make_coolify_request("POST", f"/applications/{app_uuid}/stop")
+    invalidate_application_cache(app_uuid)
+    return result
 
 async def _list_servers_impl() -> Dict:
-    result = await make_coolify_request("GET", "/servers")
+    result = await cached_coolify_get("/servers", COOLIFY_CACHE_TTL_SERVERS)
     if isinstance(result, list):
         return {"servers": result, "count": len(result)}
     return result
 
 async def _get_server_details_impl(server_uuid: str) -> Dict:
-    return await make_coolify_request("GET", f"/servers/{server_uuid}")
+    return await cached_coolify_get(f"/servers/{server_uuid}", COOLIFY_CACHE_TTL_SERVERS)
 
 async def _get_server_resources_impl(server_uuid: str) -> Dict:
     server_info = await _get_server_details_impl(server_uuid)
@@ -136,6 +539,253 @@ async def _get_server_resources_impl(server_uuid: str) -> Dict:
     }
     return resources
 
+def _servers_from(payload: Any) -> List[Dict]:
+    """Server list from a raw GET /servers payload - a list or {'data': [...]}"""
+    if isinstance(payload, list):
+        return payload
+    return payload.get("data", [])
+
+async def _deploy_to_server_impl(app_uuid: str, server_name_or_uuid: str, force_rebuild: bool = False,
+                                 servers: Optional[List[Dict]] = None) -> Dict:
+    if servers is None:
+        # Fresh read - reachability must be current (callers passing servers read them fresh too)
+        servers_response = await make_coolify_request("GET", "/servers")
+        
+        if "error" in servers_response:
+            return {"error": f"Failed to get servers list: {servers_response['error']}"}
+        
+        servers = _servers_from(servers_response)
+    target_server = None
+    
+    # Try to find server by name or UUID
+    for server in servers:
+        if server.get("uuid") == server_name_or_uuid or server.get("name") == server_name_or_uuid:
+            target_server = server
+            break
+    
+    if not target_server:
+        available_servers = [f"{s.get('name')} ({s.get('uuid')})" for s in servers]
+        return {
+            "error": f"Server '{server_name_or_uuid}' not found",
+            "available_servers": available_servers
+        }
+    
+    # Check if server is reachable
+    server_status = target_server.get("status")
+    if server_status != "reachable":
+        return {
+            "error": f"Server '{target_server.get('name')}' is not reachable (status: {server_status})",
+            "server_uuid": target_server.get("uuid")
+        }
+    
+    # Get application details to update destination
+    app_details = await _get_application_details_impl(app_uuid)
+    if "error" in app_details:
+        return {"error": f"Failed to get application details: {app_details.get('error')}"}
+    
+    # Update application destination (if Coolify API supports it)
+    # Note: The exact endpoint may vary depending on Coolify version
+    update_result = await make_coolify_request(
+        "PUT", 
+        f"/applications/{app_uuid}",
+        {"destination_uuid": target_server.get("uuid")}
+    )
+    invalidate_application_cache(app_uuid)
+    
+    # Now deploy the application
+    deploy_result = await _deploy_application_impl(app_uuid, force_rebuild)
+    
+    return {
+        "success": "error" not in deploy_result,
+        "server_name": target_server.get("name"),
+        "server_uuid": target_server.get("uuid"),
+        "app_uuid": app_uuid,
+        "deployment": deploy_result,
+        "message": f"Deployed to {target_server.get('name')}"
+    }
+
+async def _create_dns_record_impl(subdomain: str, target: str = "cloud.therink.io",
+                                  record_type: str = "CNAME") -> Dict:
+    if not CF_API_TOKEN or not CF_ZONE_ID:
+        return {"error": "Cloudflare API token and Zone ID required"}
+    
+    started = time.perf_counter()
+    status = "error"
+    try:
+        full_domain = f"{subdomain}.{BASE_DOMAIN}"
+        
+        with TRACER.span("cloudflare POST /zones/{id}/dns_records", service="cloudflare",
+                         method="POST", record_type=record_type, name=full_domain) as span:
+            try:
+                result = await get_cloudflare_client().dns.records.create(
+                    zone_id=CF_ZONE_ID,
+                    type=record_type,
+                    name=full_domain,
+                    content=target,
+                    ttl=1
+                )
+            except Exception as e:
+                span.set_error(str(e))
+                raise
+        status = 200
+        
+        return {
+            "success": True,
+            "message": f"Created {record_type} record: {full_domain} -> {target}",
+            "record_id": result.id,
+            "full_domain": full_domain
+        }
+    except Exception as e:
+        status = getattr(e, "status_code", "error")
+        return {"error": f"Failed to create DNS record: {str(e)}"}
+    finally:
+        observe_upstream("cloudflare", "POST", "/zones/{id}/dns_records", status, time.perf_counter() - started)
+
+async def _diagnose_tunnel_issues_impl(app_uuid: str) -> Dict:
+    issues = []
+    recommendations = []
+    errors = []
+    
+    app_details, env_vars = await asyncio.gather(
+        _get_application_details_impl(app_uuid),
+        _get_application_environment_impl(app_uuid),
+    )
+    
+    # A read that failed proves nothing either way - report it, never treat it as healthy
+    if "error" in app_details:
+        errors.append(f"Failed to get application details: {app_details['error']}")
+    if "error" in env_vars:
+        errors.append(f"Failed to get environment variables: {env_vars['error']}")
+    
+    if "data" in env_vars:
+        env_data = env_vars["data"]
+        
+        localhost_refs = []
+        for key, value in env_data.items():
+            if isinstance(value, str) and ("localhost" in value or "127.0.0.1" in value):
+                localhost_refs.append(f"{key}: {value}")
+        
+        if localhost_refs:
+            issues.append("🚨 Found localhost references in environment variables")
+            recommendations.append("Replace localhost URLs with your tunnel domain")
+            recommendations.append(f"Affected variables: {', '.join([ref.split(':')[0] for ref in localhost_refs])}")
+    
+    if "data" in app_details:
+        status = app_details["data"].get("status", "unknown")
+        if status != "running":
+            issues.append(f"⚠️  Application is not running (status: {status})")
+            recommendations.append("Deploy or restart the application")
+    
+    return {
+        "issues": issues,
+        "recommendations": recommendations,
+        "errors": errors,
+        "has_issues": len(issues) > 0 or len(errors) > 0
+    }
+
+async def _diagnose_fleet_tunnel_issues_impl(max_concurrency: int = DIAGNOSE_MAX_CONCURRENCY) -> Dict:
+    listing = await _list_applications_impl()
+    if "error" in listing:
+        return {"error": f"Failed to list applications: {listing['error']}"}
+    apps = [a for a in listing.get("applications", listing.get("data", [])) if a.get("uuid")]
+    
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    
+    async def diagnose(app_info: Dict) -> Dict:
+        async with semaphore:
+            report = await _diagnose_tunnel_issues_impl(app_info["uuid"])
+        return {"uuid": app_info["uuid"], "name": app_info.get("name"), **report}
+    
+    reports = await asyncio.gather(*(diagnose(a) for a in apps))
+    with_issues = [r for r in reports if r["issues"]]
+    failed = [{"uuid": r["uuid"], "name": r["name"], "errors": r["errors"]} for r in reports if r["errors"]]
+    
+    return {
+        "scanned": len(reports),
+        "apps_with_issues": len(with_issues),
+        "apps_failed": len(failed),
+        "healthy_apps": [r["name"] or r["uuid"] for r in reports if not r["has_issues"]],
+        "results": with_issues,
+        "failed": failed,
+        "has_issues": len(with_issues) > 0 or len(failed) > 0
+    }
+
+def _deployment_uuid(deploy_result: Dict) -> Optional[str]:
+    """Pull the deployment UUID out of a /deploy response"""
+    deployments = deploy_result.get("deployments") or []
+    return deployments[0].get("deployment_uuid") if deployments else None
+
+async def _get_deployment_status_impl(deployment_uuid: str, wait: bool = False,
+                                     timeout: float = DEPLOY_TIMEOUT) -> Dict:
+    if wait:
+        return await deployment_tracker.wait(deployment_uuid, timeout)
+    return await deployment_tracker.status(deployment_uuid)
+
+async def _deploy_many_impl(app_uuids: Optional[List[str]] = None, name_contains: Optional[str] = None,
+                            status: Optional[str] = None, server: Optional[str] = None,
+                            force_rebuild: bool = False, wait_for_completion: bool = True,
+                            timeout: Optional[float] = None) -> Dict:
+    if not (app_uuids or name_contains or status or server):
+        return {"error": "Pass app_uuids or at least one filter (name_contains, status, server)"}
+    
+    # Fresh read - a cached (or disk-seeded) list could redeploy the wrong apps
+    listing = await make_coolify_request("GET", "/applications")
+    if isinstance(listing, dict) and "error" in listing:
+        return {"error": f"Failed to list applications: {listing['error']}"}
+    apps = listing if isinstance(listing, list) else listing.get("data", [])
+    
+    if app_uuids:
+        by_uuid = {a.get("uuid"): a for a in apps}
+        selected = [by_uuid.get(uuid, {"uuid": uuid}) for uuid in dict.fromkeys(app_uuids)]
+        selected = filter_applications(selected, name_contains, status, server)
+    else:
+        selected = filter_applications(apps, name_contains, status, server)
+    
+    if not selected:
+        return {"error": "No applications matched", "deployed": 0}
+    
+    timeout = DEPLOY_BATCH_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout if timeout > 0 else None
+    
+    def make_job(app_uuid: str):
+        async def job() -> Dict:
+            result = await _deploy_application_impl(app_uuid, force_rebuild)
+            if "error" in result:
+                return {"status": "error", "error": result["error"]}
+            deployment_uuid = _deployment_uuid(result)
+            if not deployment_uuid:
+                return {"status": "error", "error": result.get("message", "No deployment returned")}
+            if not wait_for_completion:
+                return {"status": "triggered", "deployment_uuid": deployment_uuid}
+            # Past the deadline a running deploy is reported as it stands - follow it with get_deployment_status
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            final = await deployment_tracker.wait(deployment_uuid, remaining)
+            return {"status": final["status"], "deployment_uuid": deployment_uuid}
+        return job
+    
+    servers = [application_server(a) for a in selected]
+    outcomes = await deploy_scheduler.run(
+        [(srv["uuid"] or srv["name"] or "unknown", make_job(a["uuid"]))
+         for a, srv in zip(selected, servers)],
+        deadline,
+    )
+    
+    table = [
+        {"app_uuid": a["uuid"], "name": a.get("name"), "server": srv["name"] or srv["uuid"], **outcome}
+        for a, srv, outcome in zip(selected, servers, outcomes)
+    ]
+    summary: Dict[str, int] = {}
+    for row in table:
+        summary[row["status"]] = summary.get(row["status"], 0) + 1
+    
+    return {
+        "deployed": len(table) - summary.get("not_started", 0),
+        "summary": summary,
+        "results": table,
+        "deadline_reached": deadline is not None and time.monotonic() >= deadline,
+        "success": all(row["status"] in ("finished", "triggered") for row in table)
+    }
+
 # ==================== AUTHENTICATION ====================
 # Note: FastMCP doesn't have built-in auth middleware for SSE
 # Authentication should be handled by the reverse proxy (Cloudflare Tunnel)
@@ -144,6 +794,8 @@ async def _get_server_resources_impl(server_uuid: str) -> Dict:
 # ==================== SERVER INFO ====================
 
 @app.tool()
+@json_result
+@instrument_tool
 async def get_server_info() -> Dict:
     """Get information about this MCP server"""
     return {
@@ -159,26 +811,66 @@ async def get_server_info() -> Dict:
             "local": f"http://localhost:{MCP_PORT}",
             "tunnel": f"https://mcp.therink.io"  # You'll configure this
         },
-        "tools_available": 18  # Updated with server management tools
+        "tools_available": 20,  # Includes deploy_many, get_deployment_status and diagnose_fleet_tunnel_issues
+        "cache": response_cache.stats(),
+        "inflight_requests": inflight_requests.stats(),
+        "conditional_requests": response_validators.stats(),
+        "upstream_admission": upstream_admission.stats(),
+        "circuit_breaker": coolify_breaker.stats(),
+        "tracing": TRACER.stats(),
+        "json_codec": JSON_CODEC
     }
 
 # ==================== COOLIFY MANAGEMENT TOOLS ====================
 
 @app.tool()
-async def list_applications() -> Dict:
-    """List all applications in Coolify"""
-    return await _list_applications_impl()
+@json_result
+@instrument_tool
+async def list_applications(
+    fields: Optional[List[str]] = None,
+    status: Optional[str] = None,
+    server: Optional[str] = None,
+    name_contains: Optional[str] = None,
+    project: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Dict:
+    """List applications in Coolify, filtered and paginated server-side
+    
+    Args:
+        fields: Fields to return per application (dotted paths allowed, e.g.
+            'destination.server.name'). Defaults to a compact view of uuid,
+            name, status, fqdn and server. Pass ['*'] for full objects.
+        status: Only apps whose status contains this text (e.g. 'exited')
+        server: Only apps on this server (name or UUID)
+        name_contains: Only apps whose name contains this text
+        project: Only apps in this project (name or UUID)
+        limit: Page size (max 500). Omit it to get every matching application
+            in one response; pages are ordered by name
+        cursor: next_cursor from a previous call to fetch the next page
+            (defaults to pages of 100)
+    """
+    return await _search_applications_impl(
+        resolve_fields(fields, COMPACT_APPLICATION_FIELDS),
+        status, server, name_contains, project, limit, cursor
+    )
 
 @app.tool()
-async def get_application_details(app_uuid: str) -> Dict:
+@json_result
+@instrument_tool
+async def get_application_details(app_uuid: str, fields: Optional[List[str]] = None) -> Dict:
     """Get detailed information about a specific application
     
     Args:
         app_uuid: The UUID of the application
+        fields: Only return these fields (dotted paths allowed). Defaults to
+            the full application object.
     """
-    return await _get_application_details_impl(app_uuid)
+    return await _get_application_details_impl(app_uuid, resolve_fields(fields, None))
 
 @app.tool()
+@json_result
+@instrument_tool
 async def deploy_application(app_uuid: str, force_rebuild: bool = False) -> Dict:
     """Deploy an application
     
@@ -189,6 +881,8 @@ async def deploy_application(app_uuid: str, force_rebuild: bool = False) -> Dict
     return await _deploy_application_impl(app_uuid, force_rebuild)
 
 @app.tool()
+@json_result
+@instrument_tool
 async def get_application_environment(app_uuid: str) -> Dict:
     """Get environment variables for an application
     
@@ -198,6 +892,8 @@ async def get_application_environment(app_uuid: str) -> Dict:
     return await _get_application_environment_impl(app_uuid)
 
 @app.tool()
+@json_result
+@instrument_tool
 async def update_application_environment(app_uuid: str, env_vars: Dict[str, str]) -> Dict:
     """Update environment variables for an application
     
@@ -208,16 +904,27 @@ async def update_application_environment(app_uuid: str, env_vars: Dict[str, str]
     return await _update_application_environment_impl(app_uuid, env_vars)
 
 @app.tool()
-async def get_application_logs(app_uuid: str, lines: int = 100) -> Dict:
+@json_result
+@instrument_tool
+async def get_application_logs(app_uuid: str, lines: int = 100, follow: bool = False,
+                               cursor: Optional[str] = None, ctx: Context = None) -> Dict:
     """Get logs for an application
     
     Args:
         app_uuid: The UUID of the application
         lines: Number of log lines to retrieve (default: 100)
+        follow: Only return lines that are new since the last call for this app
+        cursor: Cursor from a previous call - continue tailing from there
+        
+    Every response includes a cursor. With follow=True the server remembers
+    the last position per app and session, so following a build only
+    returns new lines. Stateless HTTP has no session - pass the cursor back.
     """
-    return await _get_application_logs_impl(app_uuid, lines)
+    return await _get_application_logs_impl(app_uuid, lines, follow, cursor, _session_key(ctx))
 
 @app.tool()
+@json_result
+@instrument_tool
 async def restart_application(app_uuid: str) -> Dict:
     """Restart an application
     
@@ -227,6 +934,8 @@ async def restart_application(app_uuid: str) -> Dict:
     return await _restart_application_impl(app_uuid)
 
 @app.tool()
+@json_result
+@instrument_tool
 async def stop_application(app_uuid: str) -> Dict:
     """Stop an application
     
@@ -238,6 +947,8 @@ async def stop_application(app_uuid: str) -> Dict:
 # ==================== SERVER MANAGEMENT TOOLS ====================
 
 @app.tool()
+@json_result
+@instrument_tool
 async def list_servers() -> Dict:
     """List all servers/destinations configured in Coolify
     
@@ -247,6 +958,8 @@ async def list_servers() -> Dict:
     return await _list_servers_impl()
 
 @app.tool()
+@json_result
+@instrument_tool
 async def get_server_details(server_uuid: str) -> Dict:
     """Get detailed information about a specific server
     
@@ -258,6 +971,8 @@ async def get_server_details(server_uuid: str) -> Dict:
     return await _get_server_details_impl(server_uuid)
 
 @app.tool()
+@json_result
+@instrument_tool
 async def get_server_resources(server_uuid: str) -> Dict:
     """Get resource usage and availability for a server
     
@@ -269,6 +984,8 @@ async def get_server_resources(server_uuid: str) -> Dict:
     return await _get_server_resources_impl(server_uuid)
 
 @app.tool()
+@json_result
+@instrument_tool
 async def deploy_to_server(app_uuid: str, server_name_or_uuid: str, force_rebuild: bool = False) -> Dict:
     """Smart deployment - deploy application to a specific server by name or UUID
     
@@ -283,66 +1000,58 @@ async def deploy_to_server(app_uuid: str, server_name_or_uuid: str, force_rebuil
     3. Deploy the application to that server
     4. Return deployment status
     """
-    # First, try to get all servers
-    servers_response = await make_coolify_request("GET", "/servers")
-    
-    if "error" in servers_response:
-        return {"error": f"Failed to get servers list: {servers_response['error']}"}
-    
-    # Tolerate either a dict payload with 'data' or a raw list
-    if isinstance(servers_response, list):
-        servers = servers_response
-    else:
-        servers = servers_response.get("data", [])
-    target_server = None
-    
-    # Try to find server by name or UUID
-    for server in servers:
-        if server.get("uuid") == server_name_or_uuid or server.get("name") == server_name_or_uuid:
-            target_server = server
-            break
-    
-    if not target_server:
-        available_servers = [f"{s.get('name')} ({s.get('uuid')})" for s in servers]
-        return {
-            "error": f"Server '{server_name_or_uuid}' not found",
-            "available_servers": available_servers
-        }
-    
-    # Check if server is reachable
-    server_status = target_server.get("status")
-    if server_status != "reachable":
-        return {
-            "error": f"Server '{target_server.get('name')}' is not reachable (status: {server_status})",
-            "server_uuid": target_server.get("uuid")
-        }
-    
-    # Get application details to update destination
-    app_details = await _get_application_details_impl(app_uuid)
-    if "error" in app_details:
-        return {"error": f"Failed to get application details: {app_details.get('error')}"}
-    
-    # Update application destination (if Coolify API supports it)
-    # Note: The exact endpoint may vary depending on Coolify version
-    update_result = await make_coolify_request(
-        "PUT", 
-        f"/applications/{app_uuid}",
-        {"destination_uuid": target_server.get("uuid")}
-    )
+    return await _deploy_to_server_impl(app_uuid, server_name_or_uuid, force_rebuild)
+
+@app.tool()
+@json_result
+@instrument_tool
+async def deploy_many(
+    app_uuids: Optional[List[str]] = None,
+    name_contains: Optional[str] = None,
+    status: Optional[str] = None,
+    server: Optional[str] = None,
+    force_rebuild: bool = False,
+    wait_for_completion: bool = True,
+    timeout: Optional[float] = None
+) -> Dict:
+    """Deploy a group of applications through the bulk deploy scheduler
     
-    # Now deploy the application
-    deploy_result = await _deploy_application_impl(app_uuid, force_rebuild)
+    Args:
+        app_uuids: UUIDs of the applications to deploy
+        name_contains: Only deploy applications whose name contains this text
+        status: Only deploy applications whose status contains this text (e.g. 'exited')
+        server: Only deploy applications on this server (name or UUID)
+        force_rebuild: Whether to force rebuild the applications
+        wait_for_completion: Hold each slot until the deployment finishes
+        timeout: Seconds the whole batch may take (default DEPLOY_BATCH_TIMEOUT, 0 for no limit)
+        
+    Deploys are capped overall and per server, and new ones are spaced out.
+    Returns one row per application with its deployment outcome. Apps still
+    queued at the timeout are "not_started"; deploys still running keep
+    their current status and deployment_uuid for get_deployment_status.
+    """
+    return await _deploy_many_impl(app_uuids, name_contains, status, server, force_rebuild,
+                                   wait_for_completion, timeout)
+
+@app.tool()
+@json_result
+@instrument_tool
+async def get_deployment_status(deployment_uuid: str, wait: bool = False, timeout: float = 300) -> Dict:
+    """Get or wait for the status of a Coolify deployment
     
-    return {
-        "success": "error" not in deploy_result,
-        "server_name": target_server.get("name"),
-        "server_uuid": target_server.get("uuid"),
-        "app_uuid": app_uuid,
-        "deployment": deploy_result,
-        "message": f"Deployed to {target_server.get('name')}"
-    }
+    Args:
+        deployment_uuid: The deployment UUID returned by deploy_application
+        wait: Block until the deployment finishes (or the timeout passes)
+        timeout: Maximum seconds to wait when wait is true
+        
+    Deployments are polled server-side with one shared poller per UUID, so
+    repeated or concurrent calls are cheap and do not add upstream load.
+    """
+    return await _get_deployment_status_impl(deployment_uuid, wait, timeout)
 
 @app.tool()
+@json_result
+@instrument_tool
 async def smart_deploy(
     service_name: str,
     app_uuid: str,
@@ -365,16 +1074,17 @@ async def smart_deploy(
     3. Deploy to that server
     4. Report deployment status
     """
-    # Get all servers
-    servers_response = await _list_servers_impl()
+    # Fresh read, shared with the deploy below - selection and the reachability
+    # check must not run on a cached (or disk-seeded) server list
+    servers_response = await make_coolify_request("GET", "/servers")
     if "error" in servers_response:
         return {"error": f"Failed to get servers: {servers_response['error']}"}
     
-    servers = servers_response.get("data", [])
+    servers = _servers_from(servers_response)
     
     # If preferred server specified, use it
     if preferred_server:
-        return await deploy_to_server(app_uuid, preferred_server)
+        return await _deploy_to_server_impl(app_uuid, preferred_server, servers=servers)
     
     # Smart server selection logic
     selected_server = None
@@ -405,7 +1115,7 @@ async def smart_deploy(
         return {"error": "No reachable servers found"}
     
     # Deploy to selected server
-    result = await deploy_to_server(app_uuid, selected_server.get("uuid"))
+    result = await _deploy_to_server_impl(app_uuid, selected_server.get("uuid"), servers=servers)
     
     result["selection_reason"] = {
         "requires_gpu": requires_gpu,
@@ -419,6 +1129,8 @@ async def smart_deploy(
 # ==================== CLOUDFLARE AUTOMATION TOOLS ====================
 
 @app.tool()
+@json_result
+@instrument_tool
 async def create_dns_record(subdomain: str, target: str = "cloud.therink.io", 
                            record_type: str = "CNAME") -> Dict:
     """Create a DNS record in Cloudflare for a subdomain
@@ -428,31 +1140,11 @@ async def create_dns_record(subdomain: str, target: str = "cloud.therink.io",
         target: The target domain/IP (default: 'cloud.therink.io')
         record_type: DNS record type (CNAME, A, etc.)
     """
-    if not CF_API_TOKEN or not CF_ZONE_ID:
-        return {"error": "Cloudflare API token and Zone ID required"}
-    
-    try:
-        cf = cloudflare.Cloudflare(api_token=CF_API_TOKEN)
-        full_domain = f"{subdomain}.{BASE_DOMAIN}"
-        
-        result = cf.dns.records.create(
-            zone_id=CF_ZONE_ID,
-            type=record_type,
-            name=full_domain,
-            content=target,
-            ttl=1
-        )
-        
-        return {
-            "success": True,
-            "message": f"Created {record_type} record: {full_domain} -> {target}",
-            "record_id": result.id,
-            "full_domain": full_domain
-        }
-    except Exception as e:
-        return {"error": f"Failed to create DNS record: {str(e)}"}
+    return await _create_dns_record_impl(subdomain, target, record_type)
 
 @app.tool() 
+@json_result
+@instrument_tool
 async def automate_service_deployment(service_name: str, subdomain: str, 
                                      app_uuid: str, port: int = 8000) -> Dict:
     """FULLY AUTOMATE service deployment with CF tunnel and DNS
@@ -472,42 +1164,57 @@ async def automate_service_deployment(service_name: str, subdomain: str,
     
     full_domain = f"{subdomain}.{BASE_DOMAIN}"
     
+    async def patch_environment(deps: Dict[str, Any]) -> Dict[str, str]:
+        updated_env = {}
+        for key, value in deps["env_read"].get("data", {}).items():
+            if isinstance(value, str):
+                if "localhost:8000" in value:
+                    updated_env[key] = value.replace("localhost:8000", f"https://{full_domain}")
+                elif "http://localhost" in value:
+                    updated_env[key] = value.replace("http://localhost", f"https://{full_domain}")
+        
+        if updated_env:
+            await _update_application_environment_impl(app_uuid, updated_env)
+        return updated_env
+    
+    # DNS does not depend on the app, so it runs alongside the env read/patch.
+    # The deploy waits for the env patch so it picks up the new values.
+    graph = StepGraph()
+    graph.add("env_read", lambda deps: _get_application_environment_impl(app_uuid))
+    graph.add("dns", lambda deps: _create_dns_record_impl(subdomain))
+    graph.add("env_patch", patch_environment, depends_on=["env_read"])
+    graph.add("deploy", lambda deps: _deploy_application_impl(app_uuid), depends_on=["env_patch"])
+    
     try:
-        # Step 1: Create DNS record
-        dns_result = await create_dns_record(subdomain)
+        run = await graph.run()
+        results["timings"] = run.timings()
+        
+        # Step 1: DNS record
+        dns_result = run.results.get("dns") or {"error": run.errors.get("dns")}
         if dns_result.get("success"):
             results["steps"].append(f"✅ Created DNS record: {full_domain}")
         else:
             results["errors"].append(f"❌ DNS creation failed: {dns_result.get('error')}")
         
-        # Step 2: Update application environment if needed
-        try:
-            env_vars = await _get_application_environment_impl(app_uuid)
-            updated_env = {}
-            
-            for key, value in env_vars.get("data", {}).items():
-                if isinstance(value, str):
-                    if "localhost:8000" in value:
-                        updated_env[key] = value.replace("localhost:8000", f"https://{full_domain}")
-                    elif "http://localhost" in value:
-                        updated_env[key] = value.replace("http://localhost", f"https://{full_domain}")
-            
+        # Step 2: Application environment
+        if run.status["env_patch"] == "ok":
+            updated_env = run.results["env_patch"]
             if updated_env:
-                update_result = await _update_application_environment_impl(app_uuid, updated_env)
                 results["steps"].append(f"✅ Updated {len(updated_env)} environment variables")
                 results["updated_vars"] = updated_env
-        except Exception as e:
-            results["errors"].append(f"❌ Environment update failed: {str(e)}")
+        else:
+            env_error = run.errors.get("env_read") or run.errors.get("env_patch")
+            results["errors"].append(f"❌ Environment update failed: {env_error}")
         
-        # Step 3: Trigger deployment
-        try:
-            deploy_result = await _deploy_application_impl(app_uuid)
+        # Step 3: Deployment
+        if run.status["deploy"] == "ok":
+            deploy_result = run.results["deploy"]
             if not deploy_result.get("error"):
                 results["steps"].append("✅ Triggered application deployment")
             else:
                 results["errors"].append(f"❌ Deployment failed: {deploy_result.get('message')}")
-        except Exception as e:
-            results["errors"].append(f"❌ Deployment trigger failed: {str(e)}")
+        else:
+            results["errors"].append(f"❌ Deployment trigger failed: {run.errors.get('deploy')}")
         
         results["success"] = len(results["errors"]) == 0
         results["summary"] = f"""
@@ -518,6 +1225,7 @@ async def automate_service_deployment(service_name: str, subdomain: str,
 
 {len(results['steps'])} steps completed
 {len(results['errors'])} errors occurred
+⏱️  {results['timings']['total_ms']:.0f} ms (critical path: {' → '.join(results['timings']['critical_path'])})
 
 {'✅ FULLY AUTOMATED!' if results['success'] else '⚠️  Manual intervention needed'}
         """
@@ -532,74 +1240,97 @@ async def automate_service_deployment(service_name: str, subdomain: str,
 # ==================== DIAGNOSTIC TOOLS ====================
 
 @app.tool()
+@json_result
+@instrument_tool
 async def diagnose_tunnel_issues(app_uuid: str) -> Dict:
     """Diagnose common CloudFlare tunnel vs localhost issues
     
     Args:
         app_uuid: The UUID of the application to diagnose
     """
-    issues = []
-    recommendations = []
-    
-    app_details = await _get_application_details_impl(app_uuid)
-    env_vars = await _get_application_environment_impl(app_uuid)
+    return await _diagnose_tunnel_issues_impl(app_uuid)
+
+@app.tool()
+@json_result
+@instrument_tool
+async def diagnose_fleet_tunnel_issues(max_concurrency: int = DIAGNOSE_MAX_CONCURRENCY) -> Dict:
+    """Diagnose tunnel vs localhost issues across every application at once
     
-    if "data" in env_vars:
-        env_data = env_vars["data"]
-        
-        localhost_refs = []
-        for key, value in env_data.items():
-            if isinstance(value, str) and ("localhost" in value or "127.0.0.1" in value):
-                localhost_refs.append(f"{key}: {value}")
+    Args:
+        max_concurrency: Maximum number of applications scanned in parallel
         
-        if localhost_refs:
-            issues.append("🚨 Found localhost references in environment variables")
-            recommendations.append("Replace localhost URLs with your tunnel domain")
-            recommendations.append(f"Affected variables: {', '.join([ref.split(':')[0] for ref in localhost_refs])}")
-    
-    if "data" in app_details:
-        status = app_details["data"].get("status", "unknown")
-        if status != "running":
-            issues.append(f"⚠️  Application is not running (status: {status})")
-            recommendations.append("Deploy or restart the application")
-    
-    return {
-        "issues": issues,
-        "recommendations": recommendations,
-        "has_issues": len(issues) > 0
-    }
+    Returns one aggregated report listing only the applications with issues,
+    plus any whose details or environment could not be read ("failed")
+    """
+    return await _diagnose_fleet_tunnel_issues_impl(max_concurrency)
 
 # Main entry point with HTTP transport
+# ==================== HTTP APP ====================
+
+def _collect_runtime_metrics():
+    """Scrape-time view of the caches, limiters and pollers"""
+    cache = response_cache.stats()
+    yield ("coolify_cache_lookups_total", "counter", "Response cache lookups by result",
+           [({"result": "hit"}, cache["hits"]), ({"result": "stale_hit"}, cache["stale_hits"]),
+            ({"result": "miss"}, cache["misses"]), ({"result": "disk_hit"}, cache["disk_hits"])])
+    yield ("coolify_cache_hit_ratio", "gauge", "Share of lookups answered from the cache",
+           [({}, cache["hit_ratio"])])
+    yield ("coolify_cache_entries", "gauge", "Entries in the response cache", [({}, cache["entries"])])
+
+    validators = response_validators.stats()
+    yield ("coolify_not_modified_total", "counter", "Conditional GETs answered 304 from stored validators",
+           [({}, validators["not_modified"])])
+
+    coalescing = inflight_requests.stats()
+    yield ("coolify_singleflight_in_flight", "gauge", "Distinct upstream reads in flight",
+           [({}, coalescing["in_flight"])])
+    yield ("coolify_singleflight_coalesced_total", "counter", "Reads that joined an identical in-flight read",
+           [({}, coalescing["coalesced"])])
+
+    admission = upstream_admission.stats()
+    yield ("coolify_upstream_in_flight", "gauge", "Requests to Coolify in flight per class",
+           [({"class": name}, c["in_flight"]) for name, c in admission.items()])
+    yield ("coolify_upstream_waiting", "gauge", "Requests waiting for admission per class",
+           [({"class": name}, c["waiting"]) for name, c in admission.items()])
+    yield ("coolify_upstream_throttled_total", "counter", "HTTP 429 responses per class",
+           [({"class": name}, c["throttled"]) for name, c in admission.items()])
+
+    breaker = coolify_breaker.stats()
+    yield ("coolify_circuit_state", "gauge", "Circuit breaker state (1 for the current state)",
+           [({"state": state}, 1 if breaker["state"] == state else 0) for state in ("closed", "open", "half_open")])
+
+    yield ("coolify_deployments_polling", "gauge", "Deployments being polled",
+           [({}, deployment_tracker.stats()["polling"])])
+    yield ("coolify_deploys_in_flight", "gauge", "Bulk deploy jobs running",
+           [({}, deploy_scheduler.stats()["in_flight"])])
+
+
+REGISTRY.add_collector(_collect_runtime_metrics)
+
+
+@app.custom_route("/health", methods=["GET"])
+async def health(_request):
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse("ok", status_code=200)
+
+
+@app.custom_route("/metrics", methods=["GET"])
+async def metrics(_request):
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def create_http_app():
+    """ASGI app for the remote transport (MCP_TRANSPORT)
+
+    run_server.py serves it through uvicorn; worker processes build it via
+    the factory string "server:create_http_app".
+    """
+    if MCP_TRANSPORT == "sse":
+        return app.http_app(transport="sse")
+    return app.http_app(transport="http", stateless_http=MCP_STATELESS_HTTP)
+
+
 if __name__ == "__main__":
-    # Build ASGI wrapper with health, auth, and CORS
-    async def health(_request: Request):
-        return PlainTextResponse("ok", status_code=200)
-
-    class BearerAuthMiddleware(BaseHTTPMiddleware):
-        async def dispatch(self, request: Request, call_next):
-            # Allow health/ready without auth
-            if request.method == "GET" and request.url.path in ("/health", "/ready"):
-                return await call_next(request)
-            auth = request.headers.get("authorization", "")
-            if not (auth.startswith("Bearer ") and auth.split(" ", 1)[1] == MCP_AUTH_TOKEN):
-                return Response("Unauthorized", status_code=401)
-            return await call_next(request)
-
-    print("=" * 60)
-    print("Coolify MCP Server - REMOTE MODE (SSE)")
-    print("=" * 60)
-    print(f"Host: {MCP_HOST}")
-    print(f"Port: {MCP_PORT}")
-    print(f"Auth: {'Enabled' if MCP_AUTH_TOKEN else 'Disabled'}")
-    print(f"Local: http://localhost:{MCP_PORT}")
-    print(f"SSE Endpoint: http://localhost:{MCP_PORT}/sse")
-    print(f"Auth Token: {MCP_AUTH_TOKEN[:20]}..." if MCP_AUTH_TOKEN else "Auth Token: NOT SET")
-    print("=" * 60)
-
-    # Use FastMCP's built-in run method which handles routing
-    # FastMCP will create the SSE and HTTP endpoints automatically
-    app.run(
-        transport="sse",
-        host=MCP_HOST,
-        port=MCP_PORT,
-    )
+    import run_server
+    run_server.main(create_http_app)
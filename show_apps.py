@@ -28,7 +28,9 @@ async def main():
             print()
             
             # Get applications
-            result = await session.call_tool("list_applications", {})
+            result = await session.call_tool("list_applications", {
+                "fields": ["uuid", "name", "status", "fqdn", "git_repository"]
+            })
             data = json.loads(result.content[0].text)
             apps = data.get("applications", [])
             
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Dependency-graph executor for multi-step automations
+
+Each step is an async callable that receives the results of the steps it
+depends on. Steps start as soon as all of their dependencies have
+finished, so independent work (e.g. a DNS create and a Coolify env read)
+runs concurrently. If a step raises, every step that depends on it is
+skipped.
+
+Usage:
+    graph = StepGraph()
+    graph.add("dns", lambda deps: create_dns())
+    graph.add("env", lambda deps: read_env())
+    graph.add("deploy", lambda deps: deploy(deps["env"]), depends_on=["env"])
+    run = await graph.run()
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+StepFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class StepGraph:
+    """A set of named async steps with dependencies between them"""
+
+    def __init__(self):
+        self._steps: Dict[str, StepFn] = {}
+        self._deps: Dict[str, List[str]] = {}
+
+    def add(self, name: str, fn: StepFn, depends_on: Iterable[str] = ()) -> None:
+        """Register a step - dependencies must already be registered"""
+        if name in self._steps:
+            raise ValueError(f"Step '{name}' already registered")
+        deps = list(depends_on)
+        for dep in deps:
+            if dep not in self._steps:
+                raise ValueError(f"Step '{name}' depends on unknown step '{dep}'")
+        self._steps[name] = fn
+        self._deps[name] = deps
+
+    async def run(self) -> "StepGraphRun":
+        """Run every step, each as soon as its dependencies are done"""
+        run = StepGraphRun(self._deps)
+        done = {name: asyncio.Event() for name in self._steps}
+
+        async def run_step(name: str) -> None:
+            try:
+                for dep in self._deps[name]:
+                    await done[dep].wait()
+                failed = [dep for dep in self._deps[name] if run.status[dep] != "ok"]
+                if failed:
+                    run.status[name] = "skipped"
+                    run.errors[name] = f"Skipped because {', '.join(failed)} did not succeed"
+                    return
+                inputs = {dep: run.results[dep] for dep in self._deps[name]}
+                started = time.perf_counter()
+                run.started[name] = started - run.t0
+                try:
+                    run.results[name] = await self._steps[name](inputs)
+                    run.status[name] = "ok"
+                except Exception as e:
+                    run.status[name] = "failed"
+                    run.errors[name] = str(e)
+                finally:
+                    run.durations[name] = time.perf_counter() - started
+            finally:
+                done[name].set()
+
+        await asyncio.gather(*(run_step(name) for name in self._steps))
+        run.total = time.perf_counter() - run.t0
+        return run
+
+
+class StepGraphRun:
+    """Results, per-step timings and the critical path of one graph run"""
+
+    def __init__(self, deps: Dict[str, List[str]]):
+        self.deps = deps
+        self.t0 = time.perf_counter()
+        self.results: Dict[str, Any] = {}
+        self.status: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.started: Dict[str, float] = {}
+        self.durations: Dict[str, float] = {}
+        self.total = 0.0
+
+    def critical_path(self) -> List[str]:
+        """The dependency chain with the largest summed step duration"""
+        best: Dict[str, float] = {}
+        prev: Dict[str, Optional[str]] = {}
+        # deps is insertion-ordered and dependencies are registered first
+        for name, deps in self.deps.items():
+            parent = max(deps, key=lambda dep: best[dep], default=None)
+            best[name] = self.durations.get(name, 0.0) + (best[parent] if parent else 0.0)
+            prev[name] = parent
+        if not best:
+            return []
+        path = []
+        node: Optional[str] = max(best, key=best.get)
+        while node is not None:
+            path.append(node)
+            node = prev[node]
+        return list(reversed(path))
+
+    def timings(self) -> Dict[str, Any]:
+        """Per-step timings plus the critical path, in milliseconds"""
+        path = self.critical_path()
+        return {
+            "steps": {
+                name: {
+                    "status": self.status.get(name),
+                    "started_ms": round(self.started[name] * 1000, 1) if name in self.started else None,
+                    "duration_ms": round(self.durations.get(name, 0.0) * 1000, 1),
+                }
+                for name in self.deps
+            },
+            "critical_path": path,
+            "critical_path_ms": round(sum(self.durations.get(name, 0.0) for name in path) * 1000, 1),
+            "total_ms": round(self.total * 1000, 1),
+        }
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Test make_coolify_request end to end against an in-process fake Coolify (no network needed)"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# server.py reads its settings at import time
+os.environ.update({
+    "COOLIFY_BASE_URL": "http://coolify.test",
+    "COOLIFY_API_TOKEN": "test-token",
+    "MCP_AUTH_TOKEN": "test-token",
+    "COOLIFY_INVENTORY_DB": os.path.join(tempfile.mkdtemp(), "inventory.sqlite3"),
+    "COOLIFY_READ_RATE": "0",
+    "COOLIFY_WRITE_RATE": "0",
+    "COOLIFY_RETRY_BACKOFF": "0.001",
+    "COOLIFY_RETRY_BACKOFF_MAX": "0.001",
+    "COOLIFY_READ_RETRIES": "2",
+    "COOLIFY_BREAKER_THRESHOLD": "3",
+})
+
+import httpx
+
+import server
+from deployments import DeployScheduler, DeploymentTracker
+from inventory import InventoryStore, inventory_namespace
+from response_cache import ResponseCache, ValidatorStore
+from upstream import CircuitBreaker
+
+
+class FakeCoolify:
+    """Answers each request with the next scripted response and records what it saw"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def run_against(fake: FakeCoolify, scenario):
+    """Run scenario() with server.py's Coolify client talking to fake, on fresh caches"""
+    async def run():
+        server.inventory_store = InventoryStore(
+            os.path.join(tempfile.mkdtemp(), "inventory.sqlite3"),
+            namespace=inventory_namespace(server.COOLIFY_API_URL, server.API_TOKEN),
+        )
+        server.response_cache = ResponseCache(
+            store=server.inventory_store, persist_keys=("/applications", "/servers"),
+        )
+        server.response_validators = ValidatorStore()
+        server.coolify_breaker = CircuitBreaker(server.COOLIFY_BREAKER_THRESHOLD, server.COOLIFY_BREAKER_RESET)
+        server._coolify_client = httpx.AsyncClient(
+            base_url=server.COOLIFY_API_URL,
+            headers=server.COOLIFY_HEADERS,
+            transport=httpx.MockTransport(fake.handle),
+        )
+        try:
+            return await scenario()
+        finally:
+            await server.close_coolify_client()
+            await server.response_cache.close()
+    return asyncio.run(run())
+
+
+def test_error_bodies_are_neither_cached_nor_persisted():
+    """A Coolify error body without an "error" key still comes back as an error and goes upstream again"""
+    fake = FakeCoolify(
+        httpx.Response(500, json={"message": "Server Error"}),
+        httpx.Response(401, json={"message": "Unauthenticated."}),
+        httpx.Response(200, json=[{"uuid": "app-0001"}]),
+    )
+
+    async def scenario():
+        first = await server.cached_coolify_get("/applications", 60)
+        second = await server.cached_coolify_get("/applications", 60)
+        persisted = await server.inventory_store.load("/applications")
+        third = await server.cached_coolify_get("/applications", 60)
+        return first, second, persisted, third
+
+    first, second, persisted, third = run_against(fake, scenario)
+    assert first == {"error": "HTTP 500: Server Error", "status_code": 500}
+    assert second["error"] == "HTTP 401: Unauthenticated."
+    # Nothing on disk for a cold start to serve
+    assert persisted is None
+    assert third == [{"uuid": "app-0001"}]
+    assert len(fake.requests) == 3
+
+
+def test_fleet_diagnosis_reports_failed_reads():
+    """Apps whose details or envs could not be read are listed as failed, never as healthy"""
+    def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/applications"):
+            return httpx.Response(200, json=[{"uuid": "app-0001", "name": "web"},
+                                             {"uuid": "app-0002", "name": "api"}])
+        return httpx.Response(401, json={"message": "Unauthenticated."})
+
+    fake = FakeCoolify()
+    fake.handle = handle
+    report = run_against(fake, server._diagnose_fleet_tunnel_issues_impl)
+    assert report["scanned"] == 2 and report["apps_failed"] == 2
+    assert report["healthy_apps"] == [] and report["has_issues"]
+    assert sorted(f["name"] for f in report["failed"]) == ["api", "web"]
+    assert all(len(f["errors"]) == 2 for f in report["failed"])
+
+
+def test_list_applications_returns_everything_unless_paged():
+    """Without limit every app comes back; with one, pages follow next_cursor"""
+    fleet = [{"uuid": f"app-{i:04d}", "name": f"service-{i:04d}", "status": "running:healthy"}
+             for i in range(250)]
+    fake = FakeCoolify(httpx.Response(200, json=fleet))
+
+    async def scenario():
+        everything = await server._search_applications_impl()
+        pages, cursor = [], None
+        while True:
+            page = await server._search_applications_impl(limit=100, cursor=cursor)
+            pages.append(page)
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return everything, pages
+
+    everything, pages = run_against(fake, scenario)
+    assert everything["count"] == everything["total"] == 250 and everything["next_cursor"] is None
+    assert [p["count"] for p in pages] == [100, 100, 50]
+    assert len({a["uuid"] for p in pages for a in p["applications"]}) == 250
+
+
+def test_deploy_many_selects_from_a_fresh_listing():
+    """A cached application list never decides which apps get redeployed"""
+    fleet = {"app-0001": "exited", "app-0002": "running"}
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        fake.requests.append(request)
+        if request.url.path.endswith("/applications"):
+            return httpx.Response(200, json=[{"uuid": uuid, "name": uuid, "status": status}
+                                             for uuid, status in fleet.items()])
+        return httpx.Response(200, json={"deployments": [{"deployment_uuid": f"dep-{request.url.params['uuid']}"}]})
+
+    fake = FakeCoolify()
+    fake.handle = handle
+
+    async def scenario():
+        await server.cached_coolify_get("/applications", 60)
+        fleet.update({"app-0001": "running", "app-0002": "exited"})
+        return await server._deploy_many_impl(status="exited", wait_for_completion=False)
+
+    report = run_against(fake, scenario)
+    assert [row["app_uuid"] for row in report["results"]] == ["app-0002"]
+    assert [r.url.params.get("uuid") for r in fake.requests if r.url.path.endswith("/deploy")] == ["app-0002"]
+
+
+def test_deploy_many_returns_partial_results_at_its_deadline():
+    """Queued apps are not_started, a running deploy is reported as it stands"""
+    def handle(request: httpx.Request) -> httpx.Response:
+        fake.requests.append(request)
+        if request.url.path.endswith("/applications"):
+            return httpx.Response(200, json=[{"uuid": f"app-{i:04d}", "name": f"web-{i}"} for i in range(3)])
+        if request.url.path.endswith("/deploy"):
+            return httpx.Response(200, json={"deployments": [{"deployment_uuid": "dep-1"}]})
+        return httpx.Response(200, json={"status": "in_progress"})
+
+    fake = FakeCoolify()
+    fake.handle = handle
+
+    async def scenario():
+        server.deploy_scheduler = DeployScheduler(max_in_flight=1, max_per_server=1)
+        server.deployment_tracker = DeploymentTracker(
+            lambda uuid: server.make_coolify_request("GET", f"/deployments/{uuid}"), initial_interval=0.01,
+        )
+        try:
+            return await server._deploy_many_impl(name_contains="web", timeout=0.1)
+        finally:
+            await server.deployment_tracker.close()
+
+    report = run_against(fake, scenario)
+    assert [row["status"] for row in report["results"]] == ["in_progress", "not_started", "not_started"]
+    assert report["results"][0]["deployment_uuid"] == "dep-1"
+    assert report["deployed"] == 1 and report["deadline_reached"] and not report["success"]
+    assert sum(r.url.path.endswith("/deploy") for r in fake.requests) == 1
+
+
+def test_reads_retry_transient_failures():
+    """Connection errors and 502/503/504 on a read are retried until a response gets through"""
+    fake = FakeCoolify(
+        httpx.ConnectError("connection refused"),
+        httpx.Response(503, text="upstream busy"),
+        httpx.Response(200, json=[{"uuid": "srv-000"}]),
+    )
+    result = run_against(fake, lambda: server.make_coolify_request("GET", "/servers"))
+    assert result == [{"uuid": "srv-000"}]
+    assert len(fake.requests) == 3
+
+
+def test_writes_are_never_retried():
+    """A deploy, restart or update is sent once, whatever happens to it"""
+    for failure in (httpx.Response(503, text="upstream busy"), httpx.ConnectError("connection refused")):
+        fake = FakeCoolify(failure, httpx.Response(200, json={"message": "ok"}))
+        result = run_against(fake, lambda: server.make_coolify_request("GET", "/deploy?uuid=app-0001"))
+        assert "error" in result
+        assert len(fake.requests) == 1
+    fake = FakeCoolify(httpx.ConnectError("connection refused"), httpx.Response(200, json={}))
+    result = run_against(fake, lambda: server.make_coolify_request(
+        "PATCH", "/applications/app-0001/envs", {"data": {"PORT": "3000"}}))
+    assert "error" in result and len(fake.requests) == 1
+
+
+def test_deployment_polls_are_reads():
+    """GET /deployments/{uuid} is a status poll - read class, and retried - unlike GET /deploy"""
+    assert server.upstream_admission.for_request("GET", "/deployments/dep-1").name == "read"
+    assert server.upstream_admission.for_request("GET", "/deploy?uuid=app-0001").name == "write"
+    fake = FakeCoolify(
+        httpx.Response(503, text="upstream busy"),
+        httpx.Response(200, json={"status": "finished"}),
+    )
+    result = run_against(fake, lambda: server.make_coolify_request("GET", "/deployments/dep-1"))
+    assert result == {"status": "finished"}
+    assert len(fake.requests) == 2
+
+
+def test_open_breaker_fails_fast():
+    """Once repeated failures open the breaker, calls return at once without reaching Coolify"""
+    fake = FakeCoolify(httpx.Response(503, text="down"))
+
+    async def scenario():
+        first = await server.make_coolify_request("GET", "/servers")
+        sent = len(fake.requests)
+        second = await server.make_coolify_request("GET", "/servers")
+        return first, sent, second
+
+    first, sent, second = run_against(fake, scenario)
+    assert first["status_code"] == 503
+    # One attempt plus two retries reach the threshold of 3
+    assert sent == 3 and server.coolify_breaker.state == "open"
+    assert "failing fast" in second["error"]
+    assert len(fake.requests) == 3
+
+
+def test_throttled_requests_are_resent():
+    """A 429 is waited out and re-sent, even for a deploy - Coolify did no work"""
+    fake = FakeCoolify(
+        httpx.Response(429, headers={"Retry-After": "0"}, json={"message": "Too Many Attempts."}),
+        httpx.Response(200, json={"deployments": [{"deployment_uuid": "dep-1"}]}),
+    )
+    result = run_against(fake, lambda: server.make_coolify_request("GET", "/deploy?uuid=app-0001"))
+    assert result == {"deployments": [{"deployment_uuid": "dep-1"}]}
+    assert len(fake.requests) == 2
+
+
+def test_not_modified_reuses_the_stored_body():
+    """Listing and detail reads revalidate with If-None-Match; logs are never stored"""
+    def handle(request: httpx.Request) -> httpx.Response:
+        fake.requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        if request.method == "PATCH":
+            return httpx.Response(200, json={"message": "ok"})
+        return httpx.Response(200, headers={"ETag": '"v1"'}, json={"path": request.url.path})
+
+    fake = FakeCoolify()
+    fake.handle = handle
+
+    async def scenario():
+        first = await server.make_coolify_request("GET", "/applications/app-0001")
+        second = await server.make_coolify_request("GET", "/applications/app-0001")
+        await server.make_coolify_request("GET", "/applications/app-0001/logs?lines=10")
+        await server.make_coolify_request("GET", "/applications/app-0001/logs?lines=10")
+        await server._update_application_environment_impl("app-0001", {"PORT": "3000"})
+        third = await server.make_coolify_request("GET", "/applications/app-0001")
+        return first, second, third
+
+    first, second, third = run_against(fake, scenario)
+    assert first == second == third == {"path": "/api/v1/applications/app-0001"}
+    conditional = [r.headers.get("if-none-match") for r in fake.requests]
+    # detail, detail (304), logs, logs, PATCH, detail after the update - unconditional again
+    assert conditional == [None, '"v1"', None, None, None, None]
+    assert server.response_validators.stats()["not_modified"] == 1
+    assert "gzip" in fake.requests[0].headers["accept-encoding"]
+
+
+if __name__ == "__main__":
+    print("Testing Coolify requests...")
+    test_error_bodies_are_neither_cached_nor_persisted()
+    test_fleet_diagnosis_reports_failed_reads()
+    test_list_applications_returns_everything_unless_paged()
+    test_deploy_many_selects_from_a_fresh_listing()
+    test_deploy_many_returns_partial_results_at_its_deadline()
+    test_reads_retry_transient_failures()
+    test_writes_are_never_retried()
+    test_deployment_polls_are_reads()
+    test_open_breaker_fails_fast()
+    test_throttled_requests_are_resent()
+    test_not_modified_reuses_the_stored_body()
+    print("All Coolify request tests passed")
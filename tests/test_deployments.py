@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Test the bulk deploy scheduler and deployment tracker (no network needed)"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deployments import DeployScheduler, DeploymentTracker
+
+
+class LoadRecorder:
+    """Fake deploy jobs that record peak concurrency overall and per server"""
+
+    def __init__(self):
+        self.active = {}
+        self.peak = 0
+        self.peak_per_server = {}
+
+    def job(self, server, seconds=0.02, fail=False):
+        async def run():
+            self.active[server] = self.active.get(server, 0) + 1
+            self.peak = max(self.peak, sum(self.active.values()))
+            self.peak_per_server[server] = max(self.peak_per_server.get(server, 0), self.active[server])
+            try:
+                await asyncio.sleep(seconds)
+                if fail:
+                    raise RuntimeError("deploy failed")
+                return {"status": "finished"}
+            finally:
+                self.active[server] -= 1
+        return run
+
+
+def test_caps_overall_and_per_server():
+    """Never more than max_in_flight overall or max_per_server on one server"""
+    async def run():
+        scheduler = DeployScheduler(max_in_flight=3, max_per_server=2)
+        recorder = LoadRecorder()
+        jobs = [(server, recorder.job(server)) for server in ["main"] * 6 + ["edge"] * 4]
+        outcomes = await scheduler.run(jobs)
+        assert len(outcomes) == 10
+        assert all(outcome["status"] == "finished" for outcome in outcomes)
+        assert recorder.peak == 3
+        assert recorder.peak_per_server == {"main": 2, "edge": 2}
+    asyncio.run(run())
+
+
+def test_min_interval_spaces_starts():
+    """Starts are spaced by min_interval even when slots are free"""
+    async def run():
+        scheduler = DeployScheduler(max_in_flight=10, max_per_server=10, min_interval=0.03)
+        recorder = LoadRecorder()
+        started = time.perf_counter()
+        await scheduler.run([("main", recorder.job("main", seconds=0)) for _ in range(4)])
+        assert time.perf_counter() - started >= 0.09
+    asyncio.run(run())
+
+
+def test_job_errors_become_outcomes():
+    """A job that raises is reported, not propagated"""
+    async def run():
+        scheduler = DeployScheduler()
+        recorder = LoadRecorder()
+        outcomes = await scheduler.run([("main", recorder.job("main", fail=True)), ("main", recorder.job("main"))])
+        assert outcomes[0]["status"] == "error"
+        assert outcomes[0]["error"] == "deploy failed"
+        assert outcomes[1]["status"] == "finished"
+        assert "queued_ms" in outcomes[1] and "duration_ms" in outcomes[1]
+    asyncio.run(run())
+
+
+def test_deadline_skips_jobs_that_never_started():
+    """Jobs still queued at the deadline come back as not_started; running ones finish"""
+    async def run():
+        scheduler = DeployScheduler(max_in_flight=2, max_per_server=2)
+        recorder = LoadRecorder()
+        jobs = [("main", recorder.job("main", seconds=0.05)) for _ in range(5)]
+        started = time.perf_counter()
+        outcomes = await scheduler.run(jobs, deadline=time.monotonic() + 0.02)
+        assert time.perf_counter() - started < 0.2
+        assert [outcome["status"] for outcome in outcomes] == ["finished"] * 2 + ["not_started"] * 3
+        # Every slot was handed back
+        assert scheduler.in_flight == 0
+        assert [o["status"] for o in await scheduler.run(jobs[:2])] == ["finished", "finished"]
+    asyncio.run(run())
+
+
+class FakeCoolify:
+    """Deployment status endpoint that finishes after a number of polls"""
+
+    def __init__(self, polls_until_done=3, statuses=None):
+        self.calls = 0
+        self.polls_until_done = polls_until_done
+        self.statuses = statuses
+
+    async def fetch_status(self, deployment_uuid):
+        self.calls += 1
+        if self.statuses:
+            return {"status": self.statuses[min(self.calls, len(self.statuses)) - 1]}
+        return {"status": "finished" if self.calls >= self.polls_until_done else "in_progress"}
+
+
+def test_tracker_shares_one_poller():
+    """Many concurrent watchers of one deployment cause one set of polls"""
+    async def run():
+        coolify = FakeCoolify(polls_until_done=3)
+        tracker = DeploymentTracker(coolify.fetch_status, initial_interval=0.01, max_interval=0.01)
+        snapshots = await asyncio.gather(*[tracker.wait("dep-1", timeout=1) for _ in range(20)])
+        assert all(snapshot["status"] == "finished" and snapshot["done"] for snapshot in snapshots)
+        assert coolify.calls == 3
+        # Finished deployments are answered from memory
+        await tracker.status("dep-1")
+        assert coolify.calls == 3
+    asyncio.run(run())
+
+
+def test_tracker_backs_off_while_unchanged():
+    """The poll interval grows while the status stays the same"""
+    async def run():
+        coolify = FakeCoolify(statuses=["in_progress"] * 100)
+        tracker = DeploymentTracker(coolify.fetch_status, initial_interval=0.01, max_interval=1, backoff=2)
+        snapshot = await tracker.wait("dep-2", timeout=0.2)
+        assert not snapshot["done"]
+        # Fixed 10ms polling would take ~20 polls in 200ms; backoff needs far fewer
+        assert coolify.calls <= 6
+        await tracker.close()
+    asyncio.run(run())
+
+
+def test_tracker_never_hangs_on_broken_fetches():
+    """A fetcher that raises or returns junk ends the watch with an error instead of hanging waiters"""
+    async def run():
+        async def raises(_uuid):
+            raise RuntimeError("boom")
+
+        async def junk(_uuid):
+            return ["not", "a", "dict"]
+
+        for fetch in (raises, junk):
+            tracker = DeploymentTracker(fetch, initial_interval=0.001, max_errors=2)
+            first = await asyncio.wait_for(tracker.status("dep-3"), timeout=1)
+            final = await asyncio.wait_for(tracker.wait("dep-3"), timeout=1)
+            assert first["status"] in ("unknown", "error")
+            assert final["done"] and final["status"] == "error" and final["details"]["error"]
+            await tracker.close()
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    print("Testing deployments...")
+    test_caps_overall_and_per_server()
+    test_min_interval_spaces_starts()
+    test_job_errors_become_outcomes()
+    test_deadline_skips_jobs_that_never_started()
+    test_tracker_shares_one_poller()
+    test_tracker_backs_off_while_unchanged()
+    test_tracker_never_hangs_on_broken_fetches()
+    print("All deployment tests passed")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test application inventory projection, filtering and paging (no network needed)"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory import (
+    COMPACT_APPLICATION_FIELDS,
+    filter_applications,
+    inventory_namespace,
+    paginate_applications,
+    project_application,
+    project_applications,
+    resolve_fields,
+)
+
+APP = {
+    "uuid": "abc123",
+    "name": "my-api",
+    "status": "running:healthy",
+    "fqdn": "https://api.example.com",
+    "git_repository": "org/my-api",
+    "docker_compose_raw": "services: {}" * 100,
+    "destination": {"server": {"uuid": "srv1", "name": "Main Computer"}},
+}
+
+
+def test_compact_default():
+    """No fields means the compact listing view"""
+    fields = resolve_fields(None, COMPACT_APPLICATION_FIELDS)
+    assert project_application(APP, fields) == {
+        "uuid": "abc123",
+        "name": "my-api",
+        "status": "running:healthy",
+        "fqdn": "https://api.example.com",
+        "server": "Main Computer",
+    }
+
+
+def test_explicit_and_dotted_fields():
+    """Requested fields (including dotted paths) are kept, unknown ones skipped"""
+    fields = resolve_fields(["name", "destination.server.uuid", "missing"], COMPACT_APPLICATION_FIELDS)
+    assert project_application(APP, fields) == {"name": "my-api", "destination.server.uuid": "srv1"}
+
+
+def test_all_fields_returns_whole_objects():
+    """'*' disables projection"""
+    assert resolve_fields(["*"], COMPACT_APPLICATION_FIELDS) is None
+    assert project_applications([APP], None) == [APP]
+
+
+FLEET = [
+    {
+        "uuid": f"app-{i:02d}",
+        "name": f"service-{i:02d}",
+        "status": "exited:unhealthy" if i % 3 == 0 else "running:healthy",
+        "destination": {"server": {"uuid": f"srv{i % 2}", "name": "Main Computer" if i % 2 else "Edge Box"}},
+        "environment": {"project": {"uuid": "proj1", "name": "Production" if i < 10 else "Staging"}},
+    }
+    for i in range(25)
+]
+
+
+def test_filters_combine():
+    """status, server, project and name filters all apply"""
+    exited_on_main = filter_applications(FLEET, status="exited", server="main computer")
+    assert [a["uuid"] for a in exited_on_main] == ["app-03", "app-09", "app-15", "app-21"]
+    assert len(filter_applications(FLEET, project="Staging")) == 15
+    assert [a["uuid"] for a in filter_applications(FLEET, name_contains="-1", server="srv0")] == [
+        "app-10", "app-12", "app-14", "app-16", "app-18"
+    ]
+
+
+def test_pagination_walks_every_app_once():
+    """Following next_cursor visits every app exactly once"""
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = paginate_applications(FLEET, limit=10, cursor=cursor)
+        seen.extend(a["uuid"] for a in page)
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(a["uuid"] for a in FLEET)
+    assert len(seen) == len(set(seen))
+
+
+def test_pagination_survives_removed_app():
+    """Removing an app between pages does not skip or repeat others"""
+    first, cursor = paginate_applications(FLEET, limit=10)
+    remaining = [a for a in FLEET if a["uuid"] != "app-03"]
+    second, _ = paginate_applications(remaining, limit=10, cursor=cursor)
+    assert second[0]["uuid"] == "app-10"
+
+
+def test_invalid_cursor():
+    """Garbage cursors are rejected"""
+    try:
+        paginate_applications(FLEET, cursor="not-a-cursor")
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+
+def test_inventory_namespace_is_per_token():
+    """Two tokens on one instance never share a namespace, and the token itself is not stored"""
+    team_a = inventory_namespace("https://coolify.example.com/api/v1", "1|team-a-secret")
+    team_b = inventory_namespace("https://coolify.example.com/api/v1", "2|team-b-secret")
+    assert team_a != team_b
+    assert team_a == inventory_namespace("https://coolify.example.com/api/v1", "1|team-a-secret")
+    assert team_a.startswith("https://coolify.example.com/api/v1#")
+    assert "secret" not in team_a
+
+
+if __name__ == "__main__":
+    print("Testing inventory...")
+    test_compact_default()
+    test_explicit_and_dotted_fields()
+    test_all_fields_returns_whole_objects()
+    test_filters_combine()
+    test_pagination_walks_every_app_once()
+    test_pagination_survives_removed_app()
+    test_invalid_cursor()
+    test_inventory_namespace_is_per_token()
+    print("All inventory tests passed")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Test the pluggable JSON codec and pre-encoded tool results (no network needed)"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_codec
+from json_codec import available_backends, json_result, select_codec
+
+PAYLOAD = {
+    "applications": [
+        {"uuid": "app-0001", "name": "café", "status": "running:healthy", "ports": [3000, 8080],
+         "limits": {"cpu": 1.5, "memory": None}, "public": True},
+    ],
+    "count": 1,
+}
+
+
+def test_every_backend_round_trips_bytes():
+    """Each installed backend decodes bytes and str, and emits compact UTF-8"""
+    assert "json" in available_backends()
+    for name in available_backends():
+        codec = select_codec(name)
+        assert codec.name == name
+        encoded = codec.dumps(PAYLOAD)
+        assert isinstance(encoded, bytes)
+        assert b": " not in encoded and "café".encode() in encoded
+        assert codec.loads(encoded) == PAYLOAD
+        assert codec.loads(encoded.decode()) == PAYLOAD
+        assert json.loads(encoded) == PAYLOAD
+
+
+def test_invalid_json_raises_value_error():
+    """Callers only need to catch ValueError, whichever backend is active"""
+    for name in available_backends():
+        codec = select_codec(name)
+        for bad in (b"<html>502 Bad Gateway</html>", b'{"a": ', b"\xff\xfe"):
+            try:
+                codec.loads(bad)
+            except ValueError:
+                continue
+            raise AssertionError(f"{name} accepted {bad!r}")
+
+
+def test_unknown_types_and_fallback():
+    """Unknown types become strings; unknown or missing backends fall back"""
+    for name in available_backends():
+        codec = select_codec(name)
+        decoded = codec.loads(codec.dumps({"when": datetime(2026, 1, 2), 1: "int key", "big": 2 ** 70}))
+        assert decoded["big"] == 2 ** 70 and decoded["1"] == "int key"
+        assert decoded["when"].startswith("2026-01-02")
+    assert select_codec("nonsense").name == available_backends()[0]
+    assert select_codec("auto").name == available_backends()[0]
+
+
+def test_json_result_preencodes_dicts():
+    """Dict results reach FastMCP as text + structured content; others pass through"""
+    @json_result
+    async def probe_tool(kind: str = "dict"):
+        return PAYLOAD if kind == "dict" else ["not", "a", "dict"]
+
+    result = asyncio.run(probe_tool())
+    assert result.structured_content == PAYLOAD
+    assert json.loads(result.content[0].text) == PAYLOAD
+    assert json_codec.loads(result.content[0].text) == PAYLOAD
+    assert asyncio.run(probe_tool("list")) == ["not", "a", "dict"]
+    assert probe_tool.__name__ == "probe_tool"
+
+
+if __name__ == "__main__":
+    print("Testing JSON codec...")
+    test_every_backend_round_trips_bytes()
+    test_invalid_json_raises_value_error()
+    test_unknown_types_and_fallback()
+    test_json_result_preencodes_dicts()
+    print("All JSON codec tests passed")
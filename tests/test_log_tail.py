@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Test incremental log tailing cursors (no network needed)"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_tail import LogTail, SqliteCursorStore, new_lines_since, parse_cursor
+
+
+def log_text(start, end):
+    return "\n".join(f"{i:04d} build step {i}" for i in range(start, end))
+
+
+def test_follow_returns_only_new_lines():
+    """The second read returns only what was written after the first"""
+    tail = LogTail()
+    first = tail.advance("local", "app-1", log_text(0, 10))
+    assert first["new_lines"] == 10
+    second = tail.advance("local", "app-1", log_text(3, 14))
+    assert second["logs"] == log_text(10, 14)
+    assert not second["gap"]
+    quiet = tail.advance("local", "app-1", log_text(5, 14))
+    assert quiet["new_lines"] == 0 and quiet["logs"] == ""
+
+
+def test_explicit_cursor_is_stateless():
+    """A cursor passed back by the client works in a fresh LogTail"""
+    cursor = LogTail().advance("session-a", "app-1", log_text(0, 10))["cursor"]
+    result = LogTail().advance("session-b", "app-1", log_text(5, 12), cursor=cursor)
+    assert result["logs"] == log_text(10, 12)
+    assert parse_cursor(result["cursor"])[0] == 12
+
+
+def test_sessions_are_independent():
+    """Each session keeps its own position per application"""
+    tail = LogTail()
+    tail.advance("session-a", "app-1", log_text(0, 10))
+    result = tail.advance("session-b", "app-1", log_text(0, 12))
+    assert result["new_lines"] == 12
+
+
+def test_gap_when_window_scrolled_away():
+    """If more lines were written than fetched, everything fetched is returned"""
+    lines = log_text(0, 10).splitlines()
+    _, cursor, _ = new_lines_since(lines, None)
+    fresh, _, gap = new_lines_since(log_text(50, 55).splitlines(), cursor)
+    assert gap and len(fresh) == 5
+
+
+def test_limit_trims_result():
+    """limit caps the lines returned after a gap"""
+    tail = LogTail()
+    tail.advance("local", "app-1", log_text(0, 10))
+    result = tail.advance("local", "app-1", log_text(40, 50), limit=3)
+    assert result["gap"] and result["logs"] == log_text(47, 50)
+
+
+def test_shared_store_continues_across_workers():
+    """Two LogTails on one SQLite file (two workers) share session cursors"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.sqlite3")
+        worker_a = LogTail(store=SqliteCursorStore(path))
+        worker_b = LogTail(store=SqliteCursorStore(path))
+        worker_a.advance("session-a", "app-1", log_text(0, 10))
+        result = worker_b.advance("session-a", "app-1", log_text(5, 13))
+        assert result["logs"] == log_text(10, 13)
+        worker_a.store.close()
+        worker_b.store.close()
+
+
+def test_no_session_remembers_nothing():
+    """Stateless requests (no session key) only continue from an explicit cursor"""
+    tail = LogTail()
+    cursor = tail.advance(None, "app-1", log_text(0, 10))["cursor"]
+    assert tail.advance(None, "app-1", log_text(5, 12))["new_lines"] == 7
+    assert tail.advance(None, "app-1", log_text(5, 12), cursor=cursor)["new_lines"] == 2
+    assert not tail._cursors
+
+
+if __name__ == "__main__":
+    print("Testing log tail...")
+    test_follow_returns_only_new_lines()
+    test_explicit_cursor_is_stateless()
+    test_sessions_are_independent()
+    test_gap_when_window_scrolled_away()
+    test_limit_trims_result()
+    test_shared_store_continues_across_workers()
+    test_no_session_remembers_nothing()
+    print("All log tail tests passed")
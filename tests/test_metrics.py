@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Test the Prometheus metrics registry and tool instrumentation (no network needed)"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import REGISTRY, Registry, endpoint_template, instrument_tool
+
+
+def test_render_text_format():
+    """Counters, labelled gauges and cumulative histogram buckets render as Prometheus text"""
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls", ["tool"])
+    latency = registry.histogram("latency_seconds", "Latency", ["tool"], buckets=[0.1, 1])
+    calls.inc(tool="a")
+    calls.inc(2, tool="a")
+    latency.observe(0.05, tool="a")
+    latency.observe(0.5, tool="a")
+    latency.observe(5, tool="a")
+    registry.add_collector(lambda: [("entries", "gauge", "Entries", [({}, 3)])])
+    text = registry.render()
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{tool="a"} 3' in text
+    assert 'latency_seconds_bucket{tool="a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{tool="a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{tool="a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{tool="a"} 3' in text
+    assert "entries 3" in text
+
+
+def test_endpoint_template_bounds_labels():
+    """UUIDs and query strings never become label values"""
+    assert endpoint_template("/applications/abc123/logs?lines=50") == "/applications/{id}/logs"
+    assert endpoint_template("/deploy?uuid=abc123&force=false") == "/deploy"
+    assert endpoint_template("/servers") == "/servers"
+
+
+def test_instrument_tool_counts_errors():
+    """Error dicts and exceptions both count as tool errors"""
+    @instrument_tool
+    async def metrics_probe_tool(fail: str = ""):
+        if fail == "raise":
+            raise RuntimeError("boom")
+        return {"error": "nope"} if fail else {"ok": True}
+
+    async def run():
+        await metrics_probe_tool()
+        await metrics_probe_tool("dict")
+        try:
+            await metrics_probe_tool("raise")
+        except RuntimeError:
+            pass
+
+    asyncio.run(run())
+    text = REGISTRY.render()
+    assert 'mcp_tool_calls_total{tool="metrics_probe_tool"} 3' in text
+    assert 'mcp_tool_errors_total{tool="metrics_probe_tool"} 2' in text
+    assert 'mcp_tool_in_flight{tool="metrics_probe_tool"} 0' in text
+    assert metrics_probe_tool.__name__ == "metrics_probe_tool"
+
+
+if __name__ == "__main__":
+    print("Testing metrics...")
+    test_render_text_format()
+    test_endpoint_template_bounds_labels()
+    test_instrument_tool_counts_errors()
+    print("All metrics tests passed")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Test the response cache, request coalescing and conditional GETs (no network needed)"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory import InventoryStore
+from response_cache import ResponseCache, SingleFlight, ValidatorStore
+
+
+class FakeUpstream:
+    """Counts fetches and returns an increasing version number"""
+
+    def __init__(self, error: bool = False):
+        self.calls = 0
+        self.error = error
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.error:
+            return {"error": "upstream down"}
+        return {"version": self.calls}
+
+
+def test_fresh_hit_and_miss():
+    """A second read inside the TTL is served from memory"""
+    async def run():
+        cache = ResponseCache()
+        upstream = FakeUpstream()
+        first = await cache.get_or_fetch("/applications", upstream.fetch, ttl=60)
+        second = await cache.get_or_fetch("/applications", upstream.fetch, ttl=60)
+        assert first == second == {"version": 1}
+        assert upstream.calls == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+    asyncio.run(run())
+
+
+def test_stale_while_revalidate():
+    """An expired entry is served stale while one background refresh runs"""
+    async def run():
+        cache = ResponseCache()
+        upstream = FakeUpstream()
+        await cache.get_or_fetch("/servers", upstream.fetch, ttl=0.01, stale_ttl=60)
+        await asyncio.sleep(0.02)
+        stale = await asyncio.gather(
+            *[cache.get_or_fetch("/servers", upstream.fetch, ttl=0.01, stale_ttl=60) for _ in range(5)]
+        )
+        assert all(value == {"version": 1} for value in stale)
+        assert cache.stats()["stale_hits"] == 5
+        await asyncio.sleep(0.01)
+        assert upstream.calls == 2
+        assert cache._entries["/servers"].value == {"version": 2}
+    asyncio.run(run())
+
+
+def test_errors_are_not_cached():
+    """Error payloads always go back upstream"""
+    async def run():
+        cache = ResponseCache()
+        upstream = FakeUpstream(error=True)
+        await cache.get_or_fetch("/applications", upstream.fetch, ttl=60)
+        await cache.get_or_fetch("/applications", upstream.fetch, ttl=60)
+        assert upstream.calls == 2
+    asyncio.run(run())
+
+
+def test_invalidate_drops_entry_and_in_flight_fetch():
+    """Invalidation wins over a fetch that started before it"""
+    async def run():
+        cache = ResponseCache()
+        upstream = FakeUpstream()
+        await cache.get_or_fetch("/applications/abc", upstream.fetch, ttl=60)
+        cache.invalidate("/applications/abc")
+        assert cache.stats()["entries"] == 0
+
+        async def slow_fetch():
+            value = await upstream.fetch()
+            cache.invalidate("/applications/abc")
+            return value
+
+        await cache.get_or_fetch("/applications/abc", slow_fetch, ttl=60)
+        assert cache.stats()["entries"] == 0
+    asyncio.run(run())
+
+
+def test_singleflight_coalesces_concurrent_calls():
+    """N concurrent identical calls share one upstream fetch"""
+    async def run():
+        flight = SingleFlight()
+        upstream = FakeUpstream()
+
+        async def slow_fetch():
+            await asyncio.sleep(0.01)
+            return await upstream.fetch()
+
+        results = await asyncio.gather(*[flight.do(("GET", "/applications"), slow_fetch) for _ in range(10)])
+        assert upstream.calls == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats() == {"in_flight": 0, "started": 1, "coalesced": 9}
+
+        # Once finished, the next call goes upstream again
+        await flight.do(("GET", "/applications"), slow_fetch)
+        assert upstream.calls == 2
+    asyncio.run(run())
+
+
+def test_singleflight_survives_cancelled_caller():
+    """Cancelling the first caller does not cancel the shared request"""
+    async def run():
+        flight = SingleFlight()
+        upstream = FakeUpstream()
+
+        async def slow_fetch():
+            await asyncio.sleep(0.01)
+            return await upstream.fetch()
+
+        first = asyncio.create_task(flight.do("key", slow_fetch))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do("key", slow_fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == {"version": 1}
+    asyncio.run(run())
+
+
+def test_persisted_inventory_survives_restart():
+    """A new cache answers from disk immediately and refreshes in the background"""
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "inventory.sqlite3")
+            upstream = FakeUpstream()
+            first = ResponseCache(store=InventoryStore(path, "coolify-a"), persist_keys=["/applications"])
+            await first.get_or_fetch("/applications", upstream.fetch, ttl=0.01, stale_ttl=0)
+            await asyncio.sleep(0.05)
+
+            # "Restart": fresh cache, same file - old data now, new data shortly after
+            second = ResponseCache(store=InventoryStore(path, "coolify-a"), persist_keys=["/applications"])
+            assert await second.get_or_fetch("/applications", upstream.fetch, ttl=60) == {"version": 1}
+            assert second.stats()["disk_hits"] == 1
+            await asyncio.sleep(0.05)
+            assert await second.get_or_fetch("/applications", upstream.fetch, ttl=60) == {"version": 2}
+
+            # Other Coolify instances and keys that are not persisted never read the file
+            other = ResponseCache(store=InventoryStore(path, "coolify-b"), persist_keys=["/applications"])
+            assert await other.get_or_fetch("/applications", upstream.fetch, ttl=60) == {"version": 3}
+            assert other.stats()["disk_hits"] == 0
+    asyncio.run(run())
+
+
+def test_invalidated_key_is_not_reseeded_from_disk():
+    """After a mutation the next read goes upstream, not back to the old disk copy"""
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = InventoryStore(os.path.join(tmp, "inventory.sqlite3"), "coolify")
+            store.save_sync("/applications", {"version": 0})
+            upstream = FakeUpstream()
+            cache = ResponseCache(store=store, persist_keys=["/applications"])
+            assert await cache.get_or_fetch("/applications", upstream.fetch, ttl=60) == {"version": 0}
+            cache.invalidate("/applications")
+            after = await cache.get_or_fetch("/applications", upstream.fetch, ttl=60)
+            assert after == {"version": upstream.calls} and upstream.calls >= 1
+    asyncio.run(run())
+
+
+def test_validators_make_refreshes_conditional():
+    """A stored ETag becomes If-None-Match and a 304 hands back the stored body"""
+    store = ValidatorStore()
+    assert store.lookup("/applications") is None
+    store.store("/applications", {"etag": 'W/"abc"', "last-modified": "Tue, 06 Oct 2026 10:00:00 GMT"},
+                [{"uuid": "app-0001"}])
+    entry = store.lookup("/applications")
+    assert entry.request_headers() == {
+        "If-None-Match": 'W/"abc"', "If-Modified-Since": "Tue, 06 Oct 2026 10:00:00 GMT",
+    }
+    assert store.revalidated(entry) == [{"uuid": "app-0001"}]
+    assert store.stats()["not_modified"] == 1
+
+    store.invalidate("/applications")
+    assert store.lookup("/applications") is None
+    assert not ValidatorStore(enabled=False).lookup("/applications")
+
+
+def test_validators_skip_errors_unvalidated_and_overflow():
+    """Error bodies and responses without validators are not kept; the store stays bounded"""
+    store = ValidatorStore(max_entries=2)
+    store.store("/servers", {"etag": '"1"'}, {"error": "HTTP 500"})
+    assert store.lookup("/servers") is None
+    store.store("/servers", {"etag": '"1"'}, [])
+    store.store("/servers", {}, [{"uuid": "srv-000"}])
+    # Dropped - the old ETag no longer describes the current body
+    assert store.lookup("/servers") is None
+    for key in ("/a", "/b", "/c"):
+        store.store(key, {"etag": f'"{key}"'}, {"key": key})
+    assert store.lookup("/a") is None and store.stats()["entries"] == 2
+
+
+if __name__ == "__main__":
+    print("Testing response cache...")
+    test_fresh_hit_and_miss()
+    test_stale_while_revalidate()
+    test_errors_are_not_cached()
+    test_invalidate_drops_entry_and_in_flight_fetch()
+    test_singleflight_coalesces_concurrent_calls()
+    test_singleflight_survives_cancelled_caller()
+    test_persisted_inventory_survives_restart()
+    test_invalidated_key_is_not_reseeded_from_disk()
+    test_validators_make_refreshes_conditional()
+    test_validators_skip_errors_unvalidated_and_overflow()
+    print("All response cache tests passed")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test the dependency-graph step executor (no network needed)"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from step_graph import StepGraph
+
+
+def sleeper(seconds, value=None):
+    async def step(deps):
+        await asyncio.sleep(seconds)
+        return value
+    return step
+
+
+def test_independent_steps_run_concurrently():
+    """Two independent 50ms steps finish in roughly 50ms, not 100ms"""
+    async def run():
+        graph = StepGraph()
+        graph.add("dns", sleeper(0.05, "dns"))
+        graph.add("env_read", sleeper(0.05, {"data": {}}))
+        started = time.perf_counter()
+        result = await graph.run()
+        elapsed = time.perf_counter() - started
+        assert result.status == {"dns": "ok", "env_read": "ok"}
+        assert elapsed < 0.09
+    asyncio.run(run())
+
+
+def test_dependencies_receive_results():
+    """A step sees the results of the steps it depends on"""
+    async def run():
+        graph = StepGraph()
+        graph.add("env_read", sleeper(0, {"data": {"URL": "http://localhost"}}))
+
+        async def patch(deps):
+            return list(deps["env_read"]["data"])
+
+        graph.add("env_patch", patch, depends_on=["env_read"])
+        result = await graph.run()
+        assert result.results["env_patch"] == ["URL"]
+    asyncio.run(run())
+
+
+def test_failure_skips_dependents():
+    """A failing step skips its dependents but not unrelated steps"""
+    async def run():
+        async def boom(deps):
+            raise RuntimeError("env read failed")
+
+        graph = StepGraph()
+        graph.add("dns", sleeper(0, "ok"))
+        graph.add("env_read", boom)
+        graph.add("deploy", sleeper(0, "deployed"), depends_on=["env_read"])
+        result = await graph.run()
+        assert result.status == {"dns": "ok", "env_read": "failed", "deploy": "skipped"}
+        assert result.errors["env_read"] == "env read failed"
+    asyncio.run(run())
+
+
+def test_critical_path():
+    """The critical path follows the longest dependency chain"""
+    async def run():
+        graph = StepGraph()
+        graph.add("dns", sleeper(0.03))
+        graph.add("env_read", sleeper(0.01))
+        graph.add("env_patch", sleeper(0.01), depends_on=["env_read"])
+        graph.add("deploy", sleeper(0.03), depends_on=["env_patch"])
+        result = await graph.run()
+        timings = result.timings()
+        assert timings["critical_path"] == ["env_read", "env_patch", "deploy"]
+        assert timings["critical_path_ms"] <= timings["total_ms"] + 1
+        assert set(timings["steps"]) == {"dns", "env_read", "env_patch", "deploy"}
+    asyncio.run(run())
+
+
+def test_unknown_dependency_rejected():
+    """Dependencies must be registered before the steps that use them"""
+    graph = StepGraph()
+    try:
+        graph.add("deploy", sleeper(0), depends_on=["env_patch"])
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+
+if __name__ == "__main__":
+    print("Testing step graph...")
+    test_independent_steps_run_concurrently()
+    test_dependencies_receive_results()
+    test_failure_skips_dependents()
+    test_critical_path()
+    test_unknown_dependency_rejected()
+    print("All step graph tests passed")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Test tracing spans and exporters (no network needed)"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracing import JsonlExporter, OtlpHttpExporter, Tracer
+
+
+class _Collect:
+    def __init__(self):
+        self.batches = []
+
+    async def export(self, spans):
+        self.batches.append(spans)
+
+    async def close(self):
+        pass
+
+
+def test_disabled_tracer_is_noop():
+    """Without exporters spans still work as context managers but record nothing"""
+    tracer = Tracer()
+    with tracer.span("tool x", name="attribute, not the span name") as span:
+        span.set_attribute("a", 1)
+        span.set_error("ignored")
+    assert not tracer.enabled
+
+
+def test_name_attribute_is_not_the_span_name():
+    """A "name" attribute (the DNS span sets one) never collides with the span name"""
+    collect = _Collect()
+    tracer = Tracer([collect])
+
+    async def run():
+        with tracer.span("cloudflare POST /zones/{id}/dns_records", name="app.therink.io"):
+            pass
+        await tracer.close()
+
+    asyncio.run(run())
+    span = collect.batches[0][0]
+    assert span.name == "cloudflare POST /zones/{id}/dns_records"
+    assert span.attributes["name"] == "app.therink.io"
+
+
+def test_children_follow_gathered_tasks():
+    """Spans opened in gathered tasks are children of the tool span and exported with it"""
+    collect = _Collect()
+    tracer = Tracer([collect])
+
+    async def upstream(endpoint):
+        with tracer.span(f"coolify GET {endpoint}"):
+            await asyncio.sleep(0.01)
+
+    async def run():
+        with tracer.span("tool smart_deploy"):
+            await asyncio.gather(upstream("/servers"), upstream("/applications"))
+        with tracer.span("tool list_servers"):
+            pass
+        await tracer.close()
+
+    asyncio.run(run())
+    first, second = collect.batches
+    root = first[-1]
+    assert root.name == "tool smart_deploy" and root.parent_id is None
+    assert sorted(s.name for s in first[:-1]) == ["coolify GET /applications", "coolify GET /servers"]
+    assert all(s.parent_id == root.span_id and s.trace_id == root.trace_id for s in first[:-1])
+    assert all(s.duration_ms >= 10 for s in first[:-1])
+    assert second[0].trace_id != root.trace_id
+
+
+def test_errors_and_late_spans():
+    """Exceptions mark the span; spans finishing after their root are exported on their own"""
+    collect = _Collect()
+    tracer = Tracer([collect])
+
+    async def run():
+        background = None
+        try:
+            with tracer.span("tool deploy"):
+                async def poll():
+                    with tracer.span("coolify GET /deployments/{id}"):
+                        await asyncio.sleep(0.02)
+                background = asyncio.create_task(poll())
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+        await background
+        await tracer.close()
+
+    asyncio.run(run())
+    (root,), (late,) = collect.batches
+    assert root.status == "error" and "boom" in root.error
+    assert late.parent_id == root.span_id
+
+
+def test_file_and_otlp_formats():
+    """JSONL lines carry ids and timings; the OTLP payload nests spans under the resource"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traces", "spans.jsonl")
+        tracer = Tracer([JsonlExporter(path)])
+
+        async def run():
+            with tracer.span("tool list_servers", tool="list_servers"):
+                with tracer.span("coolify GET /servers", status_code=200):
+                    pass
+            await tracer.close()
+
+        asyncio.run(run())
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+    assert [r["name"] for r in rows] == ["coolify GET /servers", "tool list_servers"]
+    assert rows[0]["parent_id"] == rows[1]["span_id"]
+    assert rows[0]["attributes"] == {"status_code": 200}
+
+    async def payload():
+        collect = _Collect()
+        tracer = Tracer([collect])
+        with tracer.span("tool x"):
+            pass
+        await tracer.close()
+        exporter = OtlpHttpExporter("http://127.0.0.1:4318/v1/traces", "coolify-mcp-server")
+        try:
+            return exporter.payload(collect.batches[0])
+        finally:
+            await exporter.close()
+
+    body = asyncio.run(payload())
+    spans = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[0]["name"] == "tool x" and len(spans[0]["traceId"]) == 32
+    assert body["resourceSpans"][0]["resource"]["attributes"][0]["value"]["stringValue"] == "coolify-mcp-server"
+
+
+def test_otlp_export_checks_status_and_survives_close():
+    """A rejected batch is an export error, and exports keep working after close()"""
+    statuses = [404, 200, 200]
+    received = []
+
+    def collector(request: httpx.Request) -> httpx.Response:
+        received.append(json.loads(request.content))
+        return httpx.Response(statuses.pop(0))
+
+    tracer = Tracer([OtlpHttpExporter("http://collector.test/v1/traces", "coolify-mcp-server",
+                                      transport=httpx.MockTransport(collector))])
+
+    async def session(name):
+        with tracer.span(name):
+            pass
+        # Each lifespan exit closes the tracer
+        await tracer.close()
+
+    asyncio.run(session("tool rejected"))
+    assert tracer.stats()["spans_exported"] == 0 and tracer.stats()["export_errors"] == 1
+    # A second lifespan, in a new event loop, after close()
+    asyncio.run(session("tool first"))
+    asyncio.run(session("tool second"))
+    assert tracer.stats()["spans_exported"] == 2 and tracer.stats()["export_errors"] == 1
+    assert len(received) == 3
+
+
+if __name__ == "__main__":
+    print("Testing tracing...")
+    test_disabled_tracer_is_noop()
+    test_name_attribute_is_not_the_span_name()
+    test_children_follow_gathered_tasks()
+    test_errors_and_late_spans()
+    test_file_and_otlp_formats()
+    test_otlp_export_checks_status_and_survives_close()
+    print("All tracing tests passed")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Test upstream admission control, backoff and circuit breaker (no network needed)"""
+
+import asyncio
+import os
+import sys
+import time
+from email.utils import formatdate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from upstream import (
+    AdmissionClass,
+    AdmissionController,
+    CircuitBreaker,
+    TokenBucket,
+    backoff_delay,
+    parse_retry_after,
+)
+
+
+def test_parse_retry_after():
+    """Delta-seconds, HTTP dates, garbage and the cap"""
+    assert parse_retry_after("5") == 5
+    assert parse_retry_after(None, default=2) == 2
+    assert parse_retry_after("soon", default=2) == 2
+    assert parse_retry_after("600", maximum=60) == 60
+    assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+
+def test_token_bucket_rate():
+    """After the burst is spent, requests are spaced at the configured rate"""
+    async def run():
+        bucket = TokenBucket(rate=50, burst=2)
+        started = time.perf_counter()
+        for _ in range(7):
+            await bucket.acquire()
+        # 2 from the burst, 5 more at 50/s = ~100ms
+        assert 0.08 <= time.perf_counter() - started < 0.3
+    asyncio.run(run())
+
+
+def test_max_in_flight():
+    """Never more than max_in_flight requests of a class run at once"""
+    async def run():
+        admission = AdmissionClass("read", max_in_flight=3, rate=0, burst=1)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with admission.slot():
+                peak = max(peak, admission.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[request() for _ in range(12)])
+        assert peak == 3
+        assert admission.stats()["admitted"] == 12
+    asyncio.run(run())
+
+
+def test_pause_holds_back_the_class():
+    """A 429 pause delays later requests of the same class only"""
+    async def run():
+        controller = AdmissionController(
+            {
+                "read": AdmissionClass("read", 4, 0, 1),
+                "write": AdmissionClass("write", 4, 0, 1),
+            },
+            lambda method, endpoint: "read" if method == "GET" else "write",
+        )
+        controller.for_request("POST", "/deploy").pause(0.1)
+        started = time.perf_counter()
+        async with controller.for_request("GET", "/applications").slot():
+            assert time.perf_counter() - started < 0.05
+        async with controller.for_request("POST", "/applications/x/restart").slot():
+            assert time.perf_counter() - started >= 0.09
+        assert controller.stats()["write"]["throttled"] == 1
+    asyncio.run(run())
+
+
+def test_backoff_is_jittered_and_capped():
+    """Delays stay within the exponential envelope and never exceed the cap"""
+    for attempt in range(1, 8):
+        delays = [backoff_delay(attempt, base=0.1, cap=1.0) for _ in range(50)]
+        assert all(0 <= d <= min(1.0, 0.1 * 2 ** (attempt - 1)) for d in delays)
+        assert len(set(delays)) > 1
+
+
+def test_breaker_opens_and_fails_fast():
+    """Consecutive failures open the circuit; requests are refused until the reset timeout"""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_breaker_half_open_probe():
+    """After the timeout one probe goes through; its outcome closes or reopens the circuit"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.02)
+    breaker.record_failure()
+    time.sleep(0.03)
+    assert breaker.allow() and breaker.state == "half_open"
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.03)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow() and breaker.allow()
+
+
+if __name__ == "__main__":
+    print("Testing upstream admission...")
+    test_parse_retry_after()
+    test_token_bucket_rate()
+    test_max_in_flight()
+    test_pause_holds_back_the_class()
+    test_backoff_is_jittered_and_capped()
+    test_breaker_opens_and_fails_fast()
+    test_breaker_half_open_probe()
+    print("All upstream admission tests passed")
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Lightweight tracing from MCP tool calls down to upstream HTTP requests
+
+Each tool invocation opens a root span and every upstream request made on
+its behalf opens a child span. Spans follow asyncio tasks through
+contextvars, so work fanned out with gather() stays in the caller's trace.
+
+When a root span ends, its whole trace is handed to the exporters in the
+background:
+- JsonlExporter appends one JSON object per span to a local file
+- OtlpHttpExporter POSTs OTLP/HTTP JSON to a collector (or any stand-in
+  that accepts /v1/traces)
+
+With no exporter configured, spans are no-ops and cost next to nothing.
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+import httpx
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "status", "error", "_children")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.error: Optional[str] = None
+        # Finished descendants, collected on the root span until the trace is exported
+        self._children: List["Span"] = []
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = "error"
+        self.error = message
+
+    @property
+    def duration_ms(self) -> float:
+        return round((self.end_ns - self.start_ns) / 1e6, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_unix_ns": self.start_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_current_root: ContextVar[Optional[Span]] = ContextVar("current_root", default=None)
+
+
+class JsonlExporter:
+    """Append finished spans to a JSON-lines file"""
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def _write(self, lines: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict()) + "\n" for span in spans)
+        await asyncio.to_thread(self._write, lines)
+
+    async def close(self) -> None:
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpExporter:
+    """POST spans as OTLP/HTTP JSON (e.g. http://localhost:4318/v1/traces)"""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """The shared client, recreated after close() so a re-entered lifespan keeps exporting"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, transport=self.transport)
+        return self._client
+
+    def payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": self.service_name}},
+            ]},
+            "scopeSpans": [{
+                "scope": {"name": "coolify-mcp"},
+                "spans": [{
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    # SPAN_KIND_SERVER for tool calls, SPAN_KIND_CLIENT for upstream requests
+                    "kind": 2 if span.parent_id is None else 3,
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns),
+                    "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+                    "status": {"code": 2, "message": span.error or ""} if span.status == "error" else {"code": 1},
+                } for span in spans],
+            }],
+        }]}
+
+    async def export(self, spans: List[Span]) -> None:
+        response = await self._get_client().post(self.endpoint, json=self.payload(spans))
+        # A collector that rejected the batch must count as an export error
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class Tracer:
+    """Creates spans and exports each finished trace in the background"""
+
+    def __init__(self, exporters: Optional[List[Any]] = None):
+        self.exporters = list(exporters or [])
+        self.exported = 0
+        self.export_errors = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    @contextmanager
+    def span(self, name: str, /, **attributes: Any) -> Iterator[Any]:
+        """Open a span as a child of the current one (or a new trace's root)"""
+        if not self.exporters:
+            yield _NOOP_SPAN
+            return
+        parent = _current_span.get()
+        span = Span(name, parent, attributes)
+        root = _current_root.get() if parent else span
+        span_token = _current_span.set(span)
+        root_token = _current_root.set(root)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(span_token)
+            _current_root.reset(root_token)
+            if span is root:
+                self._export([*span._children, span])
+                span._children = []
+            elif root.end_ns:
+                # Background work (e.g. a stale-while-revalidate refresh) outlived its trace
+                self._export([span])
+            else:
+                root._children.append(span)
+
+    def _export(self, spans: List[Span]) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(self._export_all(spans))
+        except RuntimeError:
+            # Not inside an event loop - nothing to hand the export to
+            return
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _export_all(self, spans: List[Span]) -> None:
+        for exporter in self.exporters:
+            try:
+                await exporter.export(spans)
+                self.exported += len(spans)
+            except Exception:
+                self.export_errors += 1
+
+    async def close(self) -> None:
+        """Flush pending exports and release exporter resources"""
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=5)
+        for exporter in self.exporters:
+            await exporter.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "exporters": [type(exporter).__name__ for exporter in self.exporters],
+            "spans_exported": self.exported,
+            "export_errors": self.export_errors,
+        }
+
+
+def tracer_from_env(service_name: str = "coolify-mcp-server") -> Tracer:
+    """Tracer configured from MCP_TRACE_FILE and/or MCP_TRACE_OTLP_ENDPOINT"""
+    exporters: List[Any] = []
+    trace_file = os.getenv("MCP_TRACE_FILE")
+    if trace_file:
+        exporters.append(JsonlExporter(trace_file))
+    otlp_endpoint = os.getenv("MCP_TRACE_OTLP_ENDPOINT")
+    if otlp_endpoint:
+        exporters.append(OtlpHttpExporter(otlp_endpoint, service_name))
+    return Tracer(exporters)
+
+
+TRACER = tracer_from_env()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Admission control for requests to the Coolify API
+
+Coolify runs on a handful of PHP workers, and a few agents fanning out at
+once can overwhelm it. Every upstream request is admitted through the
+class it belongs to (reads, or mutations such as deploy/restart). Each
+class has a max-in-flight semaphore and a token bucket, and it can be
+paused as a whole when Coolify answers 429 with a Retry-After.
+
+CircuitBreaker and backoff_delay cover the failure side: transient errors
+on idempotent reads are retried with jittered exponential backoff, and
+once Coolify looks down, calls fail fast until a half-open probe succeeds.
+"""
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0, maximum: float = 60.0) -> float:
+    """Seconds to wait for a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return default
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return default
+    return min(max(seconds, 0.0), maximum)
+
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 2.0) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^(attempt-1))]"""
+    return random.uniform(0, min(cap, base * (2 ** max(0, attempt - 1))))
+
+
+class CircuitBreaker:
+    """Fail fast while the upstream is down, probing it again after reset_timeout
+
+    closed:    requests flow; failure_threshold consecutive failures open it
+    open:      requests are refused until reset_timeout has passed
+    half_open: a single probe request is let through - success closes the
+               circuit, failure opens it again
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+
+    def allow(self) -> bool:
+        """Whether a request may go upstream now (may start the half-open probe)"""
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            # A probe that never reported back (e.g. cancelled) must not wedge the circuit
+            if self._probing and time.monotonic() - self._probe_started < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self._probing = True
+            self._probe_started = time.monotonic()
+        return True
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed"""
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opened += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_in_s": round(self.retry_in(), 1),
+        }
+
+
+class TokenBucket:
+    """Average rate per second with bursts of up to `burst` requests; rate <= 0 means unlimited"""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        # Waiters queue on the lock so tokens are handed out first come, first served
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Take one token, waiting for it if needed; returns the seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        started = time.monotonic()
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+        return time.monotonic() - started
+
+
+class AdmissionClass:
+    """Concurrency cap, request rate and Retry-After pause for one class of requests"""
+
+    def __init__(self, name: str, max_in_flight: int, rate: float, burst: float):
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._bucket = TokenBucket(rate, burst)
+        self._paused_until = 0.0
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request of this class for the next `seconds` (upstream said 429)"""
+        self.throttled += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a free slot, a token and the end of any pause, then run the request"""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            while True:
+                delay = self._paused_until - time.monotonic()
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            await self._bucket.acquire()
+            self.wait_seconds += time.monotonic() - started
+            self.admitted += 1
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "rate_per_s": self._bucket.rate,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            "avg_wait_ms": round(self.wait_seconds / self.admitted * 1000, 2) if self.admitted else 0.0,
+        }
+
+
+class AdmissionController:
+    """Route each upstream request to its AdmissionClass"""
+
+    def __init__(self, classes: Dict[str, AdmissionClass], classify: Callable[[str, str], str]):
+        self.classes = classes
+        self.classify = classify
+
+    def for_request(self, method: str, endpoint: str) -> AdmissionClass:
+        return self.classes[self.classify(method, endpoint)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: cls.stats() for name, cls in self.classes.items()}
@@ -15,6 +15,8 @@ CLOUDFLARE_API_TOKEN = os.getenv("CLOUDFLARE_API_TOKEN")
 CLOUDFLARE_ACCOUNT_ID = os.getenv("CLOUDFLARE_ACCOUNT_ID")  # You may need to add this to Doppler
 CLOUDFLARE_TUNNEL_ID = os.getenv("CLOUDFLARE_TUNNEL_ID")
 BASE_DOMAIN = os.getenv("BASE_DOMAIN", "therink.io")
+# Override to run against a stand-in such as benchmarks/mock_cloudflare.py
+CLOUDFLARE_API_BASE_URL = os.getenv("CLOUDFLARE_API_BASE_URL", "https://api.cloudflare.com/client/v4").rstrip("/")
 
 def add_tunnel_route():
     """Add mcp.therink.io route to the Cloudflare tunnel"""
@@ -34,7 +36,7 @@ def add_tunnel_route():
         }
         
         try:
-            response = httpx.get("https://api.cloudflare.com/v4/accounts", headers=headers)
+            response = httpx.get(f"{CLOUDFLARE_API_BASE_URL}/accounts", headers=headers)
             accounts = response.json()
             if accounts.get("success") and accounts.get("result"):
                 account_id = accounts["result"][0]["id"]
@@ -59,7 +61,7 @@ def add_tunnel_route():
     }
     
     # Cloudflare tunnel config endpoint
-    url = f"https://api.cloudflare.com/v4/accounts/{account_id}/cfd_tunnel/{CLOUDFLARE_TUNNEL_ID}/configurations"
+    url = f"{CLOUDFLARE_API_BASE_URL}/accounts/{account_id}/cfd_tunnel/{CLOUDFLARE_TUNNEL_ID}/configurations"
     
     # Get current config first
     try:
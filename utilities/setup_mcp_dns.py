@@ -10,6 +10,8 @@ load_dotenv()
 CF_API_TOKEN = os.getenv("CLOUDFLARE_API_TOKEN")
 CF_ZONE_ID = os.getenv("CLOUDFLARE_ZONE_ID")
 BASE_DOMAIN = os.getenv("BASE_DOMAIN", "therink.io")
+# Override to run against a stand-in such as benchmarks/mock_cloudflare.py
+CF_API_BASE_URL = os.getenv("CLOUDFLARE_API_BASE_URL") or None
 
 def create_mcp_dns():
     if not CF_API_TOKEN or not CF_ZONE_ID:
@@ -17,7 +19,7 @@ def create_mcp_dns():
         return False
     
     try:
-        cf = cloudflare.Cloudflare(api_token=CF_API_TOKEN)
+        cf = cloudflare.Cloudflare(api_token=CF_API_TOKEN, base_url=CF_API_BASE_URL)
         
         # Check if record already exists
         print(f"[*] Checking for existing mcp.{BASE_DOMAIN} record...")
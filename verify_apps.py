@@ -22,7 +22,7 @@ async def run():
             
             # List apps
             print("\nListing applications...")
-            result = await session.call_tool("list_applications", {})
+            result = await session.call_tool("list_applications", {"fields": ["uuid", "name", "description"]})
             for content in result.content:
                 if content.type == "text":
                     apps = json.loads(content.text)